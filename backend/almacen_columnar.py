@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+ALMACEN COLUMNAR (ARROW IPC)
+============================
+Persistencia tipada de las tablas del análisis para consumo del servidor.
+Cada tabla (Datos_Centros, Datos_Centro_Articulo, Rankings) se guarda como
+un fichero Arrow IPC independiente que el servidor abre con memory-map.
+El Excel V2 queda solo como exportación para consulta humana.
+
+Las columnas de texto con valores de tipos mezclados (p.ej. O.F. enteras y
+alfanuméricas) se guardan como JSON y se decodifican al leer: el servidor
+recibe los mismos valores Python que obtendría de pd.read_excel.
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    HAY_PYARROW = True
+except ImportError:  # Entorno portable sin pyarrow: se trabaja solo con Excel
+    pa = None
+    ipc = None
+    HAY_PYARROW = False
+
+TABLAS = ('Datos_Centros', 'Datos_Centro_Articulo', 'Rankings')
+EXTENSION = '.arrow'
+
+# Columnas de texto que se guardan como diccionario (pocos valores distintos)
+COLUMNAS_CATEGORICAS = {'Tipo'}
+CLAVE_COLUMNAS_JSON = b"rpk_columnas_json"
+
+
+def ruta_almacen(excel_file):
+    """Directorio del almacén columnar asociado a un Excel V2"""
+    excel_file = Path(excel_file)
+    return excel_file.with_name(f"{excel_file.stem}_arrow")
+
+
+def almacen_disponible(directorio):
+    """Indica si existe un almacén legible con la tabla principal"""
+    return HAY_PYARROW and (Path(directorio) / f"Datos_Centros{EXTENSION}").exists()
+
+
+def mtime_almacen(directorio):
+    """Fecha de modificación más reciente de las tablas del almacén"""
+    rutas = [Path(directorio) / f"{t}{EXTENSION}" for t in TABLAS]
+    return max((r.stat().st_mtime for r in rutas if r.exists()), default=0.0)
+
+
+def _columna_centro(serie):
+    """Centro como entero si todos los códigos son numéricos; si no, categórico"""
+    texto = serie.astype(object).where(serie.notna(), None)
+    texto = texto.map(lambda v: None if v is None or str(v).strip() == '' else str(v).strip())
+    numerico = pd.to_numeric(texto, errors='coerce')
+    if numerico[texto.notna()].notna().all() and (numerico.dropna() % 1 == 0).all():
+        return pa.array(numerico.astype('Int32'), type=pa.int32(), from_pandas=True)
+    return pa.array(texto, type=pa.string(), from_pandas=True).dictionary_encode()
+
+
+def _columna_texto(serie, categorica=False):
+    texto = serie.astype(object).where(serie.notna(), None).map(lambda v: v if v is None else str(v))
+    arr = pa.array(texto, type=pa.string(), from_pandas=True)
+    return arr.dictionary_encode() if categorica else arr
+
+
+def _columna_json(serie):
+    """Columna de tipos mezclados como diccionario de sus valores distintos en JSON"""
+    codigos, valores = pd.factorize(serie)
+    diccionario = pa.array([json.dumps(v.item() if isinstance(v, np.generic) else v) for v in valores],
+                           type=pa.string())
+    return pa.DictionaryArray.from_arrays(pa.array(codigos, mask=codigos < 0), diccionario)
+
+
+def _valores_mixtos(serie):
+    return serie.dtype == object and not serie.dropna().map(type).eq(str).all()
+
+
+def tabla_tipada(df):
+    """Convierte un DataFrame del análisis a tabla Arrow con tipos estables"""
+    columnas, nombres, columnas_json = [], [], []
+    for col in df.columns:
+        serie = df[col]
+        if col == 'Fecha':
+            arr = pa.array(pd.to_datetime(serie).dt.date, type=pa.date32(), from_pandas=True)
+        elif col == 'Centro':
+            arr = _columna_centro(serie)
+        elif pd.api.types.is_bool_dtype(serie):
+            arr = pa.array(serie, type=pa.bool_(), from_pandas=True)
+        elif pd.api.types.is_integer_dtype(serie):
+            arr = pa.array(serie, type=pa.int64(), from_pandas=True)
+        elif pd.api.types.is_float_dtype(serie):
+            arr = pa.array(serie, type=pa.float64(), from_pandas=True)
+        elif _valores_mixtos(serie):
+            arr = _columna_json(serie)
+            columnas_json.append(str(col))
+        else:
+            arr = _columna_texto(serie, categorica=col in COLUMNAS_CATEGORICAS)
+        columnas.append(arr)
+        nombres.append(str(col))
+    tabla = pa.Table.from_arrays(columnas, names=nombres)
+    return tabla.replace_schema_metadata({CLAVE_COLUMNAS_JSON: json.dumps(columnas_json).encode('utf-8')})
+
+
+def escribir_almacen(tablas, directorio):
+    """Escribe cada DataFrame como fichero Arrow IPC (sustitución atómica)"""
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    for nombre, df in tablas.items():
+        destino = directorio / f"{nombre}{EXTENSION}"
+        temporal = destino.with_suffix('.tmp')
+        tabla = tabla_tipada(df)
+        with pa.OSFile(str(temporal), 'wb') as sink:
+            with ipc.new_file(sink, tabla.schema) as writer:
+                writer.write_table(tabla)
+        os.replace(temporal, destino)
+
+
+def leer_tabla(directorio, nombre, categoricas=False):
+    """Lee una tabla del almacén mediante memory-map. None si no existe.
+
+    Con categoricas=False las columnas diccionario se devuelven como texto
+    plano, igual que las leería pd.read_excel. Las columnas JSON se devuelven
+    siempre con sus valores Python (object, nulos como NaN).
+    """
+    ruta = Path(directorio) / f"{nombre}{EXTENSION}"
+    if not ruta.exists():
+        return None
+    with pa.memory_map(str(ruta), 'r') as fuente:
+        tabla = ipc.open_file(fuente).read_all()
+    columnas_json = json.loads((tabla.schema.metadata or {}).get(CLAVE_COLUMNAS_JSON, b"[]"))
+    if not categoricas or columnas_json:
+        for i, campo in enumerate(tabla.schema):
+            if pa.types.is_dictionary(campo.type) and (not categoricas or campo.name in columnas_json):
+                columna = pa.chunked_array(
+                    [c.dictionary_decode() for c in tabla.column(i).chunks],
+                    type=campo.type.value_type
+                )
+                tabla = tabla.set_column(i, campo.name, columna)
+    df = tabla.to_pandas(date_as_object=False)
+    for col in columnas_json:
+        # Solo se decodifican los valores distintos
+        codigos, textos = pd.factorize(df[col].to_numpy(dtype=object))
+        valores = np.array([json.loads(t) for t in textos] + [np.nan], dtype=object)
+        df[col] = pd.Series(valores[codigos], index=df.index, dtype=object)
+    return df
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+ALMACEN SQLITE (MOTOR EMBEBIDO)
+===============================
+Alternativa al almacén Arrow para históricos largos. El ETL guarda las
+tablas ya normalizadas (las mismas que el servidor tendría en memoria) en
+un fichero SQLite con índice (Centro, Fecha). En modo sqlite el servidor
+solo carga Datos_Centros y Rankings; el drill-down de artículos lee con el
+índice únicamente las filas de los centros y el mes pedidos, de modo que
+Datos_Centro_Articulo no ocupa RAM en ningún worker.
+
+Alcance: lo que se delega en SQLite es el acceso a Datos_Centro_Articulo
+(filtro por centros y mes del drill-down y la suma de horas por mes del
+índice de búsqueda). Datos_Centros y Rankings se leen enteras a memoria y
+el resumen, /api/centro y /api/centros se siguen agregando en pandas igual
+que con el motor por defecto.
+
+Para que el JSON sea idéntico al del motor pandas:
+  - cada tabla conserva su índice y el orden de filas (columna _fila),
+  - los tipos pandas se guardan en _columnas y se restauran al leer,
+  - los categóricos se guardan como códigos con su diccionario completo
+    (mismas categorías y mismo orden aunque se lean solo unas filas),
+  - las medias en coma flotante se calculan en pandas sobre las filas
+    devueltas: SQLite acumula en otro orden y cambiaría el último decimal.
+"""
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from resumen_articulos import agrupar_articulos
+
+EXTENSION = ".sqlite"
+COLUMNA_FILA = "_fila"
+PATRON_MES = r"\d{4}-\d{2}"
+
+
+def ruta_sqlite(excel_file):
+    """Fichero SQLite asociado a un Excel V2"""
+    return Path(excel_file).with_suffix(EXTENSION)
+
+
+def _tipo_columna(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return 'categoria'
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return 'fecha'
+    if pd.api.types.is_bool_dtype(serie) or pd.api.types.is_numeric_dtype(serie):
+        return 'valor'
+    return 'json'
+
+
+def _valores_sql(serie, tipo):
+    """Columna como lista de valores Python almacenables en SQLite"""
+    if tipo == 'categoria':
+        return serie.cat.codes.astype('int64').tolist()
+    if tipo == 'fecha':
+        return serie.to_numpy().astype('datetime64[s]').astype('int64').tolist()
+    if tipo == 'json':
+        return [json.dumps(v) for v in serie.tolist()]
+    if pd.api.types.is_bool_dtype(serie):
+        return serie.astype('int64').tolist()
+    return serie.tolist()
+
+
+def escribir_base(tablas, ruta):
+    """Escribe las tablas normalizadas en una base SQLite nueva (sustitución atómica)"""
+    ruta = Path(ruta)
+    temporal = ruta.with_name(f".{ruta.name}.tmp")
+    temporal.unlink(missing_ok=True)
+    con = sqlite3.connect(temporal)
+    try:
+        con.execute("CREATE TABLE _columnas (tabla TEXT, posicion INTEGER, columna TEXT, tipo TEXT, "
+                    "dtype TEXT, dtype_categorias TEXT)")
+        con.execute("CREATE TABLE _categorias (tabla TEXT, columna TEXT, codigo INTEGER, valor TEXT)")
+        for nombre, df in tablas.items():
+            tipos = {col: _tipo_columna(df[col]) for col in df.columns}
+            definicion = ", ".join(f'"{col}"' for col in df.columns)
+            con.execute(f'CREATE TABLE "{nombre}" ({COLUMNA_FILA} INTEGER PRIMARY KEY, {definicion})')
+            for posicion, col in enumerate(df.columns):
+                serie = df[col]
+                categorias = serie.cat.categories if tipos[col] == 'categoria' else None
+                con.execute("INSERT INTO _columnas VALUES (?, ?, ?, ?, ?, ?)", (
+                    nombre, posicion, col, tipos[col], str(serie.dtype if categorias is None else 'category'),
+                    None if categorias is None else str(categorias.dtype)
+                ))
+                if categorias is not None:
+                    con.executemany("INSERT INTO _categorias VALUES (?, ?, ?, ?)", (
+                        (nombre, col, codigo, json.dumps(v.item() if hasattr(v, 'item') else v))
+                        for codigo, v in enumerate(categorias)
+                    ))
+            # El índice (filas que quedan tras filtrar los centros auxiliares) es la clave de orden
+            indice = df.index if pd.api.types.is_integer_dtype(df.index) and df.index.is_monotonic_increasing \
+                and df.index.is_unique else pd.RangeIndex(len(df))
+            columnas = [_valores_sql(df[col], tipos[col]) for col in df.columns]
+            marcadores = ", ".join("?" * (len(df.columns) + 1))
+            con.executemany(f'INSERT INTO "{nombre}" VALUES ({marcadores})', zip(indice.tolist(), *columnas))
+            if {'Centro', 'Fecha'} <= set(df.columns):
+                con.execute(f'CREATE INDEX "idx_{nombre}_centro_fecha" ON "{nombre}" (Centro, Fecha)')
+        con.commit()
+    finally:
+        con.close()
+    os.replace(temporal, ruta)
+    return ruta
+
+
+class BaseSQLite:
+    """Lectura de las tablas normalizadas con sus tipos pandas originales"""
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        self._local = threading.local()
+        con = self._conexion()
+        self.columnas = {}
+        for tabla, col, tipo, dtype, dtype_cat in con.execute(
+            "SELECT tabla, columna, tipo, dtype, dtype_categorias FROM _columnas ORDER BY tabla, posicion"
+        ):
+            self.columnas.setdefault(tabla, []).append((col, tipo, dtype, dtype_cat))
+        valores = {}
+        for tabla, col, valor in con.execute(
+            "SELECT tabla, columna, valor FROM _categorias ORDER BY tabla, columna, codigo"
+        ):
+            valores.setdefault((tabla, col), []).append(json.loads(valor))
+        self.categorias = {
+            (tabla, col): pd.Index(valores.get((tabla, col), []), dtype=dtype_cat)
+            for tabla, columnas in self.columnas.items()
+            for col, tipo, _, dtype_cat in columnas if tipo == 'categoria'
+        }
+
+    def _conexion(self):
+        # Una conexión de solo lectura por hilo (los cálculos se ejecutan en un pool)
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = sqlite3.connect(f"{self.ruta.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            self._local.con = con
+        return con
+
+    def consultar(self, sql, parametros=()):
+        """Filas de una consulta de solo lectura (conexión propia del hilo)"""
+        return self._conexion().execute(sql, parametros).fetchall()
+
+    def vacia(self, tabla):
+        """Tabla sin filas con las columnas y tipos originales"""
+        return self.leer(tabla, "WHERE 0")
+
+    def leer(self, tabla, condicion="", parametros=()):
+        """Filas de la tabla (en su orden original) como DataFrame con los tipos originales"""
+        columnas = self.columnas[tabla]
+        select = ", ".join([COLUMNA_FILA] + [f'"{col}"' for col, *_ in columnas])
+        filas = self.consultar(f'SELECT {select} FROM "{tabla}" {condicion} ORDER BY {COLUMNA_FILA}', parametros)
+        indice, *valores = list(zip(*filas)) if filas else [()] * (len(columnas) + 1)
+        indice = pd.Index(np.array(indice, dtype='int64'))
+        datos = {}
+        for (col, tipo, dtype, _), serie in zip(columnas, valores):
+            if tipo == 'categoria':
+                datos[col] = pd.Categorical.from_codes(np.array(serie, dtype='int64'),
+                                                       categories=self.categorias[(tabla, col)])
+            elif tipo == 'fecha':
+                datos[col] = np.array(serie, dtype='int64').astype('datetime64[s]')
+            elif tipo == 'json':
+                datos[col] = pd.Series([json.loads(v) for v in serie], index=indice, dtype=dtype)
+            else:
+                datos[col] = pd.Series(np.array(serie, dtype='float64' if dtype.startswith('float') else None),
+                                       index=indice, dtype=dtype)
+        return pd.DataFrame(datos, index=indice, columns=[col for col, *_ in columnas])
+
+    def filas(self, tabla):
+        return self.consultar(f'SELECT COUNT(*) FROM "{tabla}"')[0][0]
+
+
+class DesgloseSQLite:
+    """Drill-down Artículo/O.F. leído del índice (Centro, Fecha), misma interfaz que ResumenArticulos"""
+
+    TABLA = 'Datos_Centro_Articulo'
+
+    def __init__(self, base):
+        self.base = base
+        nombres = [col for col, *_ in base.columnas.get(self.TABLA, [])]
+        self.columnas = ['Articulo'] + (['OF'] if 'OF' in nombres else [])
+        self.total_filas = base.filas(self.TABLA) if nombres else 0
+        # Clave de texto de la URL -> valor almacenado (igual que astype(str) en el motor pandas)
+        self.centros = {}
+        if self.total_filas:
+            tipo = dict((col, tipo) for col, tipo, *_ in base.columnas[self.TABLA])['Centro']
+            distintos = base.consultar(f'SELECT DISTINCT Centro FROM "{self.TABLA}"')
+            for (valor,) in distintos:
+                texto = base.categorias[(self.TABLA, 'Centro')][valor] if tipo == 'categoria' else valor
+                self.centros[str(texto)] = valor
+
+    @property
+    def vacio(self):
+        return self.total_filas == 0
+
+    def horas_por_mes(self):
+        """Suma de Horas por Artículo/O.F., centro (clave de texto) y mes, agregada en SQLite"""
+        salida = self.columnas + ['Centro', 'Mes', 'Horas']
+        if self.vacio:
+            return pd.DataFrame(columns=salida)
+        tipos = dict((col, tipo) for col, tipo, *_ in self.base.columnas[self.TABLA])
+        grupos = ", ".join(f'"{col}"' for col in self.columnas + ['Centro'])
+        # Claves vacías fuera (como en groupby): código -1 en categóricos, NULL en el resto
+        filtro = " AND ".join(f'"{col}" >= 0' if tipos[col] == 'categoria' else f'"{col}" IS NOT NULL'
+                              for col in self.columnas)
+        filas = self.base.consultar(
+            f"SELECT {grupos}, strftime('%Y-%m', Fecha, 'unixepoch') AS Mes, SUM(Horas) "
+            f'FROM "{self.TABLA}" WHERE {filtro} GROUP BY {grupos}, Mes'
+        )
+        df = pd.DataFrame(filas, columns=salida)
+        for col in self.columnas:
+            if tipos[col] == 'categoria':
+                df[col] = self.base.categorias[(self.TABLA, col)].take(df[col].to_numpy(dtype='int64'))
+        texto_centro = {valor: texto for texto, valor in self.centros.items()}
+        df['Centro'] = df['Centro'].map(texto_centro)
+        return df
+
+    def desglose(self, claves, mes):
+        """Artículo/O.F. con horas medias y días para los centros y el mes dados"""
+        valores = [self.centros[c] for c in dict.fromkeys(claves) if c in self.centros]
+        if not valores or not pd.Series([mes]).str.fullmatch(PATRON_MES).all():
+            return pd.DataFrame(columns=self.columnas + ['horas', 'dias'])
+        try:
+            inicio = pd.Timestamp(f"{mes}-01")
+        except ValueError:
+            return pd.DataFrame(columns=self.columnas + ['horas', 'dias'])
+        fin = inicio + pd.DateOffset(months=1)
+        marcadores = ", ".join("?" * len(valores))
+        df_filas = self.base.leer(
+            self.TABLA, f"WHERE Centro IN ({marcadores}) AND Fecha >= ? AND Fecha < ?",
+            (*valores, int(inicio.timestamp()), int(fin.timestamp()))
+        )
+        return agrupar_articulos(df_filas, self.columnas)
@@ -6,11 +6,29 @@ Calcula el promedio mensual del "Tiempo Ejecucion Disponible" (TEjec_Disp)
 agrupado por Centro y por Artículo.
 FILTRO: Se omiten centros de más de 4 dígitos.
 """
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import re
 import sys
 import io
+import os
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import xlsxwriter
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+from pandas.io.parsers import TextParser
+
+from almacen_columnar import HAY_PYARROW, escribir_almacen, ruta_almacen
+from almacen_sqlite import escribir_base, ruta_sqlite
+from cache_lecturas import (
+    CARPETA_LECTURAS, MAX_BYTES_LECTURAS, etiqueta_esquema, guardar_cache, leer_cache, recortar_cache
+)
+from metricas import Cronometro
+from tablas_compactas import normalizar_tablas
 
 # Configurar salida UTF-8
 if sys.stdout.encoding != 'utf-8':
@@ -22,6 +40,20 @@ SCRIPT_DIR = Path(__file__).parent.resolve()
 BASE_PATH = SCRIPT_DIR.parent.parent.parent
 CARPETA_DATOS = BASE_PATH / "List Avance Obra-Centro y Operacion"
 OUTPUT_FILE = SCRIPT_DIR / "ANALISIS_MENSUAL_TIEMPOS_V2.xlsx"
+# Almacén columnar (Arrow IPC) que consume el servidor
+OUTPUT_ARROW = ruta_almacen(OUTPUT_FILE)
+# Base SQLite opcional (--sqlite) para el motor sqlite del servidor
+OUTPUT_SQLITE = ruta_sqlite(OUTPUT_FILE)
+# Tablas de la base, en el orden de argumentos de normalizar_tablas
+TABLAS_SQLITE = ('Datos_Centros', 'Rankings', 'Datos_Centro_Articulo')
+
+# Cache incremental: manifiesto de archivos ingeridos y agregados parciales por día
+CARPETA_PARCIALES = SCRIPT_DIR / "cache_etl"
+MANIFEST_FILE = CARPETA_PARCIALES / "manifest.json"
+VERSION_MANIFEST = 1
+
+# Registro de tiempos por etapa de cada ejecución (una línea JSON por ejecución)
+LOG_ETAPAS = SCRIPT_DIR / "logs" / "etl_etapas.jsonl"
 
 # Columnas a cargar
 COLUMNAS_REQUERIDAS = ['Centro', 'Artículo', 'TEjec_Disp', 'C. Terminada', 'C.Terminada FAn', 'O.F']
@@ -35,6 +67,24 @@ COLUMNAS_ALTERNATIVAS = {
     'O.F': ['O.F', 'OF', 'Orden Fabricacion']
 }
 
+# Versión de la lógica de lectura de reportes (procesar_archivo): subirla
+# invalida la caché de lecturas
+VERSION_LECTURA = 1
+ETIQUETA_LECTURA = etiqueta_esquema(VERSION_LECTURA, COLUMNAS_REQUERIDAS, COLUMNAS_ALTERNATIVAS)
+
+# Números que float() acepta tras limpiar TEjec_Disp (solo dígitos, '.' y '-')
+PATRON_NUMERO = r'-?(?:\d+\.?\d*|\.\d+)'
+
+# Grano de los agregados parciales diarios
+CLAVES_PARCIAL = ['Centro', 'Artículo', 'O.F']
+
+# Hoja Rankings: top diario de centros y artículos
+TOP_RANKING = 15
+COLUMNAS_RANKING = ['Fecha', 'Tipo', 'Ranking', 'Centro', 'Articulo', 'Carga_Dia', 'Media_Mensual', 'Total_Mes']
+
+# Modos de exportación del Excel V2 (el almacén columnar se genera siempre que haya pyarrow)
+MODOS_EXCEL = ('completo', 'rapido', 'no')
+
 
 def extraer_fecha_nombre(nombre_archivo):
     """Extrae la fecha del nombre del archivo (formato YYYY-MM-DD)"""
@@ -73,8 +123,46 @@ def limpiar_tiempo_disponible(valor):
         return None
 
 
-def cargar_y_procesar_archivos():
-    """Carga todos los archivos Excel y los procesa (solo el último archivo de cada día)"""
+def normalizar_tiempo_disponible(serie):
+    """Versión vectorizada de limpiar_tiempo_disponible para una columna completa.
+
+    El saneado de texto se aplica una sola vez por valor distinto (los
+    reportes del ERP repiten mucho los mismos tiempos) y se propaga con
+    take. Devuelve una Serie float64 (NaN donde la función escalar devuelve None).
+    """
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype('float64')
+    
+    valores = serie.to_numpy(dtype=object)
+    codigos, unicos = pd.factorize(valores)
+    unicos = pd.Series(unicos, dtype=object)
+    
+    # Valores numéricos nativos (int, float, bool y subclases) frente a texto
+    es_numero_u = unicos.map(lambda v: isinstance(v, (int, float))).to_numpy(dtype=bool)
+    convertidos = np.full(len(unicos), np.nan)
+    # dtype object: el regex usa el motor re de Python (\d incluye dígitos unicode)
+    texto = unicos[~es_numero_u].map(str).astype(object)
+    if len(texto):
+        # Mismo saneado de texto que la versión escalar
+        texto = texto.str.replace(',', '.', regex=False)
+        texto = texto.str.replace(r'[^\d.\-]', '', regex=True)
+        validos = texto.str.fullmatch(PATRON_NUMERO).astype(bool)
+        convertidos[texto.index[validos]] = texto[validos].astype('float64')
+    
+    presentes = codigos >= 0
+    resultado = np.full(len(valores), np.nan)
+    resultado[presentes] = convertidos[codigos[presentes]]
+    
+    # Los numéricos se convierten elemento a elemento (conserva -0.0 frente a 0)
+    es_numero = presentes & es_numero_u[np.where(presentes, codigos, 0)]
+    if es_numero.any():
+        resultado[es_numero] = valores[es_numero].astype('float64')
+    
+    return pd.Series(resultado, index=serie.index, dtype='float64')
+
+
+def seleccionar_archivos():
+    """Selecciona el último archivo de cada día: {fecha 'YYYY-MM-DD': Path}"""
     archivos = list(CARPETA_DATOS.glob("*.xlsx"))
     print(f"[INFO] Encontrados {len(archivos)} archivos en la carpeta")
     
@@ -86,118 +174,552 @@ def cargar_y_procesar_archivos():
             if fecha_str not in archivos_por_fecha or archivo.name > archivos_por_fecha[fecha_str].name:
                 archivos_por_fecha[fecha_str] = archivo
     
-    archivos_filtrados = list(archivos_por_fecha.values())
-    print(f"[INFO] Usando {len(archivos_filtrados)} archivos (1 por día)")
+    print(f"[INFO] Usando {len(archivos_por_fecha)} archivos (1 por día)")
+    return archivos_por_fecha
+
+
+def valor_celda(valor):
+    """Mismo valor que asigna pd.read_excel (motor openpyxl) a una celda"""
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    if isinstance(valor, str) and valor in ERROR_CODES:
+        return np.nan
+    return valor
+
+
+def leer_reporte(archivo):
+    """Lee solo las columnas requeridas de un reporte del ERP, en streaming.
+
+    Resuelve primero la fila de cabecera (encontrar_columna sobre
+    COLUMNAS_ALTERNATIVAS) y después recorre las filas en modo read_only
+    guardando únicamente las celdas de esas columnas. Los tipos se infieren
+    con el mismo TextParser que usa pd.read_excel, así que el resultado es
+    idéntico al de leer el archivo completo y seleccionar las columnas.
+    Devuelve un DataFrame con los nombres estándar (vacío si no hay ninguna).
+    """
+    libro = load_workbook(archivo, read_only=True, data_only=True, keep_links=False)
+    try:
+        hoja = libro.worksheets[0]
+        hoja.reset_dimensions()
+        filas = hoja.iter_rows(values_only=True)
+        cabecera = pd.DataFrame(columns=[valor_celda(v) for v in next(filas, ())])
+        columnas_mapeadas = {}
+        for col_std in COLUMNAS_REQUERIDAS:
+            col_real = encontrar_columna(cabecera, col_std, COLUMNAS_ALTERNATIVAS)
+            if col_real:
+                columnas_mapeadas[col_real] = col_std
+        if not columnas_mapeadas:
+            return pd.DataFrame()
+        
+        posiciones = [list(cabecera.columns).index(col) for col in columnas_mapeadas]
+        datos = [list(columnas_mapeadas.values())]
+        ultima_con_datos = 0
+        for fila in filas:
+            # pd.read_excel descarta las filas vacías del final (en todas las columnas)
+            if any(v is not None and v != "" for v in fila):
+                ultima_con_datos = len(datos) + 1
+            datos.append([valor_celda(fila[k]) if k < len(fila) else "" for k in posiciones])
+    finally:
+        libro.close()
+    
+    del datos[max(ultima_con_datos, 1):]
+    return TextParser(datos, header=0, skip_blank_lines=False).read()
+
+
+def procesar_archivo(archivo, fecha, cronometro=None):
+    """Lee un reporte diario del ERP, mapea columnas y limpia valores.
+
+    Devuelve un DataFrame (vacío si el archivo no aporta filas válidas).
+    """
+    cronometro = cronometro if cronometro is not None else Cronometro()
+    with cronometro.etapa('parseo'):
+        df = leer_reporte(archivo)
+    with cronometro.etapa('limpieza'):
+        return limpiar_reporte(df, fecha)
+
+
+def limpiar_reporte(df, fecha):
+    """Filtro de centros, fecha del reporte y normalización de valores"""
+    if df.columns.empty:
+        return pd.DataFrame()
+    
+    # FILTRO: Centros con 5 o más dígitos se omiten
+    if 'Centro' in df.columns:
+        df['Centro'] = df['Centro'].astype(str).str.strip()
+        df = df[df['Centro'].str.len() <= 4]
+    
+    if df.empty:
+        return pd.DataFrame()
+
+    df['Fecha_Reporte'] = fecha
+    df['Mes_Año'] = fecha.strftime('%Y-%m')
+    
+    if 'TEjec_Disp' in df.columns:
+        df['TEjec_Disp'] = normalizar_tiempo_disponible(df['TEjec_Disp'])
+    
+    if 'Artículo' in df.columns:
+        df['Artículo'] = df['Artículo'].astype(str).str.strip()
     
-    dfs = []
+    return df
+
+
+def _procesar_tarea(tarea):
+    """Unidad de trabajo de la ingesta (ejecutable en un proceso worker).
+
+    Con carpeta de caché, el reporte se busca primero por hash de contenido
+    y solo se parsea si no estaba (la lectura nueva se guarda). Con firmar,
+    mtime, tamaño y hash se toman una sola vez, antes de parsear, para que
+    describan exactamente el contenido leído.
+    Devuelve (fecha_str, DataFrame | None, mensaje_error | None, {etapa: segundos}, firma | None).
+    """
+    fecha_str, archivo, carpeta_cache, firmar = tarea
+    cronometro = Cronometro()
+    fecha = extraer_fecha_nombre(archivo.name)
+    if fecha is None:
+        return fecha_str, None, None, cronometro.etapas, None
+    firma = None
+    try:
+        if firmar or carpeta_cache is not None:
+            with cronometro.etapa('cache_lecturas' if carpeta_cache is not None else 'escaneo'):
+                st = archivo.stat()
+                contenido = hash_archivo(archivo)
+            if firmar:
+                firma = {'mtime': st.st_mtime, 'tamano': st.st_size, 'hash': contenido}
+        if carpeta_cache is None:
+            return fecha_str, procesar_archivo(archivo, fecha, cronometro), None, cronometro.etapas, firma
+        with cronometro.etapa('cache_lecturas'):
+            df = leer_cache(carpeta_cache, fecha_str, contenido, ETIQUETA_LECTURA)
+        if df is None:
+            df = procesar_archivo(archivo, fecha, cronometro)
+            with cronometro.etapa('cache_lecturas'):
+                guardar_cache(carpeta_cache, fecha_str, contenido, ETIQUETA_LECTURA, df)
+        return fecha_str, df, None, cronometro.etapas, firma
+    except Exception as e:
+        return fecha_str, None, str(e)[:60], cronometro.etapas, firma
+
+
+def procesar_lote(archivos_por_fecha, workers=1, carpeta_cache=None, cronometro=None, firmas=None):
+    """Procesa los archivos indicados en orden de nombre.
+
+    Con workers > 1 el parseo se reparte en un ProcessPoolExecutor; los
+    resultados se recogen en el mismo orden que la ejecución secuencial.
+    Con carpeta_cache se reutilizan las lecturas cacheadas por contenido.
+    Los tiempos por etapa de cada archivo se suman en cronometro (en
+    paralelo es tiempo acumulado de los workers, no tiempo de reloj).
+    Si se pasa el diccionario firmas, se rellena con {fecha_str: firma}
+    (mtime, tamaño y hash tomados antes de parsear cada archivo).
+    Devuelve ({fecha_str: DataFrame}, errores). Los archivos con error no
+    aparecen en el resultado.
+    """
+    tareas = [
+        (fecha_str, archivo, carpeta_cache, firmas is not None)
+        for fecha_str, archivo in sorted(archivos_por_fecha.items(), key=lambda kv: kv[1])
+    ]
+    resultados = {}
     errores = 0
     
-    for archivo in sorted(archivos_filtrados):
-        fecha = extraer_fecha_nombre(archivo.name)
-        if fecha is None:
-            continue
-        
-        try:
-            df = pd.read_excel(archivo)
-            columnas_mapeadas = {}
-            for col_std in COLUMNAS_REQUERIDAS:
-                col_real = encontrar_columna(df, col_std, COLUMNAS_ALTERNATIVAS)
-                if col_real:
-                    columnas_mapeadas[col_real] = col_std
-            
-            cols_existentes = [col for col in columnas_mapeadas.keys() if col in df.columns]
-            if not cols_existentes:
-                continue
-            
-            df = df[cols_existentes].copy()
-            df = df.rename(columns=columnas_mapeadas)
-            
-            # FILTRO: Centros con 5 o más dígitos se omiten
-            if 'Centro' in df.columns:
-                df['Centro'] = df['Centro'].astype(str).str.strip()
-                df = df[df['Centro'].str.len() <= 4]
-            
-            if df.empty:
-                continue
-
-            df['Fecha_Reporte'] = fecha
-            df['Mes_Año'] = fecha.strftime('%Y-%m')
-            
-            if 'TEjec_Disp' in df.columns:
-                df['TEjec_Disp'] = df['TEjec_Disp'].apply(limpiar_tiempo_disponible)
-            
-            if 'Artículo' in df.columns:
-                df['Artículo'] = df['Artículo'].astype(str).str.strip()
-            
-            dfs.append(df)
-            
-        except Exception as e:
-            errores += 1
-            print(f"  [ERROR] {archivo.name}: {str(e)[:60]}")
+    def recoger(salidas):
+        nonlocal errores
+        for (_, archivo, _, _), (fecha_str, df, error, etapas, firma) in zip(tareas, salidas):
+            if cronometro is not None:
+                cronometro.combinar(etapas)
+            if firma is not None:
+                firmas[fecha_str] = firma
+            if error is not None:
+                errores += 1
+                print(f"  [ERROR] {archivo.name}: {error}")
+            elif df is not None:
+                resultados[fecha_str] = df
+    
+    if workers > 1 and len(tareas) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tareas))) as executor:
+            recoger(executor.map(_procesar_tarea, tareas))
+    else:
+        recoger(map(_procesar_tarea, tareas))
+    
+    if errores:
+        print(f"[AVISO] {errores} archivos con error")
+    return resultados, errores
+
+
+def cargar_y_procesar_archivos(workers=1):
+    """Carga todos los archivos Excel y los procesa (solo el último archivo de cada día)"""
+    resultados, _ = procesar_lote(seleccionar_archivos(), workers=workers)
+    dfs = [df for df in resultados.values() if not df.empty]
     
     if dfs:
         return pd.concat(dfs, ignore_index=True)
     return pd.DataFrame()
 
 
+# ==========================================
+# CARGA INCREMENTAL (manifiesto + parciales diarios)
+# ==========================================
+
+def hash_archivo(ruta):
+    """SHA-256 del contenido de un archivo"""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as fh:
+        for bloque in iter(lambda: fh.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def leer_manifest():
+    """Manifiesto de archivos ya ingeridos: {fecha_str: entrada}"""
+    if not MANIFEST_FILE.exists():
+        return {}
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            contenido = json.load(f)
+        if contenido.get('version') != VERSION_MANIFEST:
+            return {}
+        return contenido.get('archivos', {})
+    except Exception as e:
+        print(f"[AVISO] Manifiesto ilegible, se reconstruye: {e}")
+        return {}
+
+
+def guardar_manifest(entradas):
+    CARPETA_PARCIALES.mkdir(parents=True, exist_ok=True)
+    temporal = MANIFEST_FILE.with_suffix('.tmp')
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump({'version': VERSION_MANIFEST, 'archivos': entradas}, f, indent=1, sort_keys=True)
+    os.replace(temporal, MANIFEST_FILE)
+
+
+def entrada_vigente(entrada, archivo):
+    """Comprueba si la entrada del manifiesto corresponde al archivo actual.
+
+    Si cambió el mtime pero no el contenido, actualiza la entrada y la da por buena.
+    """
+    if entrada is None or entrada.get('archivo') != archivo.name:
+        return False
+    if not (CARPETA_PARCIALES / entrada['parcial']).exists():
+        return False
+    st = archivo.stat()
+    if entrada.get('mtime') == st.st_mtime and entrada.get('tamano') == st.st_size:
+        return True
+    if entrada.get('hash') == hash_archivo(archivo):
+        entrada['mtime'] = st.st_mtime
+        entrada['tamano'] = st.st_size
+        return True
+    return False
+
+
+def agregado_diario(df):
+    """Agregado parcial de un día al grano más fino (Centro, Artículo, O.F).
+
+    Conserva las claves nulas para que las sumas por Centro coincidan con
+    las del dato bruto.
+    """
+    claves = ['Fecha_Reporte'] + [c for c in CLAVES_PARCIAL if c in df.columns]
+    if 'TEjec_Disp' not in df.columns:
+        df = df.assign(TEjec_Disp=float('nan'))
+    return df.groupby(claves, dropna=False, sort=True)['TEjec_Disp'].sum().reset_index()
+
+
+def cargar_incremental(reconstruir=False, workers=1, usar_cache=True, cronometro=None):
+    """Carga los datos procesando solo los archivos nuevos o modificados.
+
+    Devuelve la unión de los agregados parciales diarios, que calcular_analisis
+    consolida igual que el dato bruto. Con reconstruir=True se ignora el
+    manifiesto y se recalculan todos los parciales; los reportes sin cambios
+    salen de la caché de lecturas salvo con usar_cache=False.
+    """
+    cronometro = cronometro if cronometro is not None else Cronometro()
+    with cronometro.etapa('escaneo'):
+        archivos_por_fecha = seleccionar_archivos()
+        manifest = {} if reconstruir else leer_manifest()
+        
+        pendientes = {
+            fecha_str: archivo for fecha_str, archivo in archivos_por_fecha.items()
+            if not entrada_vigente(manifest.get(fecha_str), archivo)
+        }
+    print(f"[INFO] Incremental: {len(pendientes)} archivos nuevos o modificados, "
+          f"{len(archivos_por_fecha) - len(pendientes)} reutilizados")
+    
+    carpeta_cache = CARPETA_LECTURAS if usar_cache and HAY_PYARROW else None
+    firmas = {}
+    resultados, _ = procesar_lote(pendientes, workers=workers, carpeta_cache=carpeta_cache,
+                                  cronometro=cronometro, firmas=firmas)
+    if carpeta_cache is not None:
+        borrados, _ = recortar_cache(carpeta_cache, MAX_BYTES_LECTURAS)
+        if borrados:
+            print(f"[INFO] Caché de lecturas: {borrados} lecturas antiguas borradas por tamaño")
+    CARPETA_PARCIALES.mkdir(parents=True, exist_ok=True)
+    
+    with cronometro.etapa('agregacion'):
+        for fecha_str, archivo in pendientes.items():
+            manifest.pop(fecha_str, None)
+            if fecha_str not in resultados:
+                continue  # Error de lectura: se reintenta en la próxima ejecución
+            parcial = agregado_diario(resultados[fecha_str]) if not resultados[fecha_str].empty else pd.DataFrame()
+            nombre_parcial = f"{fecha_str}.pkl"
+            parcial.to_pickle(CARPETA_PARCIALES / nombre_parcial)
+            # Firma tomada antes de parsear: describe el contenido del parcial aunque el archivo cambie después
+            manifest[fecha_str] = {'archivo': archivo.name, **firmas[fecha_str], 'parcial': nombre_parcial}
+    
+    # Días que ya no están en la carpeta de origen
+    for fecha_str in [f for f in manifest if f not in archivos_por_fecha]:
+        manifest.pop(fecha_str)
+    for sobrante in CARPETA_PARCIALES.glob("*.pkl"):
+        if sobrante.stem not in manifest:
+            sobrante.unlink()
+    
+    guardar_manifest(manifest)
+    
+    with cronometro.etapa('agregacion'):
+        parciales = [pd.read_pickle(CARPETA_PARCIALES / manifest[f]['parcial']) for f in sorted(manifest)]
+        parciales = [p for p in parciales if not p.empty]
+        if not parciales:
+            return pd.DataFrame()
+        df_unificado = pd.concat(parciales, ignore_index=True)
+    # Claves que no aparecen en ningún archivo se eliminan (como en la carga completa)
+    vacias = [c for c in CLAVES_PARCIAL if c in df_unificado.columns and df_unificado[c].isna().all()]
+    return df_unificado.drop(columns=vacias)
+
+
+def codigos_clave(serie):
+    """Códigos enteros de una columna de agrupación (-1 = nulo) y sus valores, en el orden de groupby"""
+    codigos, unicos = pd.factorize(serie, sort=True)
+    # int32: los códigos se mantienen mientras se calculan los tres niveles
+    return codigos.astype('int32') if len(unicos) < 2**31 else codigos, unicos
+
+def sumar_por(claves, valores):
+    """Equivale a groupby(columnas)[valor].sum().reset_index() agrupando por códigos enteros.
+
+    claves: lista de (códigos, valores únicos) de codigos_clave. Los códigos
+    se combinan en un único identificador entero que conserva el orden
+    lexicográfico de las claves, así que los grupos y su orden son los de
+    groupby (claves ordenadas, filas con nulos excluidas) y cada suma recorre
+    las mismas filas en el mismo orden: el resultado es idéntico.
+    Devuelve ([códigos de cada clave], sumas).
+    """
+    tamanos = [len(unicos) for _, unicos in claves]
+    # Máscara de filas sin nulos en las claves (solo si alguna clave los tiene)
+    validos = None
+    for codigos, _ in claves:
+        if len(codigos) and codigos.min() < 0:
+            validos = codigos >= 0 if validos is None else validos & (codigos >= 0)
+
+    if np.prod(np.array(tamanos, dtype=float)) >= 2**63:
+        # Demasiadas combinaciones para un identificador int64: groupby por varias claves
+        filas = slice(None) if validos is None else validos
+        sumas = pd.Series(valores[filas]).groupby([codigos[filas] for codigos, _ in claves]).sum()
+        return [sumas.index.get_level_values(k).to_numpy() for k in range(len(claves))], sumas.to_numpy()
+
+    grupo = np.zeros(len(valores), dtype='int64')
+    for (codigos, _), tamano in zip(claves, tamanos):
+        grupo *= tamano
+        grupo += codigos
+    if validos is not None:
+        grupo, valores = grupo[validos], valores[validos]
+    sumas = pd.Series(valores).groupby(grupo).sum()
+    del grupo, validos
+    if sumas.empty:
+        return [np.array([], dtype='int64')] * len(claves), sumas.to_numpy()
+    return list(np.unravel_index(sumas.index.to_numpy(), tamanos)), sumas.to_numpy()
+
+def tabla_diaria(claves, valores, fechas, nombres):
+    """Tabla Fecha + claves + suma a partir de los códigos. Devuelve (tabla, código de fecha por fila)"""
+    niveles, sumas = sumar_por(claves, valores)
+    cod_fecha = niveles[0]
+    columnas = {nombres[0]: fechas[cod_fecha]}
+    # Cada nivel se libera en cuanto se materializa su columna (el nivel fino tiene casi tantas filas como la entrada)
+    for k, (nombre, (_, unicos)) in enumerate(zip(nombres[1:-1], claves[1:]), start=1):
+        columnas[nombre] = unicos.take(niveles[k])
+        niveles[k] = None
+    columnas[nombres[-1]] = sumas
+    return pd.DataFrame(columnas), cod_fecha
+
+def con_medias_mensuales(df, meses, clave):
+    """Añade Media_Mensual y Total_Mes de (Mes, clave) a cada fila diaria (transform, sin merge)"""
+    mensual = df.groupby([pd.Series(meses, index=df.index), df[clave]])['Carga_Dia']
+    return df.assign(Media_Mensual=mensual.transform('mean'), Total_Mes=mensual.transform('sum'))
+
 def calcular_analisis(df_unificado):
-    """Calcula la Media de Carga Diaria por Centro y por Artículo."""
+    """Calcula la Media de Carga Diaria por Centro y por Artículo.
+
+    Cada columna clave se factoriza una vez y los tres niveles (centro,
+    artículo y centro-artículo-O.F) se agrupan por códigos enteros sobre las
+    filas originales: las sumas no se recomponen desde el nivel más fino
+    porque cambiarían los últimos decimales. Fecha y Mes se convierten
+    sobre las fechas distintas, no fila a fila.
+    """
     
     if 'TEjec_Disp' not in df_unificado.columns:
         return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
     
-    # Análisis por Centro
-    df_diario_centro = df_unificado.groupby(['Fecha_Reporte', 'Centro'])['TEjec_Disp'].sum().reset_index()
-    df_diario_centro.columns = ['Fecha', 'Centro', 'Carga_Dia']
-    df_diario_centro['Fecha'] = pd.to_datetime(df_diario_centro['Fecha']).dt.date
-    df_diario_centro['Mes'] = pd.to_datetime(df_diario_centro['Fecha']).dt.strftime('%Y-%m')
+    valores = df_unificado['TEjec_Disp'].to_numpy()
+    clave_fecha = codigos_clave(df_unificado['Fecha_Reporte'])
+    clave_centro = codigos_clave(df_unificado['Centro'])
+    fechas_reporte = pd.to_datetime(clave_fecha[1])
+    fechas = np.asarray(fechas_reporte.date, dtype=object)
+    meses = np.asarray(fechas_reporte.strftime('%Y-%m'), dtype=object)
     
-    df_mensual_centro = df_diario_centro.groupby(['Mes', 'Centro'])['Carga_Dia'].agg(
-        Media_Mensual='mean',
-        Total_Mes='sum'
-    ).reset_index()
-    
-    media_por_centro = pd.merge(df_diario_centro, df_mensual_centro, on=['Mes', 'Centro'], how='left')
-    media_por_centro = media_por_centro[['Fecha', 'Centro', 'Carga_Dia', 'Media_Mensual', 'Total_Mes']]
-    
-    # Análisis por Artículo
     if 'Artículo' in df_unificado.columns:
-        df_diario_articulo = df_unificado.groupby(['Fecha_Reporte', 'Artículo'])['TEjec_Disp'].sum().reset_index()
-        df_diario_articulo.columns = ['Fecha', 'Artículo', 'Carga_Dia']
-        df_diario_articulo['Fecha'] = pd.to_datetime(df_diario_articulo['Fecha']).dt.date
-        df_diario_articulo['Mes'] = pd.to_datetime(df_diario_articulo['Fecha']).dt.strftime('%Y-%m')
-        
-        df_mensual_articulo = df_diario_articulo.groupby(['Mes', 'Artículo'])['Carga_Dia'].agg(
-            Media_Mensual='mean',
-            Total_Mes='sum'
-        ).reset_index()
+        clave_articulo = codigos_clave(df_unificado['Artículo'])
         
-        media_por_articulo = pd.merge(df_diario_articulo, df_mensual_articulo, on=['Mes', 'Artículo'], how='left')
-        media_por_articulo = media_por_articulo[['Fecha', 'Artículo', 'Carga_Dia', 'Media_Mensual', 'Total_Mes']]
-        
-        # NUEVO: Análisis Centro-Artículo (para desplegables en el ranking)
-        group_cols = ['Fecha_Reporte', 'Centro', 'Artículo']
+        # NUEVO: Análisis Centro-Artículo (para desplegables en el ranking).
+        # Primero el nivel más fino: es el mayor y así no coincide en memoria con las otras tablas
+        claves = [clave_fecha, clave_centro, clave_articulo]
+        nombres = ['Fecha', 'Centro', 'Articulo', 'Horas']
         if 'O.F' in df_unificado.columns:
-            group_cols.append('O.F')
-            
-        df_centro_articulo = df_unificado.groupby(group_cols)['TEjec_Disp'].sum().reset_index()
+            claves.append(codigos_clave(df_unificado['O.F']))
+            nombres.insert(3, 'OF')
+        df_centro_articulo, _ = tabla_diaria(claves, valores, fechas, nombres)
+        del claves
         
-        if 'O.F' in df_unificado.columns:
-            df_centro_articulo.columns = ['Fecha', 'Centro', 'Articulo', 'OF', 'Horas']
-        else:
-            df_centro_articulo.columns = ['Fecha', 'Centro', 'Articulo', 'Horas']
-            
-        df_centro_articulo['Fecha'] = pd.to_datetime(df_centro_articulo['Fecha']).dt.date
+        # Análisis por Artículo
+        media_por_articulo, cod_fecha = tabla_diaria([clave_fecha, clave_articulo], valores, fechas,
+                                                     ['Fecha', 'Artículo', 'Carga_Dia'])
+        media_por_articulo = con_medias_mensuales(media_por_articulo, meses[cod_fecha], 'Artículo')
     else:
         media_por_articulo = pd.DataFrame(columns=['Fecha', 'Artículo', 'Carga_Dia', 'Media_Mensual', 'Total_Mes'])
         df_centro_articulo = pd.DataFrame(columns=['Fecha', 'Centro', 'Articulo', 'Horas'])
+    
+    # Análisis por Centro
+    media_por_centro, cod_fecha = tabla_diaria([clave_fecha, clave_centro], valores, fechas,
+                                               ['Fecha', 'Centro', 'Carga_Dia'])
+    media_por_centro = con_medias_mensuales(media_por_centro, meses[cod_fecha], 'Centro')
 
     return media_por_centro, media_por_articulo, df_centro_articulo
 
 
-def export_excel(media_por_centro, media_por_articulo, df_centro_articulo):
-    """Genera archivo Excel con hojas de datos y rankings."""
+def top_por_fecha(df, n=TOP_RANKING):
+    """Las n filas de mayor Carga_Dia de cada Fecha con su posición.
+
+    Equivale a df[df['Fecha'] == f].nlargest(n, 'Carga_Dia') para cada día,
+    en una sola pasada: orden estable descendente (los empates conservan el
+    orden original, como keep='first'), head(n) por grupo y cumcount.
+    """
+    df = df[df['Carga_Dia'].notna()].sort_values('Carga_Dia', ascending=False, kind='stable')
+    df = df.groupby('Fecha', sort=False).head(n)
+    return df.assign(Ranking=df.groupby('Fecha', sort=False).cumcount() + 1)
+
+def calcular_rankings(media_por_centro, media_por_articulo, n=TOP_RANKING):
+    """Hoja Rankings: top n diario de centros y de artículos"""
+    partes = []
+    if not media_por_centro.empty:
+        df_c = top_por_fecha(media_por_centro, n)
+        partes.append(df_c.assign(Tipo='Centro', Articulo='')[COLUMNAS_RANKING])
+    if not media_por_articulo.empty:
+        df_a = top_por_fecha(media_por_articulo, n).rename(columns={'Artículo': 'Articulo'})
+        partes.append(df_a.assign(Tipo='Artículo', Centro='')[COLUMNAS_RANKING])
     
+    if not partes:
+        return pd.DataFrame(columns=COLUMNAS_RANKING)
+    df_rankings = pd.concat(partes, ignore_index=True)
+    return df_rankings.sort_values(['Fecha', 'Tipo', 'Ranking'])
+
+def valores_celda(serie):
+    """Valores de una columna listos para write_row (nulos como None, tipos Python)"""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        valores = pd.Series(serie.dt.to_pydatetime(), index=serie.index, dtype=object)
+    else:
+        valores = serie.astype(object)
+    return valores.where(serie.notna(), None).tolist()
+
+def valores_excel(df):
+    """Tabla con los valores que devuelve pd.read_excel al leerla del Excel V2.
+
+    xlsxwriter escribe los números con 16 cifras significativas y, al leer,
+    cada columna pasa por la inferencia de tipos de TextParser (códigos
+    guardados como texto vuelven como números, '' como nulo). El almacén
+    Arrow se escribe con estos valores para que el servidor responda lo mismo
+    desde el almacén que desde el Excel. Se convierten solo los valores
+    distintos de cada columna.
+    """
+    columnas = {}
+    for col in df.columns:
+        serie = df[col]
+        if col == 'Fecha' or pd.api.types.is_bool_dtype(serie) or pd.api.types.is_integer_dtype(serie):
+            columnas[col] = serie
+            continue
+        codigos, distintos = pd.factorize(serie)
+        if pd.api.types.is_float_dtype(serie):
+            valores = np.array([float(f"{v:.16G}") for v in distintos] + [np.nan])
+        else:
+            celdas = [valor_celda(float(f"{v:.16G}") if isinstance(v, float) else v) for v in distintos]
+            # Los nulos se escriben como celda vacía (cuenta para la inferencia de la columna)
+            celdas += [""] if (codigos < 0).any() else []
+            valores = TextParser([[col]] + [[v] for v in celdas], header=0, skip_blank_lines=False).read()[col]
+            valores = valores.to_numpy()
+        columnas[col] = pd.Series(valores[codigos], index=df.index, name=col)
+    return pd.DataFrame(columnas, index=df.index)
+
+def escribir_excel_streaming(hojas, ruta):
+    """Excel en modo constant_memory: cada hoja se escribe fila a fila y se
+    vuelca a disco al avanzar, sin mantener el libro en memoria.
+
+    Este modo no admite tablas con estilo (add_table); se deja autofiltro y
+    cabecera fija.
+    """
+    workbook = xlsxwriter.Workbook(str(ruta), {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss'
+    })
+    cabecera = workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+    for nombre, df in hojas.items():
+        ws = workbook.add_worksheet(nombre)
+        ws.write_row(0, 0, [str(c) for c in df.columns], cabecera)
+        columnas = [valores_celda(df[c]) for c in df.columns]
+        for fila, valores in enumerate(zip(*columnas), start=1):
+            ws.write_row(fila, 0, valores)
+        if len(df) > 0:
+            ws.autofilter(0, 0, len(df), len(df.columns) - 1)
+        ws.freeze_panes(1, 0)
+    workbook.close()
+
+def export_excel(media_por_centro, media_por_articulo, df_centro_articulo, modo_excel='completo'):
+    """Genera archivo Excel con hojas de datos y rankings, más el almacén columnar.
+
+    modo_excel: 'completo' (tablas con estilo), 'rapido' (streaming con
+    memoria constante) o 'no' (solo el almacén columnar).
+    Devuelve las tablas que lee el servidor con los valores del Excel
+    (valores_excel), listas para exportar_sqlite.
+    """
+    df_rankings = calcular_rankings(media_por_centro, media_por_articulo)
+    if modo_excel == 'no' and not HAY_PYARROW:
+        print("[AVISO] Sin pyarrow no hay almacén columnar: se genera el Excel en modo rápido")
+        modo_excel = 'rapido'
+    
+    if modo_excel == 'rapido':
+        hojas = {
+            'Datos_Centros': media_por_centro,
+            'Datos_Articulos': media_por_articulo,
+            'Datos_Centro_Articulo': df_centro_articulo
+        }
+        if not df_rankings.empty:
+            hojas['Rankings'] = df_rankings
+        escribir_excel_streaming(hojas, OUTPUT_FILE)
+    
+    if modo_excel == 'completo':
+        escribir_excel_completo(media_por_centro, media_por_articulo, df_centro_articulo, df_rankings)
+    
+    # Almacén columnar tipado para el servidor (el Excel queda para consulta humana), con los valores del Excel
+    tablas = {
+        'Datos_Centros': valores_excel(media_por_centro),
+        'Datos_Centro_Articulo': valores_excel(df_centro_articulo),
+        'Rankings': valores_excel(df_rankings)
+    }
+    if HAY_PYARROW:
+        escribir_almacen(tablas, OUTPUT_ARROW)
+    else:
+        print("[AVISO] pyarrow no disponible: no se genera el almacén columnar")
+    return tablas
+
+def exportar_sqlite(tablas):
+    """Base SQLite con las tablas normalizadas tal como el servidor las cargaría del almacén o del Excel.
+    tablas: las que devuelve export_excel (en memoria, sin releer lo que se acaba de escribir)"""
+    normalizadas = normalizar_tablas(*(tablas[nombre] for nombre in TABLAS_SQLITE))
+    escribir_base(dict(zip(TABLAS_SQLITE, normalizadas)), OUTPUT_SQLITE)
+
+def escribir_excel_completo(media_por_centro, media_por_articulo, df_centro_articulo, df_rankings):
+    """Excel para consulta humana: una tabla con estilo por hoja"""
     with pd.ExcelWriter(OUTPUT_FILE, engine='xlsxwriter') as writer:
         # Hoja Datos_Centros
         media_por_centro.to_excel(writer, sheet_name='Datos_Centros', index=False)
@@ -236,30 +758,7 @@ def export_excel(media_por_centro, media_por_articulo, df_centro_articulo):
             })
         
         # Hoja Rankings
-        rankings_centros = []
-        for fecha in media_por_centro['Fecha'].unique():
-            df_fecha = media_por_centro[media_por_centro['Fecha'] == fecha].copy()
-            df_fecha = df_fecha.nlargest(15, 'Carga_Dia')
-            df_fecha['Ranking'] = range(1, len(df_fecha) + 1)
-            df_fecha['Tipo'] = 'Centro'
-            df_fecha['Articulo'] = ''
-            df_fecha = df_fecha[['Fecha', 'Tipo', 'Ranking', 'Centro', 'Articulo', 'Carga_Dia', 'Media_Mensual', 'Total_Mes']]
-            rankings_centros.append(df_fecha)
-        
-        rankings_articulos = []
-        for fecha in media_por_articulo['Fecha'].unique():
-            df_fecha = media_por_articulo[media_por_articulo['Fecha'] == fecha].copy()
-            df_fecha = df_fecha.nlargest(15, 'Carga_Dia')
-            df_fecha['Ranking'] = range(1, len(df_fecha) + 1)
-            df_fecha['Tipo'] = 'Artículo'
-            df_fecha['Centro'] = ''
-            df_fecha = df_fecha.rename(columns={'Artículo': 'Articulo'})
-            df_fecha = df_fecha[['Fecha', 'Tipo', 'Ranking', 'Centro', 'Articulo', 'Carga_Dia', 'Media_Mensual', 'Total_Mes']]
-            rankings_articulos.append(df_fecha)
-        
-        if rankings_centros or rankings_articulos:
-            df_rankings = pd.concat(rankings_centros + rankings_articulos, ignore_index=True)
-            df_rankings = df_rankings.sort_values(['Fecha', 'Tipo', 'Ranking'])
+        if not df_rankings.empty:
             df_rankings.to_excel(writer, sheet_name='Rankings', index=False)
             ws_rankings = writer.sheets['Rankings']
             num_rows_r = len(df_rankings)
@@ -271,19 +770,60 @@ def export_excel(media_por_centro, media_por_articulo, df_centro_articulo):
                     'columns': [{'header': col} for col in df_rankings.columns]
                 })
 
+def registrar_etapas(cronometro, **datos):
+    """Imprime los tiempos por etapa y los añade al log de ejecuciones (JSON por línea)"""
+    etapas = {nombre: round(segundos, 3) for nombre, segundos in cronometro.etapas.items()}
+    print("[INFO] Tiempos por etapa: " + " | ".join(f"{n} {s:.2f}s" for n, s in etapas.items()))
+    registro = {'fecha': pd.Timestamp.now().isoformat(timespec='seconds'), 'etapas': etapas, **datos}
+    try:
+        LOG_ETAPAS.parent.mkdir(parents=True, exist_ok=True)
+        with open(LOG_ETAPAS, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"[AVISO] No se pudo escribir {LOG_ETAPAS}: {e}")
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Análisis mensual de tiempos (ETL)")
+    parser.add_argument('--full-rebuild', action='store_true',
+                        help="Ignora el manifiesto incremental y recalcula todos los días")
+    parser.add_argument('--sin-cache', action='store_true',
+                        help="No usa la caché de lecturas: vuelve a parsear todos los xlsx procesados")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Procesos para leer los reportes diarios en paralelo (0 = todos los núcleos)")
+    parser.add_argument('--excel', choices=MODOS_EXCEL, default='completo',
+                        help="Excel V2: 'completo' con tablas, 'rapido' en streaming o 'no' (solo almacén columnar)")
+    parser.add_argument('--sqlite', action='store_true',
+                        help="Genera también la base SQLite para el servidor con --motor sqlite")
+    args = parser.parse_args()
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    cronometro = Cronometro()
+    
     print("[PASO 1] Cargando datos...")
-    df_unificado = cargar_y_procesar_archivos()
+    df_unificado = cargar_incremental(reconstruir=args.full_rebuild, workers=workers,
+                                      usar_cache=not args.sin_cache, cronometro=cronometro)
     if df_unificado.empty:
         print("[ERROR] No hay datos")
         return
     
     print("[PASO 2] Procesando KPIs...")
-    media_por_centro, media_por_articulo, df_centro_articulo = calcular_analisis(df_unificado)
+    with cronometro.etapa('agregacion'):
+        media_por_centro, media_por_articulo, df_centro_articulo = calcular_analisis(df_unificado)
     
     print("[PASO 3] Exportando V2...")
-    export_excel(media_por_centro, media_por_articulo, df_centro_articulo)
-    print(f"[OK] Generado: {OUTPUT_FILE}")
+    with cronometro.etapa('exportacion'):
+        tablas = export_excel(media_por_centro, media_por_articulo, df_centro_articulo, modo_excel=args.excel)
+    if args.sqlite:
+        with cronometro.etapa('sqlite'):
+            exportar_sqlite(tablas)
+    registrar_etapas(cronometro, filas=len(df_unificado), workers=workers, excel=args.excel,
+                     reconstruir=args.full_rebuild, sqlite=args.sqlite)
+    if args.excel != 'no' or not HAY_PYARROW:
+        print(f"[OK] Generado: {OUTPUT_FILE}")
+    if HAY_PYARROW:
+        print(f"[OK] Generado: {OUTPUT_ARROW}")
+    if args.sqlite:
+        print(f"[OK] Generado: {OUTPUT_SQLITE}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+BUSQUEDA DE ARTICULOS Y O.F.
+============================
+Índice de prefijos sobre Artículo y O.F. construido una vez por versión de
+datos a partir de las horas por (Artículo/O.F., Centro, Mes), no de las filas
+diarias de Datos_Centro_Articulo.
+
+  - Cada combinación Artículo/O.F. es un ítem; los ítems se numeran de mayor
+    a menor total de horas, así que ordenar las posiciones encontradas ya da
+    el ranking sin volver a ordenar por horas.
+  - Por cada campo se guardan los textos distintos normalizados (casefold)
+    ordenados y los ítems ordenados por el puesto de su texto: un prefijo es
+    un intervalo contiguo de textos y, con él, de ítems (búsquedas binarias).
+  - Las filas (centro, mes, horas) de cada ítem son un bloque contiguo; solo
+    se recorren las de los ítems de la página pedida.
+"""
+import numpy as np
+import pandas as pd
+
+# Campos de búsqueda: nombre del parámetro -> columna
+CAMPOS = {'articulo': 'Articulo', 'of': 'OF'}
+# Mayor carácter Unicode: cota superior de todos los textos que empiezan por un prefijo
+_FIN_PREFIJO = '\U0010ffff'
+
+
+def normalizar_texto(texto):
+    """Forma de comparación de los textos (sin distinguir mayúsculas)"""
+    return str(texto).strip().casefold()
+
+
+def _ordenar(claves):
+    """Como np.lexsort con las claves en orden de prioridad (estable), con un único argsort.
+
+    Las claves enteras se combinan en una sola de int64 mientras el producto
+    de sus rangos quepa; si además cabe la posición, la clave es única y vale
+    el quicksort, bastante más rápido que la ordenación estable.
+    """
+    n = len(claves[0])
+    claves = [np.asarray(c, dtype=np.int64) for c in claves] + [np.arange(n, dtype=np.int64)]
+    combinada = np.zeros(n, dtype=np.int64)
+    capacidad = 1
+    for k, clave in enumerate(claves):
+        minimo = int(clave.min()) if n else 0
+        rango = int(clave.max()) - minimo + 1 if n else 1
+        if capacidad * rango >= 2**62:
+            if k < len(claves) - 1:
+                return np.lexsort(claves[::-1])
+            return np.argsort(combinada, kind='stable')
+        capacidad *= rango
+        combinada = combinada * rango + (clave - minimo)
+    return np.argsort(combinada)
+
+
+class IndiceBusqueda:
+    """Búsqueda por prefijo de Artículo/O.F. con sus centros, meses y horas totales"""
+
+    def __init__(self, horas_mes, columnas):
+        """horas_mes: una fila por (columnas, Centro, Mes) con la suma de Horas"""
+        self.columnas = [c for c in columnas if c in horas_mes.columns]
+        self.claves = {}
+        if horas_mes.empty:
+            self.articulos = self.ofs = np.array([], dtype=object)
+            self.total = np.array([])
+            self.inicio = np.zeros(1, dtype=np.int64)
+            self.centros = self.meses = np.array([], dtype=object)
+            self.centro = self.mes = np.array([], dtype=np.intp)
+            self.horas = np.array([])
+            return
+
+        item = horas_mes.groupby(self.columnas, observed=True, sort=False).ngroup().to_numpy()
+        horas = horas_mes['Horas'].to_numpy(dtype='float64')
+        total = np.bincount(item, weights=horas)
+        _, primera_fila = np.unique(item, return_index=True)
+        valores, puestos, textos = {}, {}, {}
+        for c in self.columnas:
+            # Se normalizan los valores distintos, no ítem a ítem; el puesto es el orden alfabético del texto
+            codigos, distintos = pd.factorize(horas_mes[c].iloc[primera_fila])
+            textos[c], puesto = np.unique(np.array([normalizar_texto(v) for v in distintos], dtype=str),
+                                          return_inverse=True)
+            valores[c] = np.asarray(distintos, dtype=object).take(codigos)
+            puestos[c] = puesto.astype(np.int32).take(codigos)
+
+        # Puesto de cada ítem en el ranking por horas mostradas (redondeadas: el ranking no depende del orden
+        # de suma de cada motor) y, a igualdad de horas, por texto
+        orden_items = _ordenar([np.rint(-total * 100)] + [puestos[c] for c in self.columnas])
+        rango = np.empty_like(orden_items)
+        rango[orden_items] = np.arange(len(orden_items))
+        self.total = total[orden_items]
+        self.articulos = valores['Articulo'][orden_items]
+        self.ofs = valores['OF'][orden_items] if 'OF' in self.columnas else None
+        for campo, columna in CAMPOS.items():
+            if columna in textos:
+                # Textos distintos ordenados + ítems ordenados por el puesto de su texto
+                puesto = puestos[columna][orden_items]
+                items = _ordenar([puesto])
+                self.claves[campo] = (textos[columna], puesto[items], items)
+
+        # Filas agrupadas por ítem en orden de ranking: cada ítem es un bloque contiguo
+        rango_filas = rango[item]
+        orden = _ordenar([rango_filas])
+        self.inicio = np.searchsorted(rango_filas[orden], np.arange(len(total) + 1))
+        # Centros y meses como códigos sobre sus valores distintos (texto solo de los distintos)
+        cod_centro, centros = pd.factorize(horas_mes['Centro'])
+        cod_mes, meses = pd.factorize(horas_mes['Mes'])
+        self.centros = np.asarray(centros.astype(str), dtype=object)
+        self.meses = np.asarray(meses.astype(str), dtype=object)
+        self.centro = cod_centro[orden]
+        self.mes = cod_mes[orden]
+        self.horas = horas[orden]
+
+    @property
+    def vacio(self):
+        return len(self.total) == 0
+
+    def buscar(self, texto, campos, offset=0, limit=None):
+        """Ítems cuyo campo empieza por el texto: (total de coincidencias, ítems de la página por horas)"""
+        prefijo = normalizar_texto(texto)
+        if not prefijo:
+            # El prefijo vacío coincidiría con todo el índice
+            return 0, []
+        encontrados = [self._prefijo(campo, prefijo) for campo in campos if campo in self.claves]
+        ids = np.concatenate(encontrados) if encontrados else np.array([], dtype=np.int64)
+        # El número de ítem es su puesto en el ranking; un ítem puede coincidir por los dos campos
+        if len(ids) > len(self.total) // 16:
+            marcados = np.zeros(len(self.total), dtype=bool)
+            marcados[ids] = True
+            ids = np.flatnonzero(marcados)
+        else:
+            ids = np.unique(ids)
+        pagina = ids[offset:offset + limit if limit is not None else None]
+        return len(ids), [self.item(i) for i in pagina]
+
+    def _prefijo(self, campo, prefijo):
+        """Ítems cuyo texto del campo empieza por el prefijo (intervalos de los arrays ordenados)"""
+        textos, puestos, items = self.claves[campo]
+        # Cotas con el mismo tipo que el array: con un texto más largo NumPy copiaría el array entero
+        largo = textos.dtype.itemsize // np.dtype('U1').itemsize
+        if len(prefijo) > largo:
+            return items[:0]
+        cotas = np.array([prefijo, prefijo + _FIN_PREFIJO], dtype=textos.dtype)
+        primero = np.searchsorted(textos, cotas[:1], side='left')[0]
+        ultimo = np.searchsorted(textos, cotas[1:], side='right')[0]
+        a, b = np.searchsorted(puestos, np.array([primero, ultimo], dtype=puestos.dtype), side='left')
+        return items[a:b]
+
+    def item(self, i):
+        """Artículo/O.F., horas totales y reparto por centro y meses con horas"""
+        a, b = self.inicio[i], self.inicio[i + 1]
+        horas_centro = {}
+        for centro, horas in zip(self.centros[self.centro[a:b]], self.horas[a:b]):
+            horas_centro[centro] = horas_centro.get(centro, 0.0) + horas
+        centros = sorted(horas_centro.items(), key=lambda par: (-par[1], par[0]))
+        resultado = {"articulo": self.articulos[i]}
+        if self.ofs is not None:
+            resultado["of"] = self.ofs[i]
+        resultado.update({
+            "total_horas": round(float(self.total[i]), 2),
+            "centros": [{"id": c, "horas": round(float(h), 2)} for c, h in centros],
+            "meses": sorted(self.meses[np.unique(self.mes[a:b])])
+        })
+        return resultado
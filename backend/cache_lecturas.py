@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+CACHE DE LECTURAS DEL ETL
+=========================
+Guarda en disco el DataFrame limpio y con columnas mapeadas de cada reporte
+diario (salida de procesar_archivo) como fichero Arrow IPC. La clave es la
+fecha del reporte, el hash SHA-256 del contenido del xlsx y una etiqueta de
+esquema que cambia con la lógica de lectura: un reporte histórico sin
+cambios no se vuelve a parsear aunque se reconstruya el análisis completo.
+
+Las columnas object (p.ej. O.F con números y texto) no caben en un tipo
+Arrow: se guardan como texto JSON y se decodifican al leer (solo los valores
+distintos). Si alguna no es serializable, ese reporte no se cachea.
+
+El tamaño total está acotado: al superar el límite se borran las lecturas
+usadas hace más tiempo (cada acierto actualiza el mtime del fichero).
+
+Uso:
+    python backend/cache_lecturas.py info
+    python backend/cache_lecturas.py limpiar [--obsoletas]
+    python backend/cache_lecturas.py recortar --max-mb 500
+"""
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    HAY_PYARROW = True
+except ImportError:  # Entorno portable sin pyarrow: sin caché de lecturas
+    pa = None
+    ipc = None
+    HAY_PYARROW = False
+
+CARPETA_LECTURAS = Path(__file__).parent.resolve() / "cache_etl" / "lecturas"
+EXTENSION = ".arrow"
+MAX_BYTES_LECTURAS = 1024 * 1024 * 1024
+CLAVE_COLUMNAS_JSON = b"rpk_columnas_json"
+
+
+def etiqueta_esquema(*partes):
+    """Etiqueta corta que identifica la lógica de lectura (versión, columnas, alias...)"""
+    return hashlib.sha1(json.dumps(partes, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:10]
+
+
+def ruta_lectura(carpeta, fecha_str, hash_contenido, etiqueta):
+    return Path(carpeta) / f"{fecha_str}_{hash_contenido[:32]}_{etiqueta}{EXTENSION}"
+
+
+def leer_cache(carpeta, fecha_str, hash_contenido, etiqueta):
+    """DataFrame cacheado del reporte (None si no hay o no se puede leer)"""
+    ruta = ruta_lectura(carpeta, fecha_str, hash_contenido, etiqueta)
+    if not HAY_PYARROW or not ruta.exists():
+        return None
+    try:
+        with pa.memory_map(str(ruta), 'r') as fuente:
+            tabla = ipc.open_file(fuente).read_all()
+        df = tabla.to_pandas()
+        for col in json.loads((tabla.schema.metadata or {}).get(CLAVE_COLUMNAS_JSON, b"[]")):
+            codigos, textos = pd.factorize(df[col].to_numpy(dtype=object))
+            valores = np.array([json.loads(t) for t in textos] + [None], dtype=object)
+            df[col] = pd.Series(valores[codigos], index=df.index, dtype=object)
+        os.utime(ruta)
+        return df
+    except Exception as e:
+        print(f"  [AVISO] Lectura cacheada ilegible ({ruta.name}): {e}")
+        return None
+
+
+def guardar_cache(carpeta, fecha_str, hash_contenido, etiqueta, df):
+    """Guarda el DataFrame del reporte (escritura atómica). Devuelve False si no es cacheable"""
+    if not HAY_PYARROW:
+        return False
+    try:
+        columnas_json = [c for c in df.columns if df[c].dtype == object]
+        codificado = df.assign(**{
+            c: df[c].map(lambda v: json.dumps(v, allow_nan=True)).astype(object) for c in columnas_json
+        })
+        tabla = pa.Table.from_pandas(codificado)
+        metadata = dict(tabla.schema.metadata or {})
+        metadata[CLAVE_COLUMNAS_JSON] = json.dumps(columnas_json).encode('utf-8')
+        tabla = tabla.replace_schema_metadata(metadata)
+    except (TypeError, ValueError, pa.ArrowException):
+        return False
+
+    ruta = ruta_lectura(carpeta, fecha_str, hash_contenido, etiqueta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_name(f".{ruta.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(temporal), 'wb') as sink:
+        with ipc.new_file(sink, tabla.schema) as writer:
+            writer.write_table(tabla)
+    os.replace(temporal, ruta)
+    return True
+
+
+def entradas_cache(carpeta):
+    """Lecturas cacheadas, de la más antigua a la más reciente: [(ruta, bytes, mtime, etiqueta)]"""
+    carpeta = Path(carpeta)
+    if not carpeta.exists():
+        return []
+    entradas = []
+    for ruta in carpeta.glob(f"*{EXTENSION}"):
+        st = ruta.stat()
+        entradas.append((ruta, st.st_size, st.st_mtime, ruta.stem.rsplit('_', 1)[-1]))
+    return sorted(entradas, key=lambda e: e[2])
+
+
+def recortar_cache(carpeta, max_bytes=MAX_BYTES_LECTURAS):
+    """Borra las lecturas menos usadas hasta quedar por debajo de max_bytes. Devuelve (ficheros, bytes)"""
+    entradas = entradas_cache(carpeta)
+    total = sum(e[1] for e in entradas)
+    borrados, liberados = 0, 0
+    for ruta, tamano, _, _ in entradas:
+        if total - liberados <= max_bytes:
+            break
+        ruta.unlink(missing_ok=True)
+        borrados += 1
+        liberados += tamano
+    return borrados, liberados
+
+
+def limpiar_cache(carpeta, etiqueta_vigente=None):
+    """Borra todas las lecturas, o solo las de otra etiqueta de esquema si se indica la vigente"""
+    borrados, liberados = 0, 0
+    for ruta, tamano, _, etiqueta in entradas_cache(carpeta):
+        if etiqueta_vigente is None or etiqueta != etiqueta_vigente:
+            ruta.unlink(missing_ok=True)
+            borrados += 1
+            liberados += tamano
+    for temporal in Path(carpeta).glob(".*.tmp") if Path(carpeta).exists() else []:
+        temporal.unlink(missing_ok=True)
+    return borrados, liberados
+
+
+def main():
+    from analisis_mensual_tiempos import ETIQUETA_LECTURA
+
+    parser = argparse.ArgumentParser(description="Inspección y limpieza de la caché de lecturas del ETL")
+    parser.add_argument('--carpeta', type=Path, default=CARPETA_LECTURAS)
+    sub = parser.add_subparsers(dest='orden', required=True)
+    sub.add_parser('info', help="Resumen de la caché")
+    limpiar = sub.add_parser('limpiar', help="Borra la caché")
+    limpiar.add_argument('--obsoletas', action='store_true',
+                         help="Solo las lecturas de versiones anteriores de la lógica de lectura")
+    recortar = sub.add_parser('recortar', help="Reduce la caché al tamaño indicado (LRU)")
+    recortar.add_argument('--max-mb', type=float, required=True)
+    args = parser.parse_args()
+
+    if args.orden == 'info':
+        entradas = entradas_cache(args.carpeta)
+        total = sum(e[1] for e in entradas)
+        vigentes = [e for e in entradas if e[3] == ETIQUETA_LECTURA]
+        print(f"[INFO] Carpeta: {args.carpeta}")
+        print(f"[INFO] Esquema vigente: {ETIQUETA_LECTURA} | pyarrow: {'sí' if HAY_PYARROW else 'no (caché desactivada)'}")
+        print(f"[INFO] {len(entradas)} lecturas, {total / 2**20:.1f} MB "
+              f"(límite {MAX_BYTES_LECTURAS / 2**20:.0f} MB) | vigentes: {len(vigentes)}, "
+              f"obsoletas: {len(entradas) - len(vigentes)}")
+        fechas = sorted(e[0].name.split('_', 1)[0] for e in vigentes)
+        if fechas:
+            print(f"[INFO] Reportes cacheados: {fechas[0]} .. {fechas[-1]}")
+    elif args.orden == 'limpiar':
+        borrados, liberados = limpiar_cache(args.carpeta, ETIQUETA_LECTURA if args.obsoletas else None)
+        print(f"[OK] {borrados} lecturas borradas ({liberados / 2**20:.1f} MB)")
+    else:
+        borrados, liberados = recortar_cache(args.carpeta, int(args.max_mb * 2**20))
+        print(f"[OK] {borrados} lecturas borradas ({liberados / 2**20:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
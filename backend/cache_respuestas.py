@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+CACHE DE RESPUESTAS DE LA API
+=============================
+LRU en proceso con las respuestas JSON ya serializadas de los endpoints de
+datos. La clave combina la versión de datos cargada y los parámetros
+normalizados de la consulta; al publicarse una versión nueva se vacía y las
+respuestas que aún llegan calculadas con la anterior no se guardan.
+Cada entrada lleva ETag y Last-Modified para que el navegador revalide con
+un 304 en lugar de volver a descargar. Las respuestas grandes se guardan
+también comprimidas (gzip y, si está instalado, brotli): se comprimen una
+vez al entrar en el cache, no en cada petición.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
+
+try:
+    import brotli
+    HAY_BROTLI = True
+except ImportError:  # Entorno portable sin brotli: solo gzip
+    brotli = None
+    HAY_BROTLI = False
+
+# Límites del cache (lo que se alcance antes provoca expulsión LRU)
+MAX_ENTRADAS = 512
+MAX_BYTES = 64 * 1024 * 1024
+
+# Por debajo de este tamaño no compensa comprimir
+TAMANO_MINIMO_COMPRESION = 1024
+
+COMPRESORES = {"gzip": lambda cuerpo: gzip.compress(cuerpo, compresslevel=6)}
+if HAY_BROTLI:
+    COMPRESORES["br"] = lambda cuerpo: brotli.compress(cuerpo, quality=5)
+
+
+@dataclass(frozen=True)
+class EntradaCache:
+    cuerpo: bytes
+    etag: str
+    last_modified: float
+    # Codificación -> cuerpo comprimido
+    comprimidos: dict = field(default_factory=dict, compare=False, repr=False)
+
+    @property
+    def tamano(self):
+        return len(self.cuerpo) + sum(len(c) for c in self.comprimidos.values())
+
+    @property
+    def cabeceras(self):
+        return self.variante(None)[1]
+
+    def variante(self, codificacion):
+        """Cuerpo y cabeceras para la codificación pedida (None = sin comprimir)"""
+        cabeceras = {
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding"
+        }
+        if codificacion not in self.comprimidos:
+            return self.cuerpo, cabeceras
+        # Cada representación lleva su propio ETag fuerte
+        cabeceras["ETag"] = f'{self.etag[:-1]}-{codificacion}"'
+        cabeceras["Content-Encoding"] = codificacion
+        return self.comprimidos[codificacion], cabeceras
+
+
+def codificacion_preferida(cabeceras):
+    """Mejor codificación admitida por el cliente según Accept-Encoding ('br', 'gzip' o None)"""
+    aceptadas = set()
+    for parte in cabeceras.get("accept-encoding", "").split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        if parametros.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        aceptadas.add(nombre.strip().lower())
+    for codificacion in ("br", "gzip"):
+        if codificacion in COMPRESORES and (codificacion in aceptadas or "*" in aceptadas):
+            return codificacion
+    return None
+
+
+def no_modificado(cabeceras, etag, last_modified):
+    """Evalúa If-None-Match / If-Modified-Since de la petición contra la representación"""
+    if_none_match = cabeceras.get("if-none-match")
+    if if_none_match is not None:
+        etiquetas = [e.strip() for e in if_none_match.split(",")]
+        return "*" in etiquetas or etag in etiquetas or f"W/{etag}" in etiquetas
+    if_modified_since = cabeceras.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class CacheRespuestas:
+    """LRU acotado por número de entradas y por bytes, ligado a una versión de datos"""
+
+    def __init__(self, max_entradas=MAX_ENTRADAS, max_bytes=MAX_BYTES):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def _sincronizar_version(self, version):
+        # Una versión de datos nueva invalida todas las respuestas anteriores
+        if version != self._version:
+            self._entradas.clear()
+            self._bytes = 0
+            self._version = version
+
+    def obtener(self, version, clave):
+        with self._lock:
+            self._sincronizar_version(version)
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada
+
+    def guardar(self, version, clave, cuerpo, last_modified):
+        etag = '"%s-%s"' % (version, hashlib.sha1(cuerpo).hexdigest()[:16])
+        comprimidos = {}
+        if len(cuerpo) >= TAMANO_MINIMO_COMPRESION:
+            comprimidos = {cod: comprimir(cuerpo) for cod, comprimir in COMPRESORES.items()}
+        entrada = EntradaCache(cuerpo, etag, last_modified, comprimidos)
+        with self._lock:
+            # La versión vigente la fija obtener(): una respuesta calculada con una versión ya
+            # sustituida (petición lenta durante el cambio de datos) no se guarda ni vacía el cache
+            if version != self._version or entrada.tamano > self.max_bytes:
+                return entrada
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self._bytes -= anterior.tamano
+            self._entradas[clave] = entrada
+            self._bytes += entrada.tamano
+            while len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes:
+                _, expulsada = self._entradas.popitem(last=False)
+                self._bytes -= expulsada.tamano
+                self.expulsiones += 1
+        return entrada
+
+    def invalidar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "entries": len(self._entradas),
+                "bytes": self._bytes,
+                "hits": self.aciertos,
+                "misses": self.fallos,
+                "evictions": self.expulsiones
+            }
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+CUBO DE CARGA CENTRO x DIA
+==========================
+Matriz densa (centros x fechas) de Carga_Dia construida una vez por versión
+de datos. Los KPIs de un rango de fechas se obtienen cortando la matriz en
+lugar de volver a agrupar las filas de Datos_Centros.
+
+Las sumas reproducen exactamente las de pandas para que el JSON no cambie:
+  - groupby(...).sum() usa suma compensada (Kahan) en el orden de las filas,
+  - Series.sum() usa la suma por pares de NumPy sobre el array contiguo.
+Por eso los totales de un rango no se sacan de diferencias de sumas
+acumuladas en float (cambiarían los últimos decimales); las sumas
+acumuladas se usan para los conteos (centros y días con dato).
+"""
+import numpy as np
+import pandas as pd
+
+from tablas_compactas import fechas_a_texto
+
+
+def suma_kahan(valores, mascara):
+    """Suma compensada a lo largo del eje 0, vectorizada sobre el eje 1.
+
+    Replica group_sum de pandas: solo acumula las celdas marcadas en la
+    máscara y en el mismo orden en que aparecen en el eje 0.
+    """
+    n = valores.shape[1]
+    suma, compensacion = np.zeros(n), np.zeros(n)
+    y, t, nueva = np.empty(n), np.empty(n), np.empty(n)
+    finitos = np.isfinite(valores).all()
+    for fila, presente in zip(valores, mascara):
+        np.subtract(fila, compensacion, out=y)
+        np.add(suma, y, out=t)
+        np.subtract(t, suma, out=nueva)
+        nueva -= y
+        if not finitos:
+            nueva[np.isnan(nueva)] = 0.0  # +/- infinito: pandas reinicia la compensación
+        np.copyto(compensacion, nueva, where=presente)
+        np.copyto(suma, t, where=presente)
+    return suma
+
+
+class CuboCarga:
+    """Carga diaria por centro indexada por posición de centro y de fecha"""
+
+    def __init__(self, df_centros):
+        df = df_centros[['Fecha', 'Centro', 'Carga_Dia']]
+        if not df['Fecha'].is_monotonic_increasing:
+            df = df.sort_values('Fecha', kind='stable')
+        if df.duplicated(['Fecha', 'Centro']).any():
+            # El ETL genera una fila por (Fecha, Centro); se consolida cualquier repetición
+            df = df.groupby(['Fecha', 'Centro'], sort=False, as_index=False, observed=True)['Carga_Dia'].sum()
+
+        valores = df['Carga_Dia'].to_numpy(dtype='float64')
+        cod_fecha, fechas = pd.factorize(df['Fecha'], sort=True)
+        cod_centro, centros = pd.factorize(df['Centro'], sort=True)
+
+        # Fechas del eje como texto 'YYYY-MM-DD' (formato de la API y de los filtros)
+        self.fechas = np.asarray(fechas_a_texto(fechas), dtype=object)
+        self.centros = centros
+        # Clave canónica de texto (la que llega en la URL) -> posición del centro
+        self.claves = np.asarray(pd.Index(centros).astype(str), dtype=object)
+        self.posicion_centro = {clave: c for c, clave in enumerate(self.claves)}
+        self.valores_filas = valores
+        n_c, n_f = len(self.centros), len(self.fechas)
+
+        # Filas de cada fecha: [inicio_fila[d], inicio_fila[d+1])
+        self.inicio_fila = np.searchsorted(cod_fecha, np.arange(n_f + 1))
+
+        # Matriz centro x fecha y máscara de presencia
+        self.carga = np.zeros((n_c, n_f))
+        self.presente = np.zeros((n_c, n_f), dtype=bool)
+        self.carga[cod_centro, cod_fecha] = valores
+        self.presente[cod_centro, cod_fecha] = True
+        self.presencia_acum = np.zeros((n_c, n_f + 1), dtype=np.int32)
+        np.cumsum(self.presente, axis=1, out=self.presencia_acum[:, 1:])
+
+        # Valores de cada fecha en el orden original de las filas (para la suma por fecha)
+        rango = np.arange(len(valores)) - self.inicio_fila[cod_fecha]
+        profundidad = int(rango.max()) + 1 if len(valores) else 0
+        self.por_fecha = np.zeros((profundidad, n_f))
+        self.por_fecha_presente = np.zeros((profundidad, n_f), dtype=bool)
+        self.por_fecha[rango, cod_fecha] = valores
+        self.por_fecha_presente[rango, cod_fecha] = True
+
+    @property
+    def vacio(self):
+        return len(self.fechas) == 0
+
+    def rango(self, fecha_inicio=None, fecha_fin=None):
+        """Índices [i, j) de las fechas dentro del rango (comparación de texto)"""
+        i = int(np.searchsorted(self.fechas, fecha_inicio, side='left')) if fecha_inicio else 0
+        j = int(np.searchsorted(self.fechas, fecha_fin, side='right')) if fecha_fin else len(self.fechas)
+        return i, max(i, j)
+
+    def filas_centros(self, claves):
+        """Posiciones de los centros pedidos por clave, en orden y sin repetir"""
+        return list(dict.fromkeys(self.posicion_centro[k] for k in claves if k in self.posicion_centro))
+
+    def centros_en_rango(self, i, j):
+        """Máscara de centros con al menos un dato en el rango (sumas acumuladas)"""
+        return (self.presencia_acum[:, j] - self.presencia_acum[:, i]) > 0
+
+    def total(self, i, j):
+        """Equivalente a df_rango['Carga_Dia'].sum()"""
+        return self.valores_filas[self.inicio_fila[i]:self.inicio_fila[j]].sum()
+
+    def evolucion_total(self, i, j):
+        """Equivalente a df_rango.groupby('Fecha')['Carga_Dia'].sum()"""
+        return suma_kahan(self.por_fecha[:, i:j], self.por_fecha_presente[:, i:j])
+
+    def totales_centro(self, i, j, filas):
+        """Equivalente a groupby('Centro')['Carga_Dia'].sum() para los centros indicados"""
+        return suma_kahan(self.carga[filas, i:j].T, self.presente[filas, i:j].T)
+
+    def sumas_centro(self, i, j, filas):
+        """Equivalente a Series.sum() de cada grupo de centro (suma por pares de NumPy)"""
+        return np.array([self.carga[c, i:j][self.presente[c, i:j]].sum() for c in filas])
+
+    def serie_centro(self, c, i, j):
+        """Fechas y cargas del centro c dentro del rango"""
+        presentes = self.presente[c, i:j]
+        return self.fechas[i:j][presentes].tolist(), self.carga[c, i:j][presentes].tolist()
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+METRICAS DE RENDIMIENTO
+=======================
+Instrumentación ligera, sin dependencias externas:
+  - Cronometro: duración acumulada por etapa. Lo usan la carga de datos del
+    servidor, cada petición (cabecera Server-Timing) y el ETL.
+  - RegistroMetricas: contadores, valores e histogramas con etiquetas,
+    exportados en el formato de texto de Prometheus (/api/metrics).
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+# Límites de los histogramas de latencia (segundos)
+CUBETAS_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TIPO_CONTENIDO = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Cronometro:
+    """Duración acumulada por etapa, en el orden en que aparecen"""
+
+    def __init__(self):
+        self.etapas = {}
+
+    @contextmanager
+    def etapa(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sumar(nombre, time.perf_counter() - inicio)
+
+    def sumar(self, nombre, segundos):
+        self.etapas[nombre] = self.etapas.get(nombre, 0.0) + segundos
+
+    def combinar(self, etapas):
+        for nombre, segundos in etapas.items():
+            self.sumar(nombre, segundos)
+
+    @property
+    def total(self):
+        return sum(self.etapas.values())
+
+    def server_timing(self):
+        """Valor de la cabecera Server-Timing (milisegundos)"""
+        return ", ".join(f"{nombre};dur={segundos * 1000:.1f}" for nombre, segundos in self.etapas.items())
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _etiquetas(pares):
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in pares) + "}"
+
+
+def _numero(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class RegistroMetricas:
+    """Métricas en memoria del proceso (con lock: se actualizan desde varios hilos)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # nombre -> {"tipo", "ayuda", "cubetas", "series": {etiquetas: valor}}
+        self._metricas = {}
+
+    def _definir(self, nombre, tipo, ayuda, cubetas=None):
+        self._metricas[nombre] = {"tipo": tipo, "ayuda": ayuda, "cubetas": cubetas, "series": {}}
+
+    def contador(self, nombre, ayuda):
+        self._definir(nombre, "counter", ayuda)
+
+    def valor(self, nombre, ayuda):
+        self._definir(nombre, "gauge", ayuda)
+
+    def histograma(self, nombre, ayuda, cubetas=CUBETAS_LATENCIA):
+        self._definir(nombre, "histogram", ayuda, tuple(cubetas))
+
+    def incrementar(self, nombre, cantidad=1, **etiquetas):
+        clave = tuple(sorted(etiquetas.items()))
+        with self._lock:
+            series = self._metricas[nombre]["series"]
+            series[clave] = series.get(clave, 0) + cantidad
+
+    def fijar(self, nombre, valor, **etiquetas):
+        with self._lock:
+            self._metricas[nombre]["series"][tuple(sorted(etiquetas.items()))] = valor
+
+    def reiniciar(self, nombre):
+        """Borra las series de una métrica (p.ej. al cambiar de versión de datos)"""
+        with self._lock:
+            self._metricas[nombre]["series"].clear()
+
+    def observar(self, nombre, valor, **etiquetas):
+        clave = tuple(sorted(etiquetas.items()))
+        with self._lock:
+            metrica = self._metricas[nombre]
+            serie = metrica["series"].get(clave)
+            if serie is None:
+                serie = metrica["series"][clave] = [[0] * len(metrica["cubetas"]), 0.0, 0]
+            for k, limite in enumerate(metrica["cubetas"]):
+                if valor <= limite:
+                    serie[0][k] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def exportar(self):
+        """Todas las métricas en formato de texto de Prometheus"""
+        lineas = []
+        with self._lock:
+            for nombre, metrica in self._metricas.items():
+                lineas.append(f"# HELP {nombre} {metrica['ayuda']}")
+                lineas.append(f"# TYPE {nombre} {metrica['tipo']}")
+                for clave, valor in metrica["series"].items():
+                    if metrica["tipo"] != "histogram":
+                        lineas.append(f"{nombre}{_etiquetas(clave)} {_numero(valor)}")
+                        continue
+                    cuentas, suma, total = valor
+                    for limite, cuenta in zip(metrica["cubetas"] + (float("inf"),), cuentas + [total]):
+                        lineas.append(f"{nombre}_bucket{_etiquetas(clave + (('le', _numero(limite)),))} {cuenta}")
+                    lineas.append(f"{nombre}_sum{_etiquetas(clave)} {_numero(suma)}")
+                    lineas.append(f"{nombre}_count{_etiquetas(clave)} {total}")
+        return "\n".join(lineas) + "\n"
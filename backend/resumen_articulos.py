@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+RESUMEN MENSUAL DE ARTICULOS POR CENTRO
+=======================================
+Agregado de Datos_Centro_Articulo particionado por (Centro, Mes) y
+construido una vez por versión de datos. Cada partición guarda, por
+Artículo/O.F., la media de Horas y el número de días distintos, en el mismo
+orden en que los devolvería groupby sobre las filas del centro y mes.
+
+El drill-down de un centro solo corta su partición. Para varios centros a
+la vez la media no se puede recomponer desde las medias parciales sin
+cambiar los decimales, así que se reagrupan únicamente las filas de esas
+particiones (posiciones precalculadas, sin recorrer la tabla completa).
+"""
+import numpy as np
+import pandas as pd
+
+from tablas_compactas import fechas_a_texto
+
+
+def agrupar_articulos(df_filas, columnas):
+    """Media de Horas y días distintos por Artículo/O.F. (filas en su orden original)"""
+    return df_filas.groupby(columnas, observed=True).agg(
+        horas=('Horas', 'mean'),
+        dias=('Fecha', 'nunique')
+    ).reset_index()
+
+
+class ResumenArticulos:
+    """Desglose Artículo/O.F. indexado por (clave de centro, 'YYYY-MM')"""
+
+    def __init__(self, df_ca):
+        self.df_ca = df_ca
+        self.columnas = ['Articulo'] + (['OF'] if 'OF' in df_ca.columns else [])
+        self.particiones = {}
+        self.filas = {}
+        if df_ca.empty:
+            self.resumen = pd.DataFrame(columns=self.columnas + ['horas', 'dias'])
+            return
+
+        # Claves de partición: centro como texto (la clave de la URL) y mes de la fecha
+        # (el mes se formatea sobre las fechas distintas, no fila a fila)
+        cod_fecha, fechas = pd.factorize(df_ca['Fecha'])
+        meses = pd.Index(fechas_a_texto(fechas)).astype(str).str[:7]
+        claves = [
+            df_ca['Centro'].astype(str).rename('_centro'),
+            pd.Series(meses.take(cod_fecha), index=df_ca.index, name='_mes')
+        ]
+        self.filas = df_ca.groupby(claves, sort=False).indices
+
+        resumen = df_ca.groupby(claves + [df_ca[c] for c in self.columnas], observed=True).agg(
+            horas=('Horas', 'mean'),
+            dias=('Fecha', 'nunique')
+        )
+        # El índice queda ordenado por (centro, mes, ...): cada partición es un bloque contiguo
+        centros = resumen.index.get_level_values('_centro')
+        meses = resumen.index.get_level_values('_mes')
+        self.resumen = resumen.reset_index(level=self.columnas).reset_index(drop=True)
+        inicio = np.flatnonzero(np.r_[True, (centros[1:] != centros[:-1]) | (meses[1:] != meses[:-1])])
+        fin = np.r_[inicio[1:], len(self.resumen)]
+        for a, b in zip(inicio, fin):
+            self.particiones[(centros[a], meses[a])] = (int(a), int(b))
+
+    @property
+    def vacio(self):
+        return self.df_ca.empty
+
+    def horas_por_mes(self):
+        """Suma de Horas por Artículo/O.F., centro (clave de texto) y mes"""
+        if self.df_ca.empty:
+            return pd.DataFrame(columns=self.columnas + ['Centro', 'Mes', 'Horas'])
+        # Agrupación por códigos: centros y meses se pasan a texto solo sobre los valores distintos
+        cod_centro, centros = pd.factorize(self.df_ca['Centro'])
+        cod_fecha, fechas = pd.factorize(self.df_ca['Fecha'])
+        cod_mes, meses = pd.factorize(pd.Index(fechas_a_texto(fechas)).astype(str).str[:7])
+        claves = [self.df_ca[c] for c in self.columnas] + [
+            pd.Series(cod_centro, index=self.df_ca.index, name='Centro'),
+            pd.Series(cod_mes.take(cod_fecha), index=self.df_ca.index, name='Mes')
+        ]
+        horas = self.df_ca.groupby(claves, observed=True)['Horas'].sum().reset_index()
+        horas['Centro'] = centros.astype(str).take(horas['Centro'])
+        horas['Mes'] = meses.take(horas['Mes'])
+        return horas
+
+    def desglose(self, claves, mes):
+        """Artículo/O.F. con horas medias y días para los centros y el mes dados"""
+        claves = list(dict.fromkeys(claves))
+        if len(claves) == 1:
+            a, b = self.particiones.get((claves[0], mes), (0, 0))
+            return self.resumen.iloc[a:b].reset_index(drop=True)
+
+        posiciones = [self.filas[(c, mes)] for c in claves if (c, mes) in self.filas]
+        if not posiciones:
+            return self.resumen.iloc[0:0]
+        return agrupar_articulos(self.df_ca.iloc[np.sort(np.concatenate(posiciones))], self.columnas)
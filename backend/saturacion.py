@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+SATURACION DE CENTROS
+=====================
+Estadísticos de saturación de todos los centros a la vez, calculados con
+operaciones vectorizadas sobre la matriz centro x día del cubo de carga:
+
+  - media y desviación típica móviles de las últimas `ventana` fechas con
+    reporte (solo los días con dato del centro; desviación muestral),
+  - media mensual del centro (la Media_Mensual del ETL: media de Carga_Dia
+    de los días con dato del mes),
+  - z = (Carga_Dia - media mensual) / desviación móvil (NaN si la ventana es
+    constante: una desviación relativa menor que TOLERANCIA_DESV cuenta como 0).
+
+Se construye una vez por versión de datos. Si la versión anterior tiene los
+mismos centros y sus fechas son un prefijo de las nuevas (llega un día
+nuevo), se reutilizan sus columnas y solo se recalcula desde el primer día
+del mes afectado: la media mensual de ese mes cambia con el día nuevo y los
+meses anteriores no. Las columnas reutilizadas se comprueban contra la
+carga nueva, así que una reescritura del histórico recalcula todo.
+"""
+import numpy as np
+
+# Desviación relativa a la media por debajo de la cual la ventana se considera constante
+TOLERANCIA_DESV = 1e-9
+
+
+def _suma_ventana(matriz, ventana, desde):
+    """Suma de las `ventana` columnas que terminan en cada columna >= desde.
+
+    Se suman las columnas desplazadas (no diferencias de sumas acumuladas):
+    sin cancelación y con el mismo resultado sea cual sea la primera columna
+    calculada, de modo que el cálculo incremental coincide con el completo.
+    """
+    n = matriz.shape[1]
+    suma = np.zeros((matriz.shape[0], n - desde), dtype=matriz.dtype)
+    for k in range(ventana):
+        inicio = max(desde, k)
+        if inicio < n:
+            suma[:, inicio - desde:] += matriz[:, inicio - k:n - k]
+    return suma
+
+
+class SaturacionCentros:
+    """Medias móviles, desviaciones y z-scores por (centro, fecha) del cubo"""
+
+    def __init__(self, cubo, ventana, anterior=None):
+        self.ventana = ventana
+        self.claves = cubo.claves
+        self.fechas = cubo.fechas
+        # Referencias (sin copia) a las matrices del cubo, para comparar con la versión siguiente
+        self.carga = cubo.carga
+        self.presente = cubo.presente
+        self.meses = np.array([f[:7] for f in self.fechas], dtype=object)
+
+        # Cada columna se copia de la versión anterior o se calcula: no hace falta inicializar
+        forma = self.carga.shape
+        self.media_movil = np.empty(forma)
+        self.desv_movil = np.empty(forma)
+        self.media_mensual = np.empty(forma)
+        self.z = np.empty(forma)
+
+        desde = self._columnas_reutilizables(anterior)
+        if desde:
+            for nombre in ('media_movil', 'desv_movil', 'media_mensual', 'z'):
+                getattr(self, nombre)[:, :desde] = getattr(anterior, nombre)[:, :desde]
+        # Columnas copiadas de la versión anterior (0 = cálculo completo)
+        self.reutilizadas = desde
+        if desde < forma[1]:
+            self._calcular(desde)
+
+    def _columnas_reutilizables(self, anterior):
+        """Número de columnas iniciales que se pueden copiar de la versión anterior"""
+        if anterior is None or anterior.ventana != self.ventana or len(self.fechas) == 0:
+            return 0
+        n_previas = len(anterior.fechas)
+        if (not np.array_equal(anterior.claves, self.claves) or n_previas > len(self.fechas)
+                or not np.array_equal(anterior.fechas, self.fechas[:n_previas])):
+            return 0
+        # Desde el primer día del mes de la primera fecha nueva (o del último mes si no hay fechas nuevas)
+        mes = self.meses[min(n_previas, len(self.fechas) - 1)]
+        desde = int(np.searchsorted(self.meses, mes, side='left')) if n_previas else 0
+        if not (np.array_equal(anterior.carga[:, :desde], self.carga[:, :desde])
+                and np.array_equal(anterior.presente[:, :desde], self.presente[:, :desde])):
+            return 0
+        return desde
+
+    def _calcular(self, desde):
+        """Rellena las columnas [desde, n) (desde es el inicio de un mes)"""
+        n = self.carga.shape[1]
+        # Contexto: las ventana-1 columnas previas alimentan las primeras ventanas móviles
+        a = max(0, desde - self.ventana + 1)
+        presente = self.presente[:, a:]
+        carga = np.where(presente, self.carga[:, a:], 0.0)
+        n_v = _suma_ventana(presente.astype(np.int64), self.ventana, desde - a)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = np.where(n_v > 0, _suma_ventana(carga, self.ventana, desde - a) / n_v, np.nan)
+
+        # Segunda pasada: desviaciones respecto a la media de cada ventana (sin restar sumas de cuadrados)
+        cuadrados = np.zeros_like(media)
+        for k in range(self.ventana):
+            inicio = max(desde - a, k)
+            if inicio < n - a:
+                desvio = carga[:, inicio - k:n - a - k] - media[:, inicio - desde + a:]
+                cuadrados[:, inicio - desde + a:] += np.where(presente[:, inicio - k:n - a - k], desvio * desvio, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            desv = np.where(n_v > 1, np.sqrt(cuadrados / (n_v - 1)), np.nan)
+        # Ventana constante: la segunda pasada deja ruido de redondeo (~1e-14) que dispararía z
+        desv[desv <= TOLERANCIA_DESV * np.maximum(np.abs(media), 1.0)] = 0.0
+        self.desv_movil[:, desde:] = desv
+        self.media_movil[:, desde:] = media
+
+        # Media mensual: los meses son bloques contiguos de columnas
+        meses = self.meses[desde:]
+        cortes = np.flatnonzero(np.r_[True, meses[1:] != meses[:-1]])
+        largos = np.diff(np.r_[cortes, len(meses)])
+        cortes += desde - a
+        sumas_mes = np.add.reduceat(carga, cortes, axis=1)
+        dias_mes = np.add.reduceat(presente, cortes, axis=1, dtype=np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media_mes = np.where(dias_mes > 0, sumas_mes / dias_mes, np.nan)
+        self.media_mensual[:, desde:] = np.repeat(media_mes, largos, axis=1)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            z = (self.carga[:, desde:] - self.media_mensual[:, desde:]) / self.desv_movil[:, desde:]
+        z[~self.presente[:, desde:] | ~(self.desv_movil[:, desde:] > 0)] = np.nan
+        self.z[:, desde:] = z
+
+    def dias_saturados(self, d, dias, umbral):
+        """Días con z > umbral de cada centro en las `dias` fechas hasta la posición d incluida"""
+        with np.errstate(invalid='ignore'):
+            return (self.z[:, max(0, d - dias + 1):d + 1] > umbral).sum(axis=1)
+
+    def saturados(self, d, umbral):
+        """Posiciones de los centros con z > umbral en la fecha d, de mayor a menor z"""
+        z = self.z[:, d]
+        with np.errstate(invalid='ignore'):
+            filas = np.flatnonzero(z > umbral)
+        return filas[np.argsort(-z[filas], kind='stable')]
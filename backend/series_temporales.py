@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+SERIES TEMPORALES PARA LOS GRAFICOS
+===================================
+Transformaciones opcionales de las series de evolución antes de enviarlas
+al frontend:
+  - granularidad: suma de la carga por semana (lunes) o por mes,
+  - max_points: reducción a N puntos con LTTB (Largest-Triangle-Three-
+    Buckets), que conserva picos y forma de la curva,
+  - formato columnar: valores como Float32 little-endian en base64, con el
+    eje de fechas enviado una sola vez.
+Sin parámetros las series se devuelven tal cual.
+"""
+import base64
+
+import numpy as np
+import pandas as pd
+
+GRANULARIDADES = ('day', 'week', 'month')
+FORMATOS = ('json', 'columnar')
+
+
+def etiquetas_periodo(fechas, granularidad):
+    """Etiqueta del periodo de cada fecha 'YYYY-MM-DD': el mismo día, el lunes de su semana o 'YYYY-MM'"""
+    if granularidad == 'day' or len(fechas) == 0:
+        return list(fechas)
+    dias = pd.DatetimeIndex(np.array(fechas, dtype='datetime64[D]'))
+    if granularidad == 'week':
+        return (dias - pd.to_timedelta(dias.weekday, unit='D')).strftime('%Y-%m-%d').tolist()
+    return dias.strftime('%Y-%m').tolist()
+
+
+def agregar_periodo(fechas, cargas, granularidad):
+    """Suma la serie por periodo (las fechas vienen ordenadas)"""
+    if granularidad == 'day' or len(fechas) == 0:
+        return list(fechas), list(cargas)
+    etiquetas = etiquetas_periodo(fechas, granularidad)
+    inicios = [0] + [i for i in range(1, len(etiquetas)) if etiquetas[i] != etiquetas[i - 1]]
+    sumas = np.add.reduceat(np.asarray(cargas, dtype='float64'), inicios)
+    return [etiquetas[i] for i in inicios], sumas.tolist()
+
+
+def posiciones_eje(etiquetas):
+    """Posición numérica (días) de cada etiqueta de fecha o de mes"""
+    return np.array(etiquetas, dtype='datetime64[D]').astype('int64').astype('float64')
+
+
+def indices_lttb(x, y, n):
+    """Índices de los n puntos elegidos por LTTB (siempre incluye el primero y el último)"""
+    total = len(y)
+    if n >= total or n < 3:
+        return np.arange(total)
+    y = np.nan_to_num(np.asarray(y, dtype='float64'))
+    bordes = np.linspace(1, total - 1, n - 1).astype(int)
+    elegidos = [0]
+    for k in range(n - 2):
+        inicio, fin = bordes[k], bordes[k + 1]
+        # Punto medio del cubo siguiente (o el último punto)
+        sig_inicio, sig_fin = fin, bordes[k + 2] if k + 2 < len(bordes) else total
+        sig_fin = max(sig_fin, sig_inicio + 1)
+        cx, cy = x[sig_inicio:sig_fin].mean(), y[sig_inicio:sig_fin].mean()
+        ax, ay = x[elegidos[-1]], y[elegidos[-1]]
+        areas = np.abs((ax - cx) * (y[inicio:fin] - ay) - (ax - x[inicio:fin]) * (cy - ay))
+        elegidos.append(inicio + int(np.argmax(areas)))
+    elegidos.append(total - 1)
+    return np.array(elegidos)
+
+
+def reducir(fechas, cargas, max_points):
+    """Serie reducida a max_points con LTTB"""
+    if not max_points or len(fechas) <= max_points:
+        return list(fechas), list(cargas)
+    idx = indices_lttb(posiciones_eje(fechas), cargas, max_points)
+    return [fechas[i] for i in idx], [cargas[i] for i in idx]
+
+
+def alinear(fechas_eje, fechas, cargas):
+    """Valores de la serie sobre el eje común (NaN donde no hay dato)"""
+    posicion = {f: i for i, f in enumerate(fechas_eje)}
+    valores = np.full(len(fechas_eje), np.nan)
+    valores[[posicion[f] for f in fechas]] = cargas
+    return valores
+
+
+def codificar_f32(valores):
+    """Array Float32 little-endian en base64 (new Float32Array(buffer) en el navegador)"""
+    return base64.b64encode(np.asarray(valores, dtype='<f4').tobytes()).decode('ascii')
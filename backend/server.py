@@ -1,14 +1,50 @@
+import time
+# Referencia del tiempo de arranque (/api/status): se toma antes de importar pandas y FastAPI
+INICIO_PROCESO = time.perf_counter()
+
+import numpy as np
 import pandas as pd
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, Query, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from pathlib import Path
 from typing import Optional
-from datetime import datetime
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import json
 import os
 
-app = FastAPI(title="RPK Time Analysis Dashboard API")
+from almacen_columnar import almacen_disponible, leer_tabla, mtime_almacen, ruta_almacen
+from version_datos import GestorVersionDatos, hash_origen, huella_origen
+from snapshot_compartido import (
+    HAY_PYARROW, VARIABLE_SNAPSHOTS, abrir_snapshot, es_snapshot, escribir_snapshot, manifiesto_snapshot,
+    renovar_huella, snapshot_vigente, version_snapshot
+)
+from cubo_carga import CuboCarga
+from saturacion import SaturacionCentros
+from resumen_articulos import ResumenArticulos
+from busqueda_articulos import CAMPOS, IndiceBusqueda
+from almacen_sqlite import BaseSQLite, DesgloseSQLite, ruta_sqlite
+from tablas_compactas import normalizar_tablas, uso_memoria
+from cache_respuestas import CacheRespuestas, codificacion_preferida, no_modificado
+from series_temporales import (
+    FORMATOS, GRANULARIDADES, agregar_periodo, alinear, codificar_f32, indices_lttb, posiciones_eje, reducir
+)
+from metricas import TIPO_CONTENIDO, Cronometro, RegistroMetricas
+
+@asynccontextmanager
+async def ciclo_vida(app):
+    """Carga los datos al arrancar, sin esperar a la primera petición (ni bloquear el arranque)"""
+    _gestor.solicitar_carga()
+    _gestor.iniciar()
+    yield
+    _gestor.detener()
+
+app = FastAPI(title="RPK Time Analysis Dashboard API", lifespan=ciclo_vida)
 
 # Habilitar CORS para desarrollo
 app.add_middleware(
@@ -22,99 +58,422 @@ app.add_middleware(
 BASE_DIR = Path(__file__).parent.parent.resolve()
 DATA_DIR = BASE_DIR
 EXCEL_FILE = DATA_DIR / "ANALISIS_MENSUAL_TIEMPOS_V2.xlsx"
+ALTERNATIVE_FILE = Path(__file__).parent / "ANALISIS_MENSUAL_TIEMPOS_V2.xlsx"
 STATIC_DIR = BASE_DIR / "frontend"
 
-# Cache de datos para mejor rendimiento
-_data_cache = None
-_cache_time = None
+# Snapshot preparado junto a la fuente: tablas ya normalizadas para arrancar sin releer el Excel
+SUFIJO_PREPARADO = "_preparado"
+# Último hash calculado de cada fuente con la huella a la que corresponde: no se vuelve a calcular
+# para la misma huella (ni al comprobar el snapshot preparado ni al versionar la fuente)
+_hashes_origen = {}
+# Modo multi-worker: el lanzador publica snapshots en esta carpeta y los workers los mapean
+CARPETA_SNAPSHOTS = Path(os.environ.get(VARIABLE_SNAPSHOTS) or Path(__file__).parent / "snapshots")
+MODO_WORKER = VARIABLE_SNAPSHOTS in os.environ
+TABLAS_SNAPSHOT = ('Datos_Centros', 'Rankings', 'Datos_Centro_Articulo')
+# Valores admitidos en los parámetros de las series de evolución
+PATRON_GRANULARIDAD = f"^({'|'.join(GRANULARIDADES)})$"
+PATRON_FORMATO = f"^({'|'.join(FORMATOS)})$"
+# Días del filtro inicial del dashboard (/api/bootstrap)
+DIAS_BOOTSTRAP = 30
+# Saturación: ventana móvil precalculada por versión, umbral de z y días de histórico por defecto
+VENTANA_SATURACION = 7
+UMBRAL_SATURACION = 2.0
+# Límite del umbral de z admitido en la petición (|umbral|)
+UMBRAL_SATURACION_MAX = 1000.0
+DIAS_SATURACION = 30
+# Búsqueda de artículos/O.F.: campos admitidos y tamaño de página por defecto
+PATRON_CAMPO_BUSQUEDA = f"^({'|'.join(CAMPOS)}|todos)$"
+# q debe tener algún carácter que no sea espacio (en blanco sería el prefijo vacío: todo el índice)
+PATRON_TEXTO_BUSQUEDA = r"\S"
+LIMITE_BUSQUEDA = 20
+# Cabecera Server-Timing por petición (opcional: --server-timing o RPK_SERVER_TIMING=1)
+VARIABLE_SERVER_TIMING = "RPK_SERVER_TIMING"
+SERVER_TIMING = os.environ.get(VARIABLE_SERVER_TIMING) == "1"
+# Motor de datos: 'pandas' (tablas en memoria) o 'sqlite' (drill-down leído del fichero SQLite del ETL)
+VARIABLE_MOTOR = "RPK_MOTOR"
+MOTORES = ('pandas', 'sqlite')
+MOTOR = os.environ.get(VARIABLE_MOTOR, 'pandas')
+
+# Métricas del proceso, expuestas en /api/metrics (en multi-worker, cada worker las suyas)
+METRICAS = RegistroMetricas()
+METRICAS.contador("rpk_http_requests_total", "Peticiones atendidas por endpoint, método y código")
+METRICAS.histograma("rpk_http_request_duration_seconds", "Latencia de las peticiones por endpoint")
+METRICAS.histograma("rpk_compute_seconds", "Cálculo y serialización de respuestas no cacheadas por tipo")
+METRICAS.contador("rpk_dataset_loads_total", "Versiones de datos cargadas")
+METRICAS.valor("rpk_dataset_load_seconds", "Duración de la última carga de datos")
+METRICAS.valor("rpk_dataset_load_stage_seconds", "Duración de cada etapa de la última carga de datos")
+METRICAS.valor("rpk_dataset_rows", "Filas por tabla de la versión cargada")
+METRICAS.valor("rpk_dataset_memory_bytes", "Memoria por tabla de la versión cargada")
+METRICAS.valor("rpk_dataset_info", "Versión de datos vigente (valor 1)")
+METRICAS.valor("rpk_startup_seconds", "Segundos desde el arranque del proceso hasta tener datos servibles")
+METRICAS.contador("rpk_response_cache_hits_total", "Aciertos del caché de respuestas")
+METRICAS.contador("rpk_response_cache_misses_total", "Fallos del caché de respuestas")
+METRICAS.contador("rpk_response_cache_evictions_total", "Expulsiones del caché de respuestas")
+METRICAS.valor("rpk_response_cache_entries", "Entradas en el caché de respuestas")
+METRICAS.valor("rpk_response_cache_bytes", "Bytes en el caché de respuestas")
+
+@app.middleware("http")
+async def medir_peticion(request: Request, call_next):
+    """Latencia por endpoint y, si está activado, cabecera Server-Timing con las etapas"""
+    request.state.cronometro = Cronometro()
+    inicio = time.perf_counter()
+    respuesta = await call_next(request)
+    duracion = time.perf_counter() - inicio
+    ruta = request.scope.get("route")
+    endpoint = getattr(ruta, "path", None) or "otros"
+    METRICAS.observar("rpk_http_request_duration_seconds", duracion, endpoint=endpoint)
+    METRICAS.incrementar("rpk_http_requests_total", endpoint=endpoint, method=request.method,
+                         status=str(respuesta.status_code))
+    if SERVER_TIMING:
+        request.state.cronometro.sumar("total", duracion)
+        respuesta.headers["Server-Timing"] = request.state.cronometro.server_timing()
+    return respuesta
+
+def resolver_origen():
+    """Determina la fuente de datos: SQLite (motor sqlite) o almacén Arrow (si están al día) o Excel V2.
+    Si hay un snapshot preparado de esa fuente con su misma huella, se arranca desde él."""
+    for excel in (EXCEL_FILE, ALTERNATIVE_FILE):
+        base = ruta_sqlite(excel)
+        if MOTOR == 'sqlite' and base.exists():
+            if not excel.exists() or base.stat().st_mtime >= excel.stat().st_mtime:
+                return 'sqlite', base
+        almacen = ruta_almacen(excel)
+        if almacen_disponible(almacen) and (not excel.exists() or mtime_almacen(almacen) >= excel.stat().st_mtime):
+            tipo, ruta = 'arrow', almacen
+        elif excel.exists():
+            tipo, ruta = 'xlsx', excel
+        else:
+            continue
+        preparado = preparado_vigente(ruta)
+        return ('preparado', preparado) if preparado else (tipo, ruta)
+    return None, None
+
+def ruta_preparado(fuente):
+    """Carpeta de snapshots preparados de una fuente (junto a ella)"""
+    fuente = Path(fuente)
+    return fuente.with_name(f"{fuente.stem}{SUFIJO_PREPARADO}")
+
+def huella_json(huella):
+    """Huella de una fuente tal como queda guardada en el manifiesto (listas JSON)"""
+    return json.loads(json.dumps(huella))
+
+def preparado_vigente(fuente):
+    """Snapshot preparado de la fuente si su huella coincide con la actual (None si no hay o está obsoleto)"""
+    if not HAY_PYARROW:
+        return None
+    directorio = snapshot_vigente(ruta_preparado(fuente))
+    if directorio is None:
+        return None
+    try:
+        manifiesto, huella = manifiesto_snapshot(directorio), huella_json(huella_origen(fuente))
+        if manifiesto.get("huella") == huella:
+            return directorio
+        # Fuente tocada o copiada: si el contenido es el mismo se renueva la huella (una vez por huella)
+        if _hashes_origen.get(str(fuente), (None,))[0] != huella:
+            _hashes_origen[str(fuente)] = (huella, hash_origen(fuente))
+            if _hashes_origen[str(fuente)][1] == manifiesto.get("version"):
+                renovar_huella(directorio, huella)
+                return directorio
+    except (OSError, ValueError):
+        pass
+    return None
+
+def guardar_preparado(fuente, tablas, version, huella):
+    """Guarda las tablas normalizadas como snapshot preparado de la fuente (el próximo arranque no la relee).
+    version y huella son las tomadas antes de leerla: si la fuente cambió durante la carga, el snapshot no
+    coincidirá con la huella nueva y se descartará."""
+    try:
+        escribir_snapshot(ruta_preparado(fuente), f"{Path(fuente).stem}-{version}", version, Path(fuente).name,
+                          dict(zip(TABLAS_SNAPSHOT, tablas)), huella=huella_json(huella))
+    except Exception as e:
+        # Sin permisos de escritura junto a la fuente (p.ej. unidad de red): se sigue sin snapshot
+        print(f"[AVISO] No se pudo guardar el snapshot preparado: {e}")
+
+def versionar_origen(ruta):
+    """Versión de una fuente; la de un snapshot es la de la fuente de la que salió (mismo ETag tras reiniciar).
+    Si preparado_vigente ya calculó el hash de la fuente con su huella actual, se reutiliza."""
+    if es_snapshot(ruta):
+        return version_snapshot(ruta)
+    huella, valor = _hashes_origen.get(str(ruta), (None, None))
+    if huella is not None and huella == huella_json(huella_origen(ruta)):
+        return valor
+    return hash_origen(ruta)
+
+def leer_origen(tipo, ruta):
+    """Lee las tres tablas del origen indicado"""
+    if tipo == 'arrow':
+        # Memory-map de las tablas tipadas generadas por el ETL
+        df_centros = leer_tabla(ruta, 'Datos_Centros')
+        df_rankings = leer_tabla(ruta, 'Rankings')
+        df_ca = leer_tabla(ruta, 'Datos_Centro_Articulo')
+        if df_rankings is None:
+            df_rankings = pd.DataFrame(columns=['Fecha', 'Tipo', 'Ranking', 'Centro', 'Articulo', 'Carga_Dia', 'Media_Mensual', 'Total_Mes'])
+        if df_ca is None:
+            df_ca = pd.DataFrame(columns=['Fecha', 'Centro', 'Articulo', 'Horas'])
+        return df_centros, df_rankings, df_ca
+    
+    # Lectura optimizada: solo hojas necesarias
+    df_centros = pd.read_excel(ruta, sheet_name='Datos_Centros')
+    df_rankings = pd.read_excel(ruta, sheet_name='Rankings')
+    
+    # Intentar cargar la nueva hoja de desglose
+    try:
+        df_ca = pd.read_excel(ruta, sheet_name='Datos_Centro_Articulo')
+    except Exception:
+        df_ca = pd.DataFrame(columns=['Fecha', 'Centro', 'Articulo', 'Horas'])
+    return df_centros, df_rankings, df_ca
+
+@dataclass(frozen=True)
+class Dataset:
+    """Tablas normalizadas y estructuras derivadas de una versión de datos"""
+    df_centros: pd.DataFrame
+    df_rankings: pd.DataFrame
+    df_ca: pd.DataFrame
+    tipo_origen: str
+    cubo: CuboCarga
+    articulos: ResumenArticulos
+    saturacion: SaturacionCentros
+    busqueda: IndiceBusqueda
+
+    @property
+    def tablas(self):
+        return self.df_centros, self.df_rankings, self.df_ca
+
+def preparar_tablas(tipo, ruta, cronometro=None, version=None, huella=None):
+    """Lee y normaliza las tablas de una fuente (limpieza, filtros y tipos compactos).
+    Con la versión y la huella de la fuente (las del gestor, tomadas antes de leerla) el resultado
+    se guarda como snapshot preparado para el siguiente arranque."""
+    cronometro = cronometro if cronometro is not None else Cronometro()
+    if tipo == 'preparado':
+        # Tablas ya normalizadas en una carga anterior, mapeadas en memoria
+        with cronometro.etapa("lectura"):
+            return tuple(abrir_snapshot(ruta, TABLAS_SNAPSHOT))
+    with cronometro.etapa("lectura"):
+        df_centros, df_rankings, df_ca = leer_origen(tipo, ruta)
+    with cronometro.etapa("normalizacion"):
+        tablas = normalizar_tablas(df_centros, df_rankings, df_ca)
+    if HAY_PYARROW and version is not None and huella is not None:
+        with cronometro.etapa("preparado"):
+            guardar_preparado(ruta, tablas, version, huella)
+    return tablas
+
+def construir_datos(tipo, ruta, version=None, huella=None):
+    """Lee, normaliza y precalcula una fuente. Se ejecuta fuera de las peticiones."""
+    cronometro = Cronometro()
+    if tipo == 'snapshot':
+        # Tablas ya normalizadas por el proceso publicador, mapeadas en memoria
+        with cronometro.etapa("lectura"):
+            df_centros, df_rankings, df_ca = abrir_snapshot(ruta, TABLAS_SNAPSHOT)
+    elif tipo == 'sqlite':
+        # Tablas ya normalizadas por el ETL; Datos_Centro_Articulo se queda en disco
+        with cronometro.etapa("lectura"):
+            base = BaseSQLite(ruta)
+            df_centros = base.leer('Datos_Centros')
+            df_rankings = base.leer('Rankings')
+            df_ca = base.vacia('Datos_Centro_Articulo')
+    else:
+        df_centros, df_rankings, df_ca = preparar_tablas(tipo, ruta, cronometro, version, huella)
+    with cronometro.etapa("cubo"):
+        cubo = CuboCarga(df_centros)
+    with cronometro.etapa("articulos"):
+        articulos = DesgloseSQLite(base) if tipo == 'sqlite' else ResumenArticulos(df_ca)
+    with cronometro.etapa("saturacion"):
+        saturacion = SaturacionCentros(cubo, VENTANA_SATURACION, anterior=saturacion_vigente())
+    with cronometro.etapa("busqueda"):
+        busqueda = IndiceBusqueda(articulos.horas_por_mes(), articulos.columnas)
+    
+    dataset = Dataset(df_centros, df_rankings, df_ca, tipo, cubo, articulos, saturacion, busqueda)
+    registrar_carga(dataset, cronometro)
+    registrar_arranque(dataset)
+    return dataset
+
+def saturacion_vigente():
+    """Saturación de la versión en servicio: la nueva versión solo recalcula los días nuevos"""
+    version = _gestor.version
+    return version.datos.saturacion if version is not None else None
+
+def registrar_carga(dataset, cronometro):
+    """Duración por etapa, filas y memoria de la versión recién cargada"""
+    tablas = dict(zip(TABLAS_SNAPSHOT, dataset.tablas))
+    METRICAS.incrementar("rpk_dataset_loads_total")
+    METRICAS.fijar("rpk_dataset_load_seconds", cronometro.total)
+    for etapa, segundos in cronometro.etapas.items():
+        METRICAS.fijar("rpk_dataset_load_stage_seconds", segundos, etapa=etapa)
+    for tabla, memoria in uso_memoria(tablas).items():
+        METRICAS.fijar("rpk_dataset_rows", len(tablas[tabla]), tabla=tabla)
+        METRICAS.fijar("rpk_dataset_memory_bytes", memoria, tabla=tabla)
+
+def publicar_snapshot(tipo, ruta, version=None, huella=None):
+    """Carga del proceso publicador: normaliza la fuente una vez y la publica para los workers"""
+    version = version if version is not None else versionar_origen(ruta)
+    tablas = preparar_tablas(tipo, ruta, version=version, huella=huella)
+    origen = manifiesto_snapshot(ruta)["origen"] if tipo == 'preparado' else Path(ruta).name
+    return escribir_snapshot(
+        CARPETA_SNAPSHOTS, f"{Path(origen).stem}-{version}", version, origen,
+        dict(zip(TABLAS_SNAPSHOT, tablas))
+    )
+
+def resolver_snapshot():
+    """Fuente de un worker: el último snapshot publicado"""
+    directorio = snapshot_vigente(CARPETA_SNAPSHOTS)
+    return ('snapshot', directorio) if directorio else (None, None)
+
+# Versión vigente de los datos: se renueva en segundo plano cuando cambia la fuente.
+# Un worker sigue los snapshots del publicador (misma versión y ETag en todos los workers)
+if MODO_WORKER:
+    _gestor = GestorVersionDatos(resolver_snapshot, construir_datos, versionar=version_snapshot)
+else:
+    _gestor = GestorVersionDatos(resolver_origen, construir_datos, versionar=versionar_origen)
+
+# Arranque: segundos hasta la primera versión servible y fuente de la que salió
+_arranque = {"segundos": None, "origen": None}
+
+def registrar_arranque(dataset):
+    """Anota el tiempo de arranque al terminar de construir la primera versión"""
+    if _arranque["segundos"] is not None:
+        return
+    _arranque["segundos"] = time.perf_counter() - INICIO_PROCESO
+    _arranque["origen"] = dataset.tipo_origen
+    METRICAS.fijar("rpk_startup_seconds", _arranque["segundos"])
+    print(f"[INFO] Servidor listo en {_arranque['segundos']:.2f}s desde el arranque (origen: {_arranque['origen']})")
+
+def load_dataset():
+    """Dataset de la versión vigente (None si no hay datos)"""
+    version = _gestor.actual()
+    if version is None:
+        if _gestor.ultimo_error == "DB_NOT_FOUND":
+            print(f"[ERROR] No existe el archivo {EXCEL_FILE}")
+        return None
+    return version.datos
 
 def load_data():
-    """Carga y cachea los datos del Excel con estándar de seguridad industrial"""
-    global _data_cache, _cache_time
+    """Devuelve las tablas de la versión vigente con estándar de seguridad industrial"""
+    dataset = load_dataset()
+    if dataset is None:
+        return None, None, None
+    return dataset.tablas
+
+def parse_centro_ids(centro_id):
+    """Lista de centros de la ruta '262,750' (sin vacíos, en el orden recibido)"""
+    return [c.strip() for c in centro_id.split(',') if c.strip()]
+
+# Cache LRU de respuestas serializadas, ligada a la versión de datos
+_cache_respuestas = CacheRespuestas()
+
+# Cálculos pandas fuera del event loop, con concurrencia acotada
+MAX_CALCULOS = min(4, os.cpu_count() or 1)
+_ejecutor_calculo = ThreadPoolExecutor(max_workers=MAX_CALCULOS, thread_name_prefix="rpk-calculo")
+# Cálculos en curso por (versión, clave): las peticiones simultáneas comparten el resultado
+_calculos_en_curso = {}
+
+async def version_vigente():
+    """Versión vigente sin bloquear el event loop (la primera carga es single-flight)"""
+    version = _gestor.version
+    if version is None:
+        version = await asyncio.wrap_future(_gestor.solicitar_carga())
+    _gestor.iniciar()
+    return version
+
+def serializar_entrada(version, clave, calcular):
+    """Calcula, serializa y guarda en cache una respuesta (se ejecuta en el pool)"""
+    inicio = time.perf_counter()
+    contenido = calcular(version.datos)
+    if isinstance(contenido, Response):
+        return contenido
+    cuerpo = JSONResponse(jsonable_encoder(contenido)).body
+    METRICAS.observar("rpk_compute_seconds", time.perf_counter() - inicio, tipo=clave[0])
+    last_modified = max((mtime for _, mtime, _ in version.huella[1]), default=0) / 1e9
+    return _cache_respuestas.guardar(version.version, clave, cuerpo, last_modified)
+
+async def calcular_entrada(version, clave, calcular):
+    """Entrada de cache calculada una sola vez aunque la pidan varios clientes a la vez"""
+    llave = (version.version, clave)
+    futuro = _calculos_en_curso.get(llave)
+    if futuro is None:
+        futuro = asyncio.get_running_loop().run_in_executor(
+            _ejecutor_calculo, serializar_entrada, version, clave, calcular
+        )
+        _calculos_en_curso[llave] = futuro
+        futuro.add_done_callback(lambda _: _calculos_en_curso.pop(llave, None))
+    # shield: si un cliente se desconecta no se cancela el cálculo de los demás
+    return await asyncio.shield(futuro)
+
+async def responder_cacheado(request, clave, calcular):
+    """Sirve la respuesta desde el cache (o la calcula) con ETag/Last-Modified.
+
+    calcular(dataset) devuelve el contenido JSON; si devuelve una Response
+    (errores) se entrega tal cual sin cachear.
+    """
+    cronometro = request.state.cronometro
+    with cronometro.etapa("datos"):
+        version = await version_vigente()
+    if version is None:
+        return JSONResponse({"error": "DB_NOT_FOUND"}, status_code=500)
     
-    # Recargar si el cache no existe o han pasado más de 60 segundos
-    if _data_cache is None or _cache_time is None or (datetime.now() - _cache_time).seconds > 60:
-        if not EXCEL_FILE.exists():
-            # Intentar buscar en el directorio actual por si acaso
-            alternative_path = Path(__file__).parent / "ANALISIS_MENSUAL_TIEMPOS_V2.xlsx"
-            if alternative_path.exists():
-                file_to_load = alternative_path
-            else:
-                print(f"[ERROR] No existe el archivo {EXCEL_FILE}")
-                return None, None, None
-        else:
-            file_to_load = EXCEL_FILE
-        
-        try:
-            # Lectura optimizada: solo hojas necesarias
-            df_centros = pd.read_excel(file_to_load, sheet_name='Datos_Centros')
-            df_rankings = pd.read_excel(file_to_load, sheet_name='Rankings')
-            
-            # Intentar cargar la nueva hoja de desglose
-            try:
-                df_ca = pd.read_excel(file_to_load, sheet_name='Datos_Centro_Articulo')
-            except Exception:
-                df_ca = pd.DataFrame(columns=['Fecha', 'Centro', 'Articulo', 'Horas'])
-            
-            # Limpieza y normalización
-            df_centros = df_centros.fillna(0)
-            df_rankings = df_rankings.fillna(0)
-            df_ca = df_ca.fillna(0)
-            
-            # Normalizar fechas a formato YYYY-MM-DD
-            for df in [df_centros, df_rankings, df_ca]:
-                if not df.empty and 'Fecha' in df.columns:
-                    df['Fecha'] = pd.to_datetime(df['Fecha']).dt.strftime('%Y-%m-%d')
-            
-            # Regla de Negocio: Excluir centros auxiliares (empiezan por 9)
-            def filter_aux(df):
-                if df.empty or 'Centro' not in df.columns: return df
-                return df[~df['Centro'].astype(str).str.startswith('9')]
-
-            df_centros = filter_aux(df_centros)
-            df_rankings = filter_aux(df_rankings)
-            df_ca = filter_aux(df_ca)
-            
-            _data_cache = (df_centros, df_rankings, df_ca)
-            _cache_time = datetime.now()
-        except Exception as e:
-            print(f"[ERROR] Fallo crítico cargando base de datos: {e}")
-            if _data_cache is not None:
-                return _data_cache
-            return None, None, None
+    entrada = _cache_respuestas.obtener(version.version, clave)
+    if entrada is None:
+        with cronometro.etapa("calculo"):
+            entrada = await calcular_entrada(version, clave, calcular)
+        if isinstance(entrada, Response):
+            return entrada
     
-    return _data_cache
+    cuerpo, cabeceras = entrada.variante(codificacion_preferida(request.headers))
+    if no_modificado(request.headers, cabeceras["ETag"], entrada.last_modified):
+        cabeceras.pop("Content-Encoding", None)
+        return Response(status_code=304, headers=cabeceras)
+    return Response(cuerpo, media_type="application/json", headers=cabeceras)
 
 @app.get("/api/status")
-def get_status():
-    """Endpoint de salud del sistema"""
-    data = load_data()
+async def get_status():
+    """Endpoint de salud del sistema. Responde al momento: nunca espera a una carga."""
+    version = _gestor.version
+    if version is None:
+        _gestor.solicitar_carga()
+        estado = "loading" if _gestor.cargando else "degraded"
+    else:
+        _gestor.iniciar()
+        estado = "online"
     return {
-        "status": "online" if data[0] is not None else "degraded",
-        "last_cache": _cache_time.strftime("%Y-%m-%d %H:%M:%S") if _cache_time else None,
-        "database": str(EXCEL_FILE.name)
+        "status": estado,
+        "last_cache": version.cargado_en.strftime("%Y-%m-%d %H:%M:%S") if version else None,
+        "database": str(version.origen.name if version else EXCEL_FILE.name),
+        "data_version": version.version if version else None,
+        "load_seconds": round(version.duracion_carga, 3) if version else None,
+        "startup_seconds": round(_arranque["segundos"], 3) if _arranque["segundos"] is not None else None,
+        "startup_source": _arranque["origen"],
+        "response_cache": _cache_respuestas.estadisticas()
     }
 
-@app.get("/api/centros")
-def get_centros():
-    """Lista maestra de centros con carga acumulada"""
-    data = load_data()
-    if data[0] is None: return JSONResponse({"error": "DB_NOT_FOUND"}, status_code=500)
-    
-    df_centros, _, _ = data
-    centros_carga = df_centros.groupby('Centro')['Carga_Dia'].sum().sort_values(ascending=False)
+@app.get("/api/metrics")
+async def get_metrics():
+    """Métricas del proceso en formato de texto de Prometheus"""
+    estadisticas = _cache_respuestas.estadisticas()
+    for nombre, clave in (("hits_total", "hits"), ("misses_total", "misses"), ("evictions_total", "evictions"),
+                          ("entries", "entries"), ("bytes", "bytes")):
+        METRICAS.fijar(f"rpk_response_cache_{nombre}", estadisticas[clave])
+    version = _gestor.version
+    METRICAS.reiniciar("rpk_dataset_info")
+    if version is not None:
+        METRICAS.fijar("rpk_dataset_info", 1, version=version.version, origen=version.origen.name)
+    return PlainTextResponse(METRICAS.exportar(), media_type=TIPO_CONTENIDO)
+
+def calcular_centros(dataset):
+    # Totales de todo el histórico desde el cubo (mismas sumas que groupby('Centro') de pandas)
+    cubo = dataset.cubo
+    centros_carga = pd.Series(
+        cubo.totales_centro(0, len(cubo.fechas), np.arange(len(cubo.centros))), index=cubo.centros
+    ).sort_values(ascending=False)
     centros_list = [{"id": str(c), "carga_total": round(v, 2)} for c, v in centros_carga.items()]
     
     return {"centros": centros_list}
 
-@app.get("/api/fechas")
-def get_fechas():
-    """Rango temporal de datos disponibles"""
-    data = load_data()
-    if data[0] is None: return JSONResponse({"error": "DB_NOT_FOUND"}, status_code=500)
-    
-    df_centros, _, _ = data
-    fechas = sorted(df_centros['Fecha'].unique())
+@app.get("/api/centros")
+async def get_centros(request: Request):
+    """Lista maestra de centros con carga acumulada"""
+    return await responder_cacheado(request, ('centros',), calcular_centros)
+
+def calcular_fechas(dataset):
+    fechas = dataset.cubo.fechas.tolist()
     
     return {
         "fecha_min": fechas[0] if fechas else None,
@@ -122,52 +481,44 @@ def get_fechas():
         "fechas": fechas
     }
 
-@app.get("/api/summary")
-def get_summary(
-    fecha_inicio: Optional[str] = Query(None),
-    fecha_fin: Optional[str] = Query(None)
-):
-    """Core Metrics Dashboard Data"""
-    data = load_data()
-    if data[0] is None: return JSONResponse({"error": "DB_NOT_FOUND"}, status_code=500)
-    
-    df_centros, df_rankings, _ = data
-    
-    # Filtrado por rango
-    if fecha_inicio: df_centros = df_centros[df_centros['Fecha'] >= fecha_inicio]
-    if fecha_fin: df_centros = df_centros[df_centros['Fecha'] <= fecha_fin]
+@app.get("/api/fechas")
+async def get_fechas(request: Request):
+    """Rango temporal de datos disponibles"""
+    return await responder_cacheado(request, ('fechas',), calcular_fechas)
+
+def calcular_summary(dataset, fecha_inicio=None, fecha_fin=None):
+    # Filtrado por rango sobre el cubo centro x día
+    cubo = dataset.cubo
+    i, j = cubo.rango(fecha_inicio, fecha_fin)
     
-    if df_centros.empty:
+    if i == j:
         return {"error": "NO_DATA_IN_RANGE", "kpis": {"total_carga": 0, "media_carga": 0, "num_centros": 0}}
     
     # Agregaciones KPI
-    total_carga = float(df_centros['Carga_Dia'].sum())
-    media_carga = float(df_centros.groupby('Fecha')['Carga_Dia'].sum().mean()) if not df_centros.empty else 0
-    num_centros = int(df_centros['Centro'].nunique())
+    total_carga = float(cubo.total(i, j))
+    evolucion = cubo.evolucion_total(i, j)
+    media_carga = float(evolucion.sum() / len(evolucion))
+    filas = np.flatnonzero(cubo.centros_en_rango(i, j))
+    num_centros = len(filas)
+    num_dias = j - i
     
-    # Evolución Total
-    evolucion = df_centros.groupby('Fecha')['Carga_Dia'].sum().sort_index()
+    # Agrupación por centro sobre el rango (mismas sumas que groupby de pandas)
+    ranking_data = pd.DataFrame({
+        'Centro': cubo.centros[filas],
+        'total_carga': cubo.totales_centro(i, j, filas),
+        'media_diaria': cubo.sumas_centro(i, j, filas) / num_dias
+    })
     
     # Evolución Top 5 para el gráfico principal
-    top_centros = df_centros.groupby('Centro')['Carga_Dia'].sum().nlargest(5).index.tolist()
+    top = ranking_data['total_carga'].nlargest(5).index
     evolucion_centros = {}
-    for c in top_centros:
-        df_c = df_centros[df_centros['Centro'] == c].sort_values('Fecha')
-        evolucion_centros[str(c)] = {
-            "fechas": df_c['Fecha'].tolist(),
-            "cargas": df_c['Carga_Dia'].tolist()
+    for pos in top:
+        fechas_c, cargas_c = cubo.serie_centro(filas[pos], i, j)
+        evolucion_centros[str(cubo.centros[filas[pos]].item())] = {
+            "fechas": fechas_c,
+            "cargas": cargas_c
         }
     
-    # Calcular Rankings y Medias dinámicas según el periodo filtrado
-    num_dias = df_centros['Fecha'].nunique()
-    if num_dias == 0: num_dias = 1
-    
-    # Agrupación por centro sobre los datos ya filtrados
-    ranking_data = df_centros.groupby('Centro').agg(
-        total_carga=('Carga_Dia', 'sum'),
-        media_diaria=('Carga_Dia', lambda x: x.sum() / num_dias)
-    ).reset_index()
-    
     # Ordenar por carga y preparar para el frontend
     ranking_data = ranking_data.sort_values('total_carga', ascending=False)
     ranking_data['Centro'] = ranking_data['Centro'].astype(int).astype(str)
@@ -185,52 +536,165 @@ def get_summary(
             "num_dias": num_dias
         },
         "evolucion_total": {
-            "fechas": evolucion.index.tolist(),
-            "cargas": evolucion.values.tolist()
+            "fechas": cubo.fechas[i:j].tolist(),
+            "cargas": evolucion.tolist()
         },
         "evolucion_centros": evolucion_centros,
         "rankings": rankings_dict,
-        "ultima_fecha": df_centros['Fecha'].max()
+        "ultima_fecha": cubo.fechas[j - 1]
     }
 
-@app.get("/api/centro/{centro_id}")
-def get_centro_detalle(
-    centro_id: str,
+def calcular_bootstrap(dataset, dias=DIAS_BOOTSTRAP):
+    """Datos de arranque del dashboard: fechas, centros y resumen de los últimos días"""
+    fechas = calcular_fechas(dataset)
+    lista = fechas["fechas"]
+    fecha_inicio = lista[max(0, len(lista) - dias)] if lista else None
+    fecha_fin = fechas["fecha_max"]
+    return {
+        "status": "online",
+        "fechas": fechas,
+        "centros": calcular_centros(dataset)["centros"],
+        "filtros": {"fecha_inicio": fecha_inicio, "fecha_fin": fecha_fin},
+        "summary": calcular_summary(dataset, fecha_inicio, fecha_fin)
+    }
+
+def calcular_saturacion(dataset, fecha=None, ventana=VENTANA_SATURACION, umbral=UMBRAL_SATURACION,
+                        dias=DIAS_SATURACION, limit=None):
+    """Centros saturados en la fecha (z de la carga frente a su media mensual), de mayor a menor z"""
+    cubo = dataset.cubo
+    _, j = cubo.rango(None, fecha)
+    if j == 0:
+        return {"error": "NO_DATA_IN_RANGE", "centros": []}
+    d = j - 1
+    
+    # La ventana por defecto viene precalculada con la versión; otra ventana se calcula al vuelo
+    saturacion = dataset.saturacion
+    if ventana != saturacion.ventana:
+        saturacion = SaturacionCentros(cubo, ventana)
+    filas = saturacion.saturados(d, umbral)
+    dias_saturados = saturacion.dias_saturados(d, dias, umbral)
+    
+    centros = []
+    for c in filas[:limit]:
+        carga, media_mensual = float(cubo.carga[c, d]), float(saturacion.media_mensual[c, d])
+        centros.append({
+            "id": cubo.claves[c],
+            "carga": round(carga, 2),
+            "media_mensual": round(media_mensual, 2),
+            "ratio": round(carga / media_mensual, 3) if media_mensual > 0 else None,
+            "media_movil": round(float(saturacion.media_movil[c, d]), 2),
+            "desv_movil": round(float(saturacion.desv_movil[c, d]), 2),
+            "z": round(float(saturacion.z[c, d]), 2),
+            "dias_saturados": int(dias_saturados[c])
+        })
+    
+    return {
+        "fecha": cubo.fechas[d],
+        "ventana": ventana,
+        "umbral": umbral,
+        "dias": dias,
+        "num_centros": int(cubo.presente[:, d].sum()),
+        "num_saturados": len(filas),
+        "centros": centros
+    }
+
+def ajustar_series_summary(contenido, granularidad='day', max_points=None, formato='json'):
+    """Aplica granularidad, LTTB y formato columnar a las series del resumen"""
+    if "evolucion_total" not in contenido or (granularidad, max_points, formato) == ('day', None, 'json'):
+        return contenido
+    fechas, cargas = agregar_periodo(
+        contenido["evolucion_total"]["fechas"], contenido["evolucion_total"]["cargas"], granularidad
+    )
+    series = {
+        c: agregar_periodo(s["fechas"], s["cargas"], granularidad)
+        for c, s in contenido["evolucion_centros"].items()
+    }
+    if formato == 'columnar':
+        # Eje del total común a todas las series; mismos puntos LTTB para todas
+        idx = indices_lttb(posiciones_eje(fechas), cargas, max_points or len(fechas))
+        contenido["evolucion_total"] = {
+            "fechas": [fechas[k] for k in idx],
+            "cargas": codificar_f32(np.asarray(cargas)[idx])
+        }
+        contenido["evolucion_centros"] = {
+            c: {"cargas": codificar_f32(alinear(fechas, f, v)[idx])} for c, (f, v) in series.items()
+        }
+        contenido["formato"] = formato
+        return contenido
+    fechas, cargas = reducir(fechas, cargas, max_points)
+    contenido["evolucion_total"] = {"fechas": fechas, "cargas": cargas}
+    for c, (f, v) in series.items():
+        f, v = reducir(f, v, max_points)
+        contenido["evolucion_centros"][c] = {"fechas": f, "cargas": v}
+    return contenido
+
+@app.get("/api/bootstrap")
+async def get_bootstrap(request: Request, dias: int = Query(DIAS_BOOTSTRAP, ge=1)):
+    """Carga inicial del dashboard en una sola respuesta (sustituye a fechas + centros + status + summary)"""
+    return await responder_cacheado(request, ('bootstrap', dias), lambda dataset: calcular_bootstrap(dataset, dias))
+
+@app.get("/api/saturacion")
+async def get_saturacion(
+    request: Request,
+    fecha: Optional[str] = Query(None),
+    ventana: int = Query(VENTANA_SATURACION, ge=2, le=365),
+    umbral: float = Query(UMBRAL_SATURACION, ge=-UMBRAL_SATURACION_MAX, le=UMBRAL_SATURACION_MAX, allow_inf_nan=False),
+    dias: int = Query(DIAS_SATURACION, ge=1),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Ranking de centros saturados en una fecha (por defecto la última con datos)"""
+    return await responder_cacheado(
+        request, ('saturacion', fecha or None, ventana, umbral, dias, limit),
+        lambda dataset: calcular_saturacion(dataset, fecha or None, ventana, umbral, dias, limit)
+    )
+
+@app.get("/api/summary")
+async def get_summary(
+    request: Request,
     fecha_inicio: Optional[str] = Query(None),
-    fecha_fin: Optional[str] = Query(None)
+    fecha_fin: Optional[str] = Query(None),
+    granularity: str = Query('day', pattern=PATRON_GRANULARIDAD),
+    max_points: Optional[int] = Query(None, ge=3),
+    formato: str = Query('json', pattern=PATRON_FORMATO)
 ):
-    """Detalle profundo de evolución por centro(s)"""
-    data = load_data()
-    if data[0] is None: return JSONResponse({"error": "DB_NOT_FOUND"}, status_code=500)
-    
-    df_centros, _, _ = data
-    centro_ids = [c.strip() for c in centro_id.split(',') if c.strip()]
+    """Core Metrics Dashboard Data"""
+    return await responder_cacheado(
+        request, ('summary', fecha_inicio or None, fecha_fin or None, granularity, max_points, formato),
+        lambda dataset: ajustar_series_summary(
+            calcular_summary(dataset, fecha_inicio, fecha_fin), granularity, max_points, formato
+        )
+    )
+
+def calcular_centro_detalle(dataset, centro_ids, fecha_inicio=None, fecha_fin=None):
+    # Búsqueda indexada de los centros en el cubo (sin recorrer Datos_Centros)
+    cubo = dataset.cubo
+    filas = cubo.filas_centros(centro_ids)
+    if not filas: return {"error": "CENTRO_NOT_FOUND"}
     
-    df_filtrado = df_centros[df_centros['Centro'].astype(str).isin(centro_ids)].copy()
-    if df_filtrado.empty: return {"error": "CENTRO_NOT_FOUND"}
+    i, j = cubo.rango(fecha_inicio, fecha_fin)
+    presente = cubo.presente[filas, i:j]
+    carga = cubo.carga[filas, i:j]
     
-    if fecha_inicio: df_filtrado = df_filtrado[df_filtrado['Fecha'] >= fecha_inicio]
-    if fecha_fin: df_filtrado = df_filtrado[df_filtrado['Fecha'] <= fecha_fin]
+    # Sincronización de ejes temporales: días con dato en alguno de los centros,
+    # los huecos de cada centro quedan a 0 en la misma pasada
+    dias = presente.any(axis=0)
+    todas_fechas = cubo.fechas[i:j][dias].tolist()
+    cargas = carga[:, dias]
     
-    todas_fechas = sorted(df_filtrado['Fecha'].unique())
     evoluciones = {}
-    
-    for cid in centro_ids:
-        df_c = df_filtrado[df_filtrado['Centro'].astype(str) == cid]
-        if df_c.empty: continue
-        
-        # Sincronización de ejes temporales
-        df_full = pd.DataFrame({'Fecha': todas_fechas})
-        df_full = pd.merge(df_full, df_c, on='Fecha', how='left').fillna(0)
+    for k, c in enumerate(filas):
+        valores = carga[k][presente[k]]
+        if len(valores) == 0: continue
         
-        evoluciones[cid] = {
-            "fechas": df_full['Fecha'].tolist(),
-            "cargas": df_full['Carga_Dia'].tolist(),
+        total = valores.sum()
+        evoluciones[cubo.claves[c]] = {
+            "fechas": todas_fechas,
+            "cargas": cargas[k].tolist(),
             "stats": {
-                "total": round(float(df_c['Carga_Dia'].sum()), 2),
-                "media": round(float(df_c['Carga_Dia'].mean()), 2),
-                "max": round(float(df_c['Carga_Dia'].max()), 2),
-                "min": round(float(df_c['Carga_Dia'].min()), 2)
+                "total": round(float(total), 2),
+                "media": round(float(total / len(valores)), 2),
+                "max": round(float(valores.max()), 2),
+                "min": round(float(valores.min()), 2)
             }
         }
     
@@ -240,39 +704,115 @@ def get_centro_detalle(
         "multiple": len(centro_ids) > 1
     }
 
-@app.get("/api/centro/{centro_id}/articulos/mes/{mes}")
-def get_centro_breakdown(centro_id: str, mes: str):
-    """Drill-down: Desglose de artículos por centro y mes"""
-    data = load_data()
-    if data[0] is None: return JSONResponse({"error": "DB_NOT_FOUND"}, status_code=500)
-    
-    _, _, df_ca = data
-    if df_ca.empty: return {"articulos": []}
-    
-    centro_ids = [c.strip() for c in centro_id.split(',') if c.strip()]
-    df_f = df_ca[df_ca['Centro'].astype(str).isin(centro_ids)].copy()
-    df_f['Mes'] = pd.to_datetime(df_f['Fecha']).dt.strftime('%Y-%m')
-    df_f = df_f[df_f['Mes'] == mes]
-    
-    if df_f.empty: return {"articulos": []}
+def ajustar_series_centro(contenido, granularidad='day', max_points=None, formato='json'):
+    """Granularidad, LTTB y formato columnar sobre el eje compartido del detalle.
+    Los puntos LTTB se eligen sobre la suma de los centros y valen para todos;
+    las estadísticas se calculan siempre sobre los datos diarios."""
+    if "centros" not in contenido or (granularidad, max_points, formato) == ('day', None, 'json'):
+        return contenido
+    fechas = contenido["fechas"]
+    eje = agregar_periodo(fechas, np.zeros(len(fechas)), granularidad)[0]
+    series = {
+        c: np.asarray(agregar_periodo(fechas, s["cargas"], granularidad)[1])
+        for c, s in contenido["centros"].items()
+    }
+    suma = np.sum(list(series.values()), axis=0) if series else np.zeros(len(eje))
+    idx = indices_lttb(posiciones_eje(eje), suma, max_points or len(eje))
+    contenido["fechas"] = [eje[k] for k in idx]
+    for c, s in contenido["centros"].items():
+        if formato == 'columnar':
+            del s["fechas"]
+            s["cargas"] = codificar_f32(series[c][idx])
+        else:
+            s["fechas"] = contenido["fechas"]
+            s["cargas"] = series[c][idx].tolist()
+    if formato == 'columnar':
+        contenido["formato"] = formato
+    return contenido
+
+@app.get("/api/centro/{centro_id}")
+async def get_centro_detalle(
+    request: Request,
+    centro_id: str,
+    fecha_inicio: Optional[str] = Query(None),
+    fecha_fin: Optional[str] = Query(None),
+    granularity: str = Query('day', pattern=PATRON_GRANULARIDAD),
+    max_points: Optional[int] = Query(None, ge=3),
+    formato: str = Query('json', pattern=PATRON_FORMATO)
+):
+    """Detalle profundo de evolución por centro(s)"""
+    centro_ids = parse_centro_ids(centro_id)
+    return await responder_cacheado(
+        request, ('centro', tuple(centro_ids), fecha_inicio or None, fecha_fin or None, granularity, max_points, formato),
+        lambda dataset: ajustar_series_centro(
+            calcular_centro_detalle(dataset, centro_ids, fecha_inicio, fecha_fin), granularity, max_points, formato
+        )
+    )
+
+def calcular_centro_breakdown(dataset, centro_ids, mes, limit=None, offset=0):
+    if dataset.articulos.vacio: return {"articulos": []}
     
-    # Agrupación por Artículo y O.F. (si existe)
-    agg_cols = ['Articulo']
-    if 'OF' in df_f.columns: agg_cols.append('OF')
+    # Corte del resumen precalculado por (Centro, Mes)
+    df_res = dataset.articulos.desglose(centro_ids, mes)
+    if df_res.empty: return {"articulos": []}
     
-    df_res = df_f.groupby(agg_cols).agg(
-        horas=('Horas', 'mean'),
-        dias=('Fecha', 'nunique')
-    ).reset_index().sort_values('horas', ascending=False)
+    df_res = df_res.sort_values('horas', ascending=False)
     
     total = df_res['horas'].sum()
     df_res['porcentaje'] = (df_res['horas'] / total * 100).round(2) if total > 0 else 0
     
-    return {
+    respuesta = {
         "mes": mes,
-        "total_horas": round(float(total), 2),
-        "articulos": df_res.rename(columns={'Articulo': 'articulo', 'OF': 'of'}).to_dict(orient='records')
+        "total_horas": round(float(total), 2)
     }
+    # Paginación opcional (los totales y porcentajes son siempre del mes completo)
+    if limit is not None or offset:
+        respuesta["paginacion"] = {"total": len(df_res), "offset": offset, "limit": limit}
+        df_res = df_res.iloc[offset:offset + limit if limit is not None else None]
+    
+    respuesta["articulos"] = df_res.rename(columns={'Articulo': 'articulo', 'OF': 'of'}).to_dict(orient='records')
+    return respuesta
+
+@app.get("/api/centro/{centro_id}/articulos/mes/{mes}")
+async def get_centro_breakdown(
+    request: Request,
+    centro_id: str,
+    mes: str,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0)
+):
+    """Drill-down: Desglose de artículos por centro y mes"""
+    centro_ids = parse_centro_ids(centro_id)
+    # El resultado no depende del orden ni de repeticiones en la lista de centros
+    return await responder_cacheado(
+        request, ('articulos', tuple(sorted(set(centro_ids))), mes, limit, offset),
+        lambda dataset: calcular_centro_breakdown(dataset, centro_ids, mes, limit, offset)
+    )
+
+def calcular_busqueda(dataset, q, campo='todos', limit=LIMITE_BUSQUEDA, offset=0):
+    """Artículos/O.F. que empiezan por q, de más a menos horas, con sus centros y meses"""
+    campos = list(CAMPOS) if campo == 'todos' else [campo]
+    total, resultados = dataset.busqueda.buscar(q, campos, offset, limit)
+    return {
+        "q": q,
+        "campo": campo,
+        "paginacion": {"total": total, "offset": offset, "limit": limit},
+        "resultados": resultados
+    }
+
+@app.get("/api/articulos/buscar")
+async def get_busqueda_articulos(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100, pattern=PATRON_TEXTO_BUSQUEDA),
+    campo: str = Query('todos', pattern=PATRON_CAMPO_BUSQUEDA),
+    limit: int = Query(LIMITE_BUSQUEDA, ge=1, le=500),
+    offset: int = Query(0, ge=0)
+):
+    """Autocompletado: búsqueda por prefijo de Artículo y/o O.F. en todo el histórico"""
+    return await responder_cacheado(
+        request, ('busqueda', q, campo, limit, offset),
+        lambda dataset: calcular_busqueda(dataset, q, campo, limit, offset)
+    )
 
 # SPA: Servir frontend
 # Montamos toda la carpeta frontend bajo /static para simplificar rutas
@@ -285,6 +825,43 @@ def read_index():
     return FileResponse(STATIC_DIR / "ui" / "index.html")
 
 if __name__ == "__main__":
+    import argparse
     import uvicorn
+    parser = argparse.ArgumentParser(description="Servidor del dashboard de tiempos")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Procesos uvicorn; con más de 1 los datos se comparten vía snapshots mapeados")
     # Puerto estándar RPK
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--motor', choices=MOTORES, default=MOTOR,
+                        help="sqlite: el drill-down de artículos consulta el fichero .sqlite del ETL (analisis_mensual_tiempos.py --sqlite)")
+    parser.add_argument('--server-timing', action='store_true',
+                        help="Añade la cabecera Server-Timing (datos, calculo, total) a cada respuesta")
+    args = parser.parse_args()
+    
+    if args.server_timing:
+        # Por entorno para que lo hereden los workers
+        os.environ[VARIABLE_SERVER_TIMING] = "1"
+        SERVER_TIMING = True
+    # Por entorno para que lo hereden los workers
+    os.environ[VARIABLE_MOTOR] = MOTOR = args.motor
+    
+    if args.workers > 1 and MOTOR != 'sqlite' and not HAY_PYARROW:
+        print("[AVISO] pyarrow no disponible: se arranca con un único worker")
+        args.workers = 1
+    
+    if args.workers > 1 and MOTOR == 'sqlite':
+        # Cada worker abre el fichero SQLite en solo lectura: no hace falta publicar snapshots
+        print(f"[INFO] Motor sqlite | {args.workers} workers")
+        uvicorn.run("server:app", host="0.0.0.0", port=args.port, workers=args.workers,
+                    app_dir=str(Path(__file__).parent))
+    elif args.workers > 1:
+        # Este proceso solo publica: lee la fuente y genera un snapshot por versión
+        CARPETA_SNAPSHOTS.mkdir(parents=True, exist_ok=True)
+        os.environ[VARIABLE_SNAPSHOTS] = str(CARPETA_SNAPSHOTS)
+        publicador = GestorVersionDatos(resolver_origen, publicar_snapshot, versionar=versionar_origen)
+        publicador.actual()
+        print(f"[INFO] Snapshots en {CARPETA_SNAPSHOTS} | {args.workers} workers")
+        uvicorn.run("server:app", host="0.0.0.0", port=args.port, workers=args.workers,
+                    app_dir=str(Path(__file__).parent))
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=args.port)
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+SNAPSHOTS COMPARTIDOS ENTRE WORKERS
+===================================
+En modo multi-worker un único proceso lee la fuente y publica las tablas ya
+normalizadas (tipos compactos) como ficheros Arrow IPC en un directorio por
+versión. Cada worker las abre con memory-map: las columnas numéricas y de
+fechas son vistas sobre el fichero y el sistema operativo comparte esas
+páginas entre procesos, así que la RAM no se multiplica por el número de
+workers.
+
+Estructura:
+    snapshots/
+        actual.json                      # puntero a la versión vigente
+        <origen>-<version>/
+            snapshot.json                # versión, origen y huella de la fuente
+            Datos_Centros.arrow
+            Rankings.arrow
+            Datos_Centro_Articulo.arrow
+
+Los categóricos con categorías de tipos mezclados (p.ej. O.F. enteras y
+alfanuméricas) no caben en un diccionario Arrow tipado: sus categorías se
+guardan como JSON y se decodifican al abrir (solo los valores distintos).
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    HAY_PYARROW = True
+except ImportError:
+    pa = None
+    ipc = None
+    HAY_PYARROW = False
+
+# Variable de entorno con la carpeta de snapshots (la fijan el lanzador y hereda cada worker)
+VARIABLE_SNAPSHOTS = "RPK_SNAPSHOTS"
+PUNTERO = "actual.json"
+MANIFIESTO = "snapshot.json"
+EXTENSION = ".arrow"
+# Snapshots que se conservan (el vigente y el anterior, que algún worker puede tener abierto)
+SNAPSHOTS_CONSERVADOS = 2
+CLAVE_CATEGORIAS_JSON = b"rpk_categorias_json"
+
+
+def _categorias_mixtas(serie):
+    categorias = serie.cat.categories
+    return categorias.dtype == object and not all(isinstance(c, str) for c in categorias)
+
+
+def tabla_snapshot(df):
+    """Tabla Arrow que conserva los tipos pandas de la tabla compacta"""
+    mixtas = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype) and _categorias_mixtas(df[c])]
+    base = df.drop(columns=mixtas)
+    tabla = pa.Table.from_pandas(base, preserve_index=False)
+    for col in mixtas:
+        serie = df[col]
+        diccionario = pa.array([json.dumps(c) for c in serie.cat.categories], type=pa.string())
+        arr = pa.DictionaryArray.from_arrays(pa.array(serie.cat.codes, mask=(serie.cat.codes < 0).to_numpy()), diccionario)
+        tabla = tabla.append_column(col, arr)
+    # Mismo orden de columnas que el DataFrame original
+    tabla = tabla.select([str(c) for c in df.columns])
+    metadata = dict(tabla.schema.metadata or {})
+    metadata[CLAVE_CATEGORIAS_JSON] = json.dumps(mixtas).encode('utf-8')
+    return tabla.replace_schema_metadata(metadata)
+
+
+def _escribir_json(ruta, datos):
+    """Escribe un JSON con sustitución atómica (nunca se lee a medio escribir)"""
+    temporal = ruta.with_name(f"{ruta.name}.tmp")
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(datos, f)
+    os.replace(temporal, ruta)
+
+
+def escribir_snapshot(carpeta, nombre, version, origen, tablas, huella=None):
+    """Escribe las tablas de una versión y publica el puntero (sustitución atómica).
+
+    huella: huella de la fuente de la que salen las tablas (se guarda en el
+    manifiesto para comprobar más tarde que el snapshot sigue al día).
+    """
+    carpeta = Path(carpeta)
+    destino = carpeta / nombre
+    temporal = carpeta / f".{nombre}.tmp"
+    if not destino.exists():
+        shutil.rmtree(temporal, ignore_errors=True)
+        temporal.mkdir(parents=True)
+        for tabla_nombre, df in tablas.items():
+            tabla = tabla_snapshot(df)
+            with pa.OSFile(str(temporal / f"{tabla_nombre}{EXTENSION}"), 'wb') as sink:
+                with ipc.new_file(sink, tabla.schema) as writer:
+                    writer.write_table(tabla)
+        _escribir_json(temporal / MANIFIESTO, {"version": version, "origen": str(origen), "huella": huella})
+        os.replace(temporal, destino)
+    elif huella is not None and manifiesto_snapshot(destino).get("huella") != huella:
+        # Mismo contenido con otra huella (fichero tocado o copiado): basta con renovar el manifiesto
+        renovar_huella(destino, huella)
+
+    _escribir_json(carpeta / PUNTERO, {"directorio": nombre, "version": version})
+    limpiar_snapshots(carpeta, nombre)
+    return destino
+
+
+def limpiar_snapshots(carpeta, vigente):
+    """Borra snapshots antiguos. En Windows un fichero mapeado no se puede
+    borrar: se ignora y se reintenta en la siguiente publicación."""
+    anteriores = sorted(
+        (d for d in Path(carpeta).iterdir() if d.is_dir() and not d.name.startswith('.') and d.name != vigente),
+        key=lambda d: d.stat().st_mtime, reverse=True
+    )
+    for d in anteriores[SNAPSHOTS_CONSERVADOS - 1:]:
+        shutil.rmtree(d, ignore_errors=True)
+
+
+def snapshot_vigente(carpeta):
+    """Directorio de la versión publicada (None si aún no hay ninguna)"""
+    try:
+        with open(Path(carpeta) / PUNTERO, 'r', encoding='utf-8') as f:
+            directorio = Path(carpeta) / json.load(f)["directorio"]
+    except (OSError, ValueError, KeyError):
+        return None
+    return directorio if (directorio / MANIFIESTO).exists() else None
+
+
+def es_snapshot(directorio):
+    """Indica si la ruta es el directorio de una versión publicada"""
+    return (Path(directorio) / MANIFIESTO).is_file()
+
+
+def manifiesto_snapshot(directorio):
+    """Versión, origen y huella de la fuente registrados en el snapshot"""
+    with open(Path(directorio) / MANIFIESTO, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def renovar_huella(directorio, huella):
+    """Sustituye la huella de la fuente registrada en el manifiesto (mismo contenido)"""
+    manifiesto = manifiesto_snapshot(directorio)
+    manifiesto["huella"] = huella
+    _escribir_json(Path(directorio) / MANIFIESTO, manifiesto)
+
+
+def version_snapshot(directorio):
+    """Versión de datos registrada en el snapshot (igual en todos los workers)"""
+    return manifiesto_snapshot(directorio)["version"]
+
+
+def abrir_snapshot(directorio, nombres):
+    """DataFrames del snapshot mapeados en memoria (sin copiar las columnas numéricas)"""
+    tablas = []
+    for nombre in nombres:
+        with pa.memory_map(str(Path(directorio) / f"{nombre}{EXTENSION}"), 'r') as fuente:
+            tabla = ipc.open_file(fuente).read_all()
+        mixtas = json.loads((tabla.schema.metadata or {}).get(CLAVE_CATEGORIAS_JSON, b"[]"))
+        df = tabla.to_pandas(split_blocks=True)
+        for col in mixtas:
+            df[col] = pd.Categorical.from_codes(
+                df[col].cat.codes, categories=pd.Index([json.loads(c) for c in df[col].cat.categories], dtype=object)
+            )
+        tablas.append(df)
+    return tablas
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+TABLAS COMPACTAS EN MEMORIA
+===========================
+Tipos de columna con los que el servidor mantiene cargadas las tablas del
+análisis. Las fechas se guardan como datetime64 (no como texto), los
+códigos de centro como el entero más pequeño que los representa y los
+textos repetitivos (Artículo, O.F., Tipo) como categóricos. El paso a texto
+'YYYY-MM-DD' se hace solo al construir el JSON. normalizar_tablas aplica
+la limpieza común (nulos y centros auxiliares) antes de compactar.
+
+Horas y Carga_Dia se mantienen en float64: se devuelven tal cual en la API
+y en float32 cambiarían los decimales publicados.
+"""
+import pandas as pd
+
+
+def fechas_a_texto(fechas):
+    """Fechas únicas (datetime64 o texto) como lista ordenable de 'YYYY-MM-DD'"""
+    if pd.api.types.is_datetime64_any_dtype(fechas):
+        return pd.DatetimeIndex(fechas).strftime('%Y-%m-%d')
+    return fechas
+
+
+def compactar_tabla(df):
+    """Nueva tabla con tipos compactos (mismos valores, menos memoria)"""
+    columnas = {}
+    for col in df.columns:
+        serie = df[col]
+        if col == 'Fecha':
+            serie = pd.to_datetime(serie).dt.floor('D').astype('datetime64[s]')
+        elif pd.api.types.is_bool_dtype(serie) or pd.api.types.is_float_dtype(serie):
+            pass
+        elif pd.api.types.is_integer_dtype(serie):
+            serie = pd.to_numeric(serie, downcast='integer')
+        else:
+            serie = serie.astype('category')
+        columnas[col] = serie
+    return pd.DataFrame(columnas, index=df.index)
+
+
+def normalizar_tablas(df_centros, df_rankings, df_ca):
+    """Limpieza, filtro de centros auxiliares y tipos compactos de las tres tablas"""
+    # Limpieza y normalización
+    df_centros = df_centros.fillna(0)
+    df_rankings = df_rankings.fillna(0)
+    df_ca = df_ca.fillna(0)
+    
+    # Regla de Negocio: Excluir centros auxiliares (empiezan por 9)
+    def filter_aux(df):
+        if df.empty or 'Centro' not in df.columns: return df
+        return df[~df['Centro'].astype(str).str.startswith('9')]
+
+    df_centros = filter_aux(df_centros)
+    df_rankings = filter_aux(df_rankings)
+    df_ca = filter_aux(df_ca)
+    
+    # Tipos compactos: fechas a día (datetime64), códigos enteros y categóricos.
+    # Las fechas pasan a texto YYYY-MM-DD solo al serializar
+    return tuple(compactar_tabla(df) for df in (df_centros, df_rankings, df_ca))
+
+
+def uso_memoria(tablas):
+    """Bytes ocupados por cada tabla (incluye el contenido de objetos Python)"""
+    return {nombre: int(df.memory_usage(deep=True).sum()) for nombre, df in tablas.items()}
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+GESTOR DE VERSIONES DE DATOS
+============================
+Sustituye el TTL de 60 segundos del servidor por invalidación dirigida por
+cambios en la fuente (mtime, tamaño y hash del contenido). La nueva versión
+se construye en un hilo de fondo y se publica con un único intercambio de
+referencia, de modo que las peticiones nunca ven un cache a medio construir.
+"""
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+# Segundos entre comprobaciones de la fuente
+INTERVALO_VIGILANCIA = 5.0
+
+
+@dataclass(frozen=True)
+class VersionDatos:
+    """Instantánea inmutable de un dataset cargado"""
+    datos: Any
+    version: str
+    origen: Path
+    huella: tuple
+    cargado_en: datetime
+    duracion_carga: float
+
+
+def ficheros_origen(ruta):
+    """Ficheros que componen la fuente (el Excel o las tablas del almacén)"""
+    ruta = Path(ruta)
+    if ruta.is_dir():
+        return sorted(p for p in ruta.iterdir() if p.is_file() and p.suffix != '.tmp')
+    return [ruta]
+
+
+def huella_origen(ruta):
+    """Huella barata de la fuente: (nombre, mtime_ns, tamaño) de cada fichero"""
+    huella = []
+    for f in ficheros_origen(ruta):
+        st = f.stat()
+        huella.append((f.name, st.st_mtime_ns, st.st_size))
+    return (str(ruta), tuple(huella))
+
+
+def hash_origen(ruta):
+    """Hash SHA-256 del contenido de la fuente (12 primeros caracteres)"""
+    h = hashlib.sha256()
+    for f in ficheros_origen(ruta):
+        h.update(f.name.encode('utf-8'))
+        with open(f, 'rb') as fh:
+            for bloque in iter(lambda: fh.read(1 << 20), b''):
+                h.update(bloque)
+    return h.hexdigest()[:12]
+
+
+class GestorVersionDatos:
+    """Mantiene la versión vigente del dataset y la renueva cuando cambia la fuente.
+
+    resolver() -> (tipo, ruta) indica la fuente actual; cargar(tipo, ruta,
+    version, huella) construye el dataset completo y versionar(ruta) identifica
+    su contenido (por defecto el hash de los ficheros). version y huella se
+    toman antes de leer la fuente: si cambia durante la carga, la versión
+    publicada es la anterior y la siguiente comprobación vuelve a cargar. Solo el hilo vigilante (o la primera
+    petición, si aún no hay datos) paga el coste de la carga; las peticiones
+    que llegan mientras tanto esperan a esa misma carga (single-flight).
+    """
+
+    def __init__(self, resolver, cargar, intervalo=INTERVALO_VIGILANCIA, versionar=hash_origen):
+        self._resolver = resolver
+        self._cargar = cargar
+        self._versionar = versionar
+        self._intervalo = intervalo
+        self._actual: Optional[VersionDatos] = None
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._parada = threading.Event()
+        # Última huella intentada (con éxito o no) y huella vista en la comprobación anterior
+        self._huella_intentada = None
+        self._huella_previa = None
+        self.ultimo_error = None
+        # Carga bajo demanda: un único hilo y un único Future en curso
+        self._cargador = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rpk-carga")
+        self._futuro = None
+        self._lock_futuro = threading.Lock()
+
+    @property
+    def version(self) -> Optional[VersionDatos]:
+        return self._actual
+
+    @property
+    def cargando(self):
+        """Hay una carga bajo demanda en curso"""
+        futuro = self._futuro
+        return futuro is not None and not futuro.done()
+
+    def solicitar_carga(self):
+        """Lanza la carga en segundo plano y devuelve su Future.
+
+        Si ya hay una en curso se devuelve el mismo Future: quien llegue
+        durante la carga espera a ese resultado en lugar de releer la fuente.
+        """
+        with self._lock_futuro:
+            if self._futuro is None or self._futuro.done():
+                self._futuro = self._cargador.submit(self.recargar)
+            return self._futuro
+
+    def actual(self) -> Optional[VersionDatos]:
+        """Versión vigente. Solo bloquea si todavía no se ha cargado ninguna."""
+        if self._actual is None:
+            self.solicitar_carga().result()
+        self.iniciar()
+        return self._actual
+
+    def iniciar(self):
+        """Arranca el hilo vigilante (idempotente)"""
+        if self._hilo is None or not self._hilo.is_alive():
+            self._parada.clear()
+            self._hilo = threading.Thread(target=self._vigilar, name="rpk-version-datos", daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        self._parada.set()
+
+    def recargar(self, forzar=False, estable=False):
+        """Construye y publica una nueva versión si la fuente ha cambiado.
+
+        Con estable=True solo se recarga cuando la huella coincide con la de
+        la comprobación anterior, para no leer un fichero a medio escribir.
+        """
+        with self._lock:
+            tipo, ruta = self._resolver()
+            if ruta is None:
+                self.ultimo_error = "DB_NOT_FOUND"
+                return self._actual
+
+            try:
+                huella = huella_origen(ruta)
+            except OSError as e:
+                self.ultimo_error = str(e)
+                return self._actual
+
+            previa, self._huella_previa = self._huella_previa, huella
+            if not forzar:
+                if self._actual is not None and huella == self._actual.huella:
+                    return self._actual
+                if huella == self._huella_intentada:
+                    return self._actual
+                if estable and self._actual is not None and huella != previa:
+                    return self._actual
+
+            self._huella_intentada = huella
+            try:
+                version = self._versionar(ruta)
+                if not forzar and self._actual is not None and version == self._actual.version:
+                    # Mismo contenido (p.ej. fichero tocado, o el snapshot preparado de la fuente
+                    # recién cargada): solo se actualizan la huella y el origen
+                    self._actual = replace(self._actual, huella=huella, origen=Path(ruta))
+                    return self._actual
+
+                inicio = time.perf_counter()
+                datos = self._cargar(tipo, ruta, version, huella)
+                duracion = time.perf_counter() - inicio
+            except Exception as e:
+                self.ultimo_error = str(e)
+                print(f"[ERROR] Fallo crítico cargando base de datos: {e}")
+                return self._actual
+
+            # Intercambio atómico: una sola asignación de referencia
+            self._actual = VersionDatos(
+                datos=datos,
+                version=version,
+                origen=Path(ruta),
+                huella=huella,
+                cargado_en=datetime.now(),
+                duracion_carga=duracion
+            )
+            self.ultimo_error = None
+            print(f"[INFO] Datos cargados: versión {version} ({duracion:.2f}s) desde {Path(ruta).name}")
+            return self._actual
+
+    def _vigilar(self):
+        while not self._parada.wait(self._intervalo):
+            try:
+                self.recargar(estable=True)
+            except Exception as e:
+                self.ultimo_error = str(e)
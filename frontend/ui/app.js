@@ -12,6 +12,8 @@ const state = {
     centros: [],
     selectedCentros: [],
     charts: {},
+    // Summary of the initial filters, delivered by /api/bootstrap
+    initialSummary: null,
     filters: {
         from: '',
         to: ''
@@ -44,24 +46,19 @@ document.addEventListener('DOMContentLoaded', async () => {
 
 async function initializeSystem() {
     try {
-        // Fetch base data
-        const [fechasRes, centrosRes, statusRes] = await Promise.all([
-            fetch(`${API_BASE}/fechas`),
-            fetch(`${API_BASE}/centros`),
-            fetch(`${API_BASE}/status`)
-        ]);
-
-        const fechasData = await fechasRes.json();
-        const centrosData = await centrosRes.json();
-        const statusData = await statusRes.json();
+        // Fetch base data (dates, centers and first summary) in a single request
+        const res = await fetch(`${API_BASE}/bootstrap`);
+        const data = await res.json();
+        const statusData = res.ok ? data : { status: 'degraded' };
 
-        state.fechas = fechasData.fechas || [];
-        state.centros = centrosData.centros || [];
+        state.fechas = (data.fechas && data.fechas.fechas) || [];
+        state.centros = data.centros || [];
 
         // Setup initial date filters (last 30 days if available)
         if (state.fechas.length > 0) {
-            state.filters.to = state.fechas[state.fechas.length - 1];
-            state.filters.from = state.fechas[Math.max(0, state.fechas.length - 30)];
+            state.filters.to = data.filtros.fecha_fin;
+            state.filters.from = data.filtros.fecha_inicio;
+            state.initialSummary = data.summary;
 
             document.getElementById('date-from').value = state.filters.from;
             document.getElementById('date-to').value = state.filters.to;
@@ -153,13 +150,18 @@ async function refreshCurrentTab() {
  * DASHBOARD VIEW
  */
 async function renderDashboard() {
-    const params = new URLSearchParams({
-        fecha_inicio: state.filters.from,
-        fecha_fin: state.filters.to
-    });
+    let data = state.initialSummary;
+    state.initialSummary = null;
 
-    const res = await fetch(`${API_BASE}/summary?${params}`);
-    const data = await res.json();
+    if (!data) {
+        const params = new URLSearchParams({
+            fecha_inicio: state.filters.from,
+            fecha_fin: state.filters.to
+        });
+
+        const res = await fetch(`${API_BASE}/summary?${params}`);
+        data = await res.json();
+    }
 
     if (data.error) {
         console.error('Dashboard data error:', data.error);
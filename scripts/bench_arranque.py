@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK: ARRANQUE DEL SERVIDOR
+================================
+Mide el tiempo hasta que el servidor tiene datos servibles (startup_seconds
+de /api/status) en dos arranques consecutivos, cada uno en un proceso nuevo
+sobre una copia aislada del dataset:
+  1. en frío: lee y normaliza el Excel y guarda el snapshot preparado,
+  2. en caliente: arranca desde el snapshot preparado (misma huella).
+Verifica que la segunda vez se usa el snapshot y que las respuestas de la
+API (las de la verificación golden, incluidos los desgloses por artículo,
+y las de la búsqueda) son idénticas en ambos arranques.
+
+Uso:
+    python scripts/bench_arranque.py
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+DATASET = ROOT_DIR / "ANALISIS_MENSUAL_TIEMPOS_V2.xlsx"
+sys.path.insert(0, str(ROOT_DIR / "scripts"))
+
+from verificar_golden import URLS as URLS_GOLDEN  # noqa: E402
+
+URLS = ["/api/bootstrap", "/api/saturacion"] + URLS_GOLDEN + [
+    f"/api/articulos/buscar?q={q}" for q in ("1", "45", "14", "a")
+] + ["/api/articulos/buscar?q=14&campo=of", "/api/articulos/buscar?q=4&campo=articulo&limit=500"]
+
+
+def arrancar(excel):
+    """Proceso hijo: arranca la app (lifespan), espera a estar online y vuelca status y respuestas"""
+    sys.path.insert(0, str(ROOT_DIR / "backend"))
+    import server
+    from fastapi.testclient import TestClient
+
+    server.EXCEL_FILE = server.ALTERNATIVE_FILE = Path(excel)
+    with TestClient(server.app) as client:
+        while (status := client.get("/api/status").json())["status"] != "online":
+            time.sleep(0.01)
+        respuestas = {url: client.get(url).json() for url in URLS}
+    print(json.dumps({"status": status, "respuestas": respuestas}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arranque en frío y desde el snapshot preparado")
+    parser.add_argument('--hijo', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.hijo:
+        arrancar(args.hijo)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        excel = Path(tmp) / DATASET.name
+        shutil.copy2(DATASET, excel)
+        resultados = []
+        for etiqueta in ("frío", "snapshot preparado"):
+            inicio = time.perf_counter()
+            salida = subprocess.run([sys.executable, __file__, '--hijo', str(excel)],
+                                    capture_output=True, text=True, check=True).stdout
+            total = time.perf_counter() - inicio
+            resultado = json.loads(salida.strip().splitlines()[-1])
+            status = resultado["status"]
+            print(f"[RESULTADO] Arranque {etiqueta}: {status['startup_seconds']:.2f}s hasta datos "
+                  f"(origen {status['startup_source']}, proceso completo {total:.2f}s)")
+            resultados.append(resultado)
+
+    if resultados[1]["status"]["startup_source"] != 'preparado':
+        print("[ERROR] El segundo arranque no ha usado el snapshot preparado")
+        sys.exit(1)
+    if resultados[0]["respuestas"] != resultados[1]["respuestas"] \
+            or resultados[0]["status"]["data_version"] != resultados[1]["status"]["data_version"]:
+        print("[ERROR] Las respuestas o la versión de datos difieren entre arranques")
+        sys.exit(1)
+    print("[OK] Misma versión de datos y respuestas idénticas en ambos arranques")
+
+
+if __name__ == "__main__":
+    main()
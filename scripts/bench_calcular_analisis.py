@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK: AGREGACION DEL ANALISIS
+==================================
+Compara calcular_analisis (claves factorizadas una vez, agregación por
+códigos enteros y medias mensuales con transform) con la implementación
+anterior (tres groupby sobre las columnas, conversión de fechas fila a fila
+y merge con el agregado mensual) sobre un histórico sintético con O.F
+mixtas, tiempos nulos y claves vacías. Verifica que las tres tablas son
+idénticas (valores, orden y tipos) y mide tiempo y pico de memoria.
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+sys.path.insert(0, str(ROOT_DIR / "scripts"))
+
+import analisis_mensual_tiempos as etl  # noqa: E402
+from generador_sintetico import generar_reporte  # noqa: E402
+
+
+def analisis_por_merge(df_unificado):
+    """Implementación anterior (groupby por nivel + merge mensual), como referencia"""
+    df_diario_centro = df_unificado.groupby(['Fecha_Reporte', 'Centro'])['TEjec_Disp'].sum().reset_index()
+    df_diario_centro.columns = ['Fecha', 'Centro', 'Carga_Dia']
+    df_diario_centro['Fecha'] = pd.to_datetime(df_diario_centro['Fecha']).dt.date
+    df_diario_centro['Mes'] = pd.to_datetime(df_diario_centro['Fecha']).dt.strftime('%Y-%m')
+    df_mensual_centro = df_diario_centro.groupby(['Mes', 'Centro'])['Carga_Dia'].agg(
+        Media_Mensual='mean', Total_Mes='sum'
+    ).reset_index()
+    media_por_centro = pd.merge(df_diario_centro, df_mensual_centro, on=['Mes', 'Centro'], how='left')
+    media_por_centro = media_por_centro[['Fecha', 'Centro', 'Carga_Dia', 'Media_Mensual', 'Total_Mes']]
+
+    df_diario_articulo = df_unificado.groupby(['Fecha_Reporte', 'Artículo'])['TEjec_Disp'].sum().reset_index()
+    df_diario_articulo.columns = ['Fecha', 'Artículo', 'Carga_Dia']
+    df_diario_articulo['Fecha'] = pd.to_datetime(df_diario_articulo['Fecha']).dt.date
+    df_diario_articulo['Mes'] = pd.to_datetime(df_diario_articulo['Fecha']).dt.strftime('%Y-%m')
+    df_mensual_articulo = df_diario_articulo.groupby(['Mes', 'Artículo'])['Carga_Dia'].agg(
+        Media_Mensual='mean', Total_Mes='sum'
+    ).reset_index()
+    media_por_articulo = pd.merge(df_diario_articulo, df_mensual_articulo, on=['Mes', 'Artículo'], how='left')
+    media_por_articulo = media_por_articulo[['Fecha', 'Artículo', 'Carga_Dia', 'Media_Mensual', 'Total_Mes']]
+
+    df_centro_articulo = df_unificado.groupby(['Fecha_Reporte', 'Centro', 'Artículo', 'O.F'])['TEjec_Disp'].sum().reset_index()
+    df_centro_articulo.columns = ['Fecha', 'Centro', 'Articulo', 'OF', 'Horas']
+    df_centro_articulo['Fecha'] = pd.to_datetime(df_centro_articulo['Fecha']).dt.date
+    return media_por_centro, media_por_articulo, df_centro_articulo
+
+
+def historico_sintetico(dias, filas, seed=0):
+    """df_unificado de un histórico sintético, limpio como en la ingesta"""
+    rng = np.random.default_rng(seed)
+    partes = []
+    for fecha in pd.date_range('2025-01-01', periods=dias, freq='D'):
+        df = generar_reporte(fecha, filas, rng=rng)
+        columnas = {}
+        for col_std in etl.COLUMNAS_REQUERIDAS:
+            col_real = etl.encontrar_columna(df, col_std, etl.COLUMNAS_ALTERNATIVAS)
+            if col_real:
+                columnas[col_real] = col_std
+        partes.append(etl.limpiar_reporte(df[list(columnas)].rename(columns=columnas), fecha))
+    df = pd.concat(partes, ignore_index=True)
+    # Claves vacías: esas filas quedan fuera de los grupos que las usan
+    df.loc[df.sample(frac=0.002, random_state=seed).index, 'O.F'] = None
+    return df
+
+
+def medir(funcion, df):
+    """Segundos y pico de memoria (MB, en una segunda pasada con tracemalloc)"""
+    inicio = time.perf_counter()
+    resultado = funcion(df)
+    segundos = time.perf_counter() - inicio
+    tracemalloc.start()
+    funcion(df)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return segundos, pico / 2**20, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Equivalencia y benchmark de calcular_analisis")
+    parser.add_argument('--dias', type=int, default=365)
+    parser.add_argument('--filas', type=int, default=3000, help="Filas de reporte por día")
+    args = parser.parse_args()
+
+    print(f"[INFO] Generando {args.dias} días de {args.filas} filas...")
+    df = historico_sintetico(args.dias, args.filas)
+
+    t_merge, m_merge, referencia = medir(analisis_por_merge, df)
+    t_codigos, m_codigos, resultado = medir(etl.calcular_analisis, df)
+
+    for nombre, esperado, obtenido in zip(('Datos_Centros', 'Datos_Articulos', 'Datos_Centro_Articulo'),
+                                          referencia, resultado):
+        if not esperado.equals(obtenido) or list(esperado.dtypes) != list(obtenido.dtypes):
+            print(f"[ERROR] {nombre} difiere de la implementación anterior")
+            sys.exit(1)
+    print(f"[RESULTADO] {len(df)} filas, tablas idénticas | anterior: {t_merge:.2f}s, pico {m_merge:.0f} MB | "
+          f"por códigos: {t_codigos:.2f}s, pico {m_codigos:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK: INGESTA SECUENCIAL VS PARALELA
+=========================================
+Genera una carpeta sintética de reportes diarios y compara
+cargar_y_procesar_archivos con 1 worker frente a N workers. Verifica que
+el DataFrame resultante es idéntico en ambos modos.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+sys.path.insert(0, str(ROOT_DIR / "scripts"))
+
+import analisis_mensual_tiempos as etl  # noqa: E402
+from generador_sintetico import generar_reportes_diarios  # noqa: E402
+
+
+def cronometrar(workers):
+    inicio = time.perf_counter()
+    df = etl.cargar_y_procesar_archivos(workers=workers)
+    return time.perf_counter() - inicio, df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de ingesta paralela")
+    parser.add_argument('--dias', type=int, default=20)
+    parser.add_argument('--filas', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"[INFO] Generando {args.dias} reportes de {args.filas} filas...")
+        generar_reportes_diarios(tmp, dias=args.dias, filas=args.filas)
+        etl.CARPETA_DATOS = Path(tmp)
+
+        t_1, df_1 = cronometrar(1)
+        t_n, df_n = cronometrar(args.workers)
+
+    if not df_1.equals(df_n):
+        print("[ERROR] El resultado paralelo difiere del secuencial")
+        sys.exit(1)
+    print(f"[RESULTADO] 1 worker: {t_1:.2f}s | {args.workers} workers: {t_n:.2f}s | "
+          f"speedup x{t_1 / t_n:.2f} | {len(df_1)} filas idénticas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK: LECTURA DE REPORTES DEL ERP
+======================================
+Compara la lectura completa con pd.read_excel (todas las columnas y
+selección posterior) con leer_reporte (cabecera primero y solo las
+columnas requeridas en streaming) sobre reportes sintéticos con columnas
+de relleno. Verifica que el DataFrame es idéntico y mide tiempo y pico de
+memoria (tracemalloc) por archivo.
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+sys.path.insert(0, str(ROOT_DIR / "scripts"))
+
+import analisis_mensual_tiempos as etl  # noqa: E402
+from generador_sintetico import generar_reportes_diarios  # noqa: E402
+
+
+def lectura_completa(archivo):
+    """Lectura anterior: archivo completo y selección de columnas, como referencia"""
+    df = pd.read_excel(archivo)
+    columnas_mapeadas = {}
+    for col_std in etl.COLUMNAS_REQUERIDAS:
+        col_real = etl.encontrar_columna(df, col_std, etl.COLUMNAS_ALTERNATIVAS)
+        if col_real:
+            columnas_mapeadas[col_real] = col_std
+    if not columnas_mapeadas:
+        return pd.DataFrame()
+    return df[list(columnas_mapeadas)].rename(columns=columnas_mapeadas)
+
+
+def medir(lector, archivos):
+    """Segundos totales y pico de memoria máximo por archivo (MB)"""
+    inicio = time.perf_counter()
+    resultados = [lector(a) for a in archivos]
+    segundos = time.perf_counter() - inicio
+    # El pico se mide en una segunda pasada: tracemalloc ralentiza la lectura
+    pico = 0
+    for archivo in archivos:
+        tracemalloc.start()
+        lector(archivo)
+        pico = max(pico, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return segundos, pico / 2**20, resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Equivalencia y benchmark de la lectura de reportes")
+    parser.add_argument('--dias', type=int, default=3)
+    parser.add_argument('--filas', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"[INFO] Generando {args.dias} reportes de {args.filas} filas...")
+        archivos = generar_reportes_diarios(tmp, dias=args.dias, filas=args.filas)
+
+        t_completa, m_completa, referencia = medir(lectura_completa, archivos)
+        t_stream, m_stream, resultados = medir(etl.leer_reporte, archivos)
+
+    for archivo, esperado, obtenido in zip(archivos, referencia, resultados):
+        if not esperado.equals(obtenido) or list(esperado.dtypes) != list(obtenido.dtypes):
+            print(f"[ERROR] {archivo.name}: la lectura en streaming difiere de pd.read_excel")
+            sys.exit(1)
+    print(f"[RESULTADO] {len(archivos)} archivos idénticos | completa: {t_completa:.2f}s, pico {m_completa:.0f} MB | "
+          f"streaming: {t_stream:.2f}s, pico {m_stream:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
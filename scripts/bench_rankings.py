@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK: HOJA RANKINGS
+========================
+Compara calcular_rankings (top-N agrupado en una pasada) con la
+generación anterior por bucle de fechas, sobre un análisis sintético con
+empates y valores nulos en Carga_Dia. Verifica que la hoja es idéntica
+fila a fila (mismos valores, mismo orden y mismos tipos).
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+import analisis_mensual_tiempos as etl  # noqa: E402
+
+
+def rankings_por_bucle(media_por_centro, media_por_articulo):
+    """Implementación anterior (un nlargest por fecha), como referencia"""
+    rankings_centros = []
+    for fecha in media_por_centro['Fecha'].unique():
+        df_fecha = media_por_centro[media_por_centro['Fecha'] == fecha].copy()
+        df_fecha = df_fecha.nlargest(15, 'Carga_Dia')
+        df_fecha['Ranking'] = range(1, len(df_fecha) + 1)
+        df_fecha['Tipo'] = 'Centro'
+        df_fecha['Articulo'] = ''
+        rankings_centros.append(df_fecha[etl.COLUMNAS_RANKING])
+
+    rankings_articulos = []
+    for fecha in media_por_articulo['Fecha'].unique():
+        df_fecha = media_por_articulo[media_por_articulo['Fecha'] == fecha].copy()
+        df_fecha = df_fecha.nlargest(15, 'Carga_Dia')
+        df_fecha['Ranking'] = range(1, len(df_fecha) + 1)
+        df_fecha['Tipo'] = 'Artículo'
+        df_fecha['Centro'] = ''
+        df_fecha = df_fecha.rename(columns={'Artículo': 'Articulo'})
+        rankings_articulos.append(df_fecha[etl.COLUMNAS_RANKING])
+
+    df_rankings = pd.concat(rankings_centros + rankings_articulos, ignore_index=True)
+    return df_rankings.sort_values(['Fecha', 'Tipo', 'Ranking'])
+
+
+def analisis_sintetico(dias, filas_dia, seed=0):
+    """Salida de calcular_analisis sobre un histórico sintético"""
+    rng = np.random.default_rng(seed)
+    n = dias * filas_dia
+    # Un 30% de tiempos enteros pequeños para forzar empates en los rankings
+    tiempo = np.where(rng.random(n) < 0.3, rng.integers(0, 5, n).astype(float), np.round(rng.gamma(1, 5, n), 2))
+    tiempo[rng.random(n) < 0.01] = np.nan
+    df = pd.DataFrame({
+        'Fecha_Reporte': rng.choice(pd.date_range('2025-01-01', periods=dias), n),
+        'Centro': rng.integers(100, 400, n),
+        'Artículo': rng.choice([f"A{i}" for i in range(3000)], n),
+        'O.F': rng.integers(1, 9999, n),
+        'TEjec_Disp': tiempo
+    })
+    media_por_centro, media_por_articulo, _ = etl.calcular_analisis(df)
+    media_por_articulo.loc[media_por_articulo.sample(frac=0.02, random_state=seed).index, 'Carga_Dia'] = np.nan
+    return media_por_centro, media_por_articulo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Equivalencia y benchmark de la hoja Rankings")
+    parser.add_argument('--dias', type=int, default=365)
+    parser.add_argument('--filas', type=int, default=300, help="Filas de reporte por día")
+    args = parser.parse_args()
+
+    media_por_centro, media_por_articulo = analisis_sintetico(args.dias, args.filas)
+
+    inicio = time.perf_counter()
+    referencia = rankings_por_bucle(media_por_centro, media_por_articulo)
+    t_bucle = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    rankings = etl.calcular_rankings(media_por_centro, media_por_articulo)
+    t_vector = time.perf_counter() - inicio
+
+    # El índice no se exporta: se comparan valores, orden y tipos
+    if not referencia.reset_index(drop=True).equals(rankings.reset_index(drop=True)):
+        print("[ERROR] La hoja Rankings difiere de la implementación por bucle")
+        sys.exit(1)
+    print(f"[RESULTADO] {args.dias} días, {len(rankings)} filas idénticas | bucle: {t_bucle:.2f}s | "
+          f"agrupado: {t_vector:.3f}s | x{t_bucle / t_vector:.0f}")
+
+
+if __name__ == "__main__":
+    main()
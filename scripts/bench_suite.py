@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+SUITE DE BENCHMARKS: ETL Y API
+==============================
+Genera reportes diarios sintéticos del ERP al tamaño indicado y cronometra
+los caminos críticos:
+
+  ETL   cargar_y_procesar_archivos, calcular_analisis, export_excel
+  Carga load_data desde el almacén Arrow y desde el Excel V2
+  API   cada endpoint con el cliente en proceso, calculando la respuesta
+        (caché de respuestas vacía) y sirviéndola desde la caché
+
+Los resultados (mediana y mínimo por medida) se guardan en JSON junto al
+commit y los parámetros. Con --comparar se contrastan con una ejecución
+anterior y el script termina con error si alguna medida empeora más del
+umbral.
+
+Uso:
+    python scripts/bench_suite.py --dias 60 --filas 3000
+    python scripts/bench_suite.py --comparar bench_resultados/bench_abc1234.json --umbral 0.25
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+CARPETA_RESULTADOS = ROOT_DIR / "bench_resultados"
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+sys.path.insert(0, str(ROOT_DIR / "scripts"))
+
+import analisis_mensual_tiempos as etl  # noqa: E402
+from generador_sintetico import generar_reportes_diarios  # noqa: E402
+
+# Diferencia mínima (s) para considerar regresión: evita falsos positivos por ruido en medidas de pocos ms
+PISO_REGRESION = 0.005
+
+
+def cronometrar(funcion, repeticiones, preparar=None):
+    """Tiempos de varias ejecuciones de funcion (preparar se ejecuta antes de cada una, fuera del cronómetro)"""
+    tiempos, resultado = [], None
+    for _ in range(repeticiones):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos, resultado
+
+
+def medida(tiempos):
+    return {"mediana_s": statistics.median(tiempos), "min_s": min(tiempos), "repeticiones": len(tiempos)}
+
+
+def commit_actual():
+    try:
+        salida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                capture_output=True, text=True, timeout=10)
+        return salida.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def bench_etl(carpeta, args, resultados):
+    """Cronometra el ETL y deja el dataset V2 en la carpeta. Devuelve la ruta del Excel"""
+    etl.CARPETA_DATOS = carpeta
+    etl.OUTPUT_FILE = carpeta / "ANALISIS_MENSUAL_TIEMPOS_V2.xlsx"
+    etl.OUTPUT_ARROW = etl.ruta_almacen(etl.OUTPUT_FILE)
+
+    tiempos, df = cronometrar(etl.cargar_y_procesar_archivos, args.repeticiones_etl)
+    resultados['etl.cargar_y_procesar_archivos'] = medida(tiempos)
+    tiempos, analisis = cronometrar(lambda: etl.calcular_analisis(df), args.repeticiones)
+    resultados['etl.calcular_analisis'] = medida(tiempos)
+    tiempos, _ = cronometrar(lambda: etl.export_excel(*analisis, modo_excel=args.excel), args.repeticiones_etl)
+    resultados[f'etl.export_excel[{args.excel}]'] = medida(tiempos)
+    return etl.OUTPUT_FILE
+
+
+def urls_api(server):
+    """Peticiones representativas del dashboard sobre el dataset cargado"""
+    dataset = server.load_dataset()
+    fechas = dataset.cubo.fechas
+    centros = [c["id"] for c in server.calcular_centros(dataset)["centros"]][:5]
+    mitad = fechas[len(fechas) // 2]
+    return {
+        'status': "/api/status",
+        'bootstrap': "/api/bootstrap",
+        'centros': "/api/centros",
+        'fechas': "/api/fechas",
+        'summary': "/api/summary",
+        'summary_rango': f"/api/summary?fecha_inicio={fechas[0]}&fecha_fin={mitad}",
+        'summary_semanal': "/api/summary?granularity=week&max_points=100",
+        'centro': f"/api/centro/{centros[0]}",
+        'centro_multiple': f"/api/centro/{','.join(centros)}",
+        'articulos': f"/api/centro/{centros[0]}/articulos/mes/{mitad[:7]}",
+        'saturacion': "/api/saturacion",
+        'busqueda': "/api/articulos/buscar?q=4",
+    }
+
+
+def bench_api(excel, args, resultados):
+    import server
+    from fastapi.testclient import TestClient
+
+    server.EXCEL_FILE = excel
+    server.ALTERNATIVE_FILE = excel
+    almacen = etl.ruta_almacen(excel)
+    if server.almacen_disponible(almacen):
+        tiempos, _ = cronometrar(lambda: server.construir_datos('arrow', almacen), args.repeticiones)
+        resultados['server.load_data[arrow]'] = medida(tiempos)
+    tiempos, _ = cronometrar(lambda: server.construir_datos('xlsx', excel), args.repeticiones_etl)
+    resultados['server.load_data[xlsx]'] = medida(tiempos)
+
+    client = TestClient(server.app)
+    client.get("/api/summary")  # Carga inicial de la versión vigente
+    for nombre, url in urls_api(server).items():
+        def pedir():
+            respuesta = client.get(url)
+            if respuesta.status_code != 200:
+                raise RuntimeError(f"{url} -> {respuesta.status_code}")
+        tiempos, _ = cronometrar(pedir, args.repeticiones, preparar=server._cache_respuestas.invalidar)
+        resultados[f'api.{nombre}'] = medida(tiempos)
+        if nombre != 'status':
+            tiempos, _ = cronometrar(pedir, args.repeticiones * 5)
+            resultados[f'api.{nombre}[cache]'] = medida(tiempos)
+    server._gestor.detener()
+
+
+def comparar(resultados, base, umbral):
+    """Lista de regresiones (nombre, base, actual) por encima del umbral relativo"""
+    regresiones = []
+    print(f"\n{'Medida':<40}{'base ms':>12}{'actual ms':>12}{'cambio':>10}")
+    for nombre, actual in resultados.items():
+        anterior = base.get(nombre)
+        if anterior is None:
+            continue
+        a, b = anterior['mediana_s'], actual['mediana_s']
+        cambio = b / a - 1 if a > 0 else 0.0
+        marca = ""
+        if cambio > umbral and b - a > PISO_REGRESION:
+            regresiones.append((nombre, a, b))
+            marca = "  <-- REGRESIÓN"
+        print(f"{nombre:<40}{a * 1000:>12.1f}{b * 1000:>12.1f}{cambio:>+10.0%}{marca}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks del ETL y la API")
+    parser.add_argument('--dias', type=int, default=30)
+    parser.add_argument('--filas', type=int, default=2000, help="Filas por reporte diario")
+    parser.add_argument('--centros', type=int, default=60)
+    parser.add_argument('--articulos', type=int, default=800)
+    parser.add_argument('--ofs', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--repeticiones-etl', type=int, default=1,
+                        help="Repeticiones de los pasos lentos (lectura de xlsx, export y carga desde Excel)")
+    parser.add_argument('--excel', choices=etl.MODOS_EXCEL, default='completo')
+    parser.add_argument('--salida', type=Path, help="JSON de resultados (por defecto bench_resultados/bench_<commit>.json)")
+    parser.add_argument('--comparar', type=Path, help="JSON de una ejecución anterior")
+    parser.add_argument('--umbral', type=float, default=0.25, help="Empeoramiento relativo máximo (0.25 = +25%%)")
+    args = parser.parse_args()
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        carpeta = Path(tmp)
+        print(f"[INFO] Generando {args.dias} reportes de {args.filas} filas...")
+        generar_reportes_diarios(carpeta, dias=args.dias, filas=args.filas, centros=args.centros,
+                                 articulos=args.articulos, ofs=args.ofs, seed=args.seed)
+        print("[INFO] ETL...")
+        excel = bench_etl(carpeta, args, resultados)
+        print("[INFO] API...")
+        bench_api(excel, args, resultados)
+
+    commit = commit_actual()
+    informe = {
+        "fecha": datetime.now().isoformat(timespec='seconds'),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "parametros": {k: v for k, v in vars(args).items() if k not in ('salida', 'comparar')},
+        "resultados": resultados
+    }
+    etiqueta = commit or datetime.now().strftime('%Y%m%d_%H%M%S')
+    salida = args.salida or CARPETA_RESULTADOS / f"bench_{etiqueta}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+
+    print(f"\n{'Medida':<40}{'mediana ms':>12}{'min ms':>12}")
+    for nombre, m in resultados.items():
+        print(f"{nombre:<40}{m['mediana_s'] * 1000:>12.1f}{m['min_s'] * 1000:>12.1f}")
+    print(f"\n[OK] Resultados: {salida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        if base.get("parametros") != informe["parametros"]:
+            print("[AVISO] La ejecución base usó otros parámetros: la comparación es orientativa")
+        regresiones = comparar(resultados, base["resultados"], args.umbral)
+        if regresiones:
+            print(f"\n[ERROR] {len(regresiones)} medidas empeoran más de un {args.umbral:.0%} "
+                  f"respecto a {base.get('commit') or args.comparar.name}")
+            sys.exit(1)
+        print(f"\n[OK] Sin regresiones por encima del {args.umbral:.0%}")
+
+
+if __name__ == "__main__":
+    main()
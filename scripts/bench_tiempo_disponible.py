@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK: NORMALIZACION DE TEjec_Disp
+======================================
+1. Prueba de equivalencia basada en propiedades: para columnas aleatorias
+   (números, textos con coma decimal, caracteres sueltos, unicode, nulos)
+   normalizar_tiempo_disponible debe devolver exactamente lo mismo que
+   limpiar_tiempo_disponible aplicado fila a fila.
+2. Microbenchmark a 1M de filas: apply escalar vs versión vectorizada.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+from analisis_mensual_tiempos import limpiar_tiempo_disponible, normalizar_tiempo_disponible  # noqa: E402
+
+ALFABETO = list("0123456789") * 3 + list(",.- ") * 2 + list("hHe+\t_ab") + ['٣', '٠', '²', ' ']
+
+
+def valor_aleatorio(rng):
+    """Un valor tal como podría venir en la celda TEjec_Disp del ERP"""
+    k = rng.random()
+    if k < 0.25:
+        return round(rng.uniform(-5, 500), rng.randint(0, 4))
+    if k < 0.35:
+        return rng.randint(-100, 10 ** rng.randint(1, 20))
+    if k < 0.40:
+        return rng.choice([None, np.nan, pd.NaT, True, False, np.int64(7), np.float32(2.5), float('inf'), -0.0])
+    if k < 0.70:
+        return f"{rng.uniform(0, 1000):.{rng.randint(0, 3)}f}".replace('.', rng.choice([',', '.']))
+    if k < 0.80:
+        return rng.choice([" 12,5 h", "1.234,56", "--3", "5-", "-.5", ".", "-", "", "1e3", "٣,٥", "N/A", "7.", " "])
+    return ''.join(rng.choice(ALFABETO) for _ in range(rng.randint(0, 10)))
+
+
+def iguales(a, b):
+    """Igualdad bit a bit (NaN coincide con NaN/None; distingue -0.0 de 0.0)"""
+    a = pd.to_numeric(pd.Series(a, dtype=object), errors='coerce').to_numpy(dtype='float64')
+    b = np.asarray(b, dtype='float64')
+    nan_a, nan_b = np.isnan(a), np.isnan(b)
+    return np.array_equal(nan_a, nan_b) and np.array_equal(a[~nan_a].view('i8'), b[~nan_b].view('i8'))
+
+
+def propiedad_equivalencia(casos=300, seed=0):
+    rng = random.Random(seed)
+    for caso in range(casos):
+        n = rng.randint(0, 400)
+        valores = [valor_aleatorio(rng) for _ in range(n)]
+        # Forma de la columna: object mixto, todo texto o todo numérico
+        forma = rng.random()
+        if forma < 0.2:
+            serie = pd.Series([str(v) if v is not None else None for v in valores], dtype='str')
+        elif forma < 0.35:
+            serie = pd.Series([rng.uniform(0, 100) if rng.random() > 0.1 else np.nan for _ in range(n)], dtype='float64')
+        else:
+            serie = pd.Series(valores, dtype=object)
+        esperado = [limpiar_tiempo_disponible(v) for v in serie]
+        obtenido = normalizar_tiempo_disponible(serie)
+        if not iguales(esperado, obtenido):
+            for v, e, o in zip(serie, esperado, obtenido):
+                if not iguales([e], [o]):
+                    print(f"[ERROR] Caso {caso}: {v!r} -> escalar {e!r}, vectorizado {o!r}")
+                    break
+            return False
+    return True
+
+
+def microbenchmark(filas, seed=0):
+    rng = np.random.default_rng(seed)
+    numeros = np.round(rng.gamma(1.5, 3.0, filas), 2)
+    serie = pd.Series(numeros.astype(object))
+    con_coma = rng.random(filas) < 0.3
+    serie[con_coma] = [f"{v:.2f}".replace('.', ',') for v in numeros[con_coma]]
+    serie[rng.random(filas) < 0.02] = None
+
+    inicio = time.perf_counter()
+    escalar = serie.apply(limpiar_tiempo_disponible)
+    t_escalar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    vectorizado = normalizar_tiempo_disponible(serie)
+    t_vector = time.perf_counter() - inicio
+
+    if not iguales(escalar, vectorizado):
+        print("[ERROR] Resultados distintos en el microbenchmark")
+        sys.exit(1)
+    print(f"[RESULTADO] {filas} filas | apply: {t_escalar:.2f}s | vectorizado: {t_vector:.2f}s | "
+          f"x{t_escalar / t_vector:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Equivalencia y benchmark de TEjec_Disp")
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    parser.add_argument('--casos', type=int, default=300)
+    args = parser.parse_args()
+
+    if not propiedad_equivalencia(args.casos):
+        sys.exit(1)
+    print(f"[OK] Equivalencia verificada en {args.casos} columnas aleatorias")
+    microbenchmark(args.filas)
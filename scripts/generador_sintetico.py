@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+GENERADOR DE DATOS SINTETICOS
+=============================
+Crea reportes diarios del ERP ("List Avance Obra-Centro y Operacion") con
+la misma forma que los reales: nombre con fecha, columnas con alias,
+TEjec_Disp mezclando números y textos con coma decimal, centros de más de
+4 dígitos y O.F alfanuméricas. Sirve para benchmarks sin datos de planta.
+Con --v2 pasa además los reportes por el ETL y deja el dataset V2 (Excel y
+almacén Arrow) que consume el servidor.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Columnas de relleno que acompañan a las requeridas en el export del ERP
+COLUMNAS_RELLENO = [
+    'Operacion', 'Descripcion', 'Fase', 'Recurso', 'Turno', 'Fecha Inicio', 'Fecha Fin',
+    'Cantidad Lanzada', 'Cantidad Pendiente', 'T.Prep', 'T.Ejec Std', 'Estado', 'Prioridad',
+    'Cliente', 'Pedido', 'Almacen', 'Lote', 'Observaciones'
+]
+
+
+def generar_reporte(fecha, filas=5000, centros=60, articulos=800, ofs=3000, rng=None):
+    """DataFrame con un reporte diario sintético"""
+    rng = rng if rng is not None else np.random.default_rng()
+    codigos = np.concatenate([
+        rng.choice(np.arange(100, 9999), size=max(centros - 2, 1), replace=False),
+        [12345, 20001]  # Centros de 5 dígitos que el ETL debe descartar
+    ])
+    tiempo = np.round(rng.gamma(1.5, 3.0, filas), 2)
+    tiempo_obj = tiempo.astype(object)
+    con_coma = rng.random(filas) < 0.2
+    tiempo_obj[con_coma] = [f"{v:.2f}".replace('.', ',') + ' h' for v in tiempo[con_coma]]
+    tiempo_obj[rng.random(filas) < 0.03] = None
+
+    numero_of = rng.integers(140000, 140000 + ofs, filas)
+    of = numero_of.astype(object)
+    alfanum = rng.random(filas) < 0.1
+    of[alfanum] = [f"{n}B" for n in numero_of[alfanum]]
+
+    df = pd.DataFrame({
+        'Centro': rng.choice(codigos, filas),
+        'Articulo': rng.integers(400000, 400000 + articulos, filas).astype(str),
+        'TEjec_Disp': tiempo_obj,
+        'C.Terminada': rng.integers(0, 500, filas),
+        'C. Terminada Ant': rng.integers(0, 500, filas),
+        'OF': of,
+    })
+    for i, col in enumerate(COLUMNAS_RELLENO):
+        df[col] = rng.integers(0, 1000, filas) if i % 2 else f"{col}-{fecha:%d}"
+    return df
+
+
+def generar_reportes_diarios(carpeta, dias=30, filas=5000, centros=60, articulos=800, ofs=3000,
+                             inicio='2025-01-01', seed=0):
+    """Escribe un reporte .xlsx por día en la carpeta indicada y devuelve las rutas"""
+    carpeta = Path(carpeta)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    rutas = []
+    for fecha in pd.date_range(inicio, periods=dias, freq='D'):
+        df = generar_reporte(fecha, filas, centros, articulos, ofs, rng)
+        ruta = carpeta / f"List Avance Obra-Centro y Operacion ({fecha:%Y-%m-%d} 07-30).xlsx"
+        df.to_excel(ruta, index=False)
+        rutas.append(ruta)
+    return rutas
+
+
+def generar_dataset_v2(carpeta_reportes, destino_excel, modo_excel='completo', sqlite=False):
+    """Ejecuta el ETL sobre una carpeta de reportes y escribe el V2 en destino_excel (y la base SQLite)"""
+    sys.path.insert(0, str(Path(__file__).parent.parent.resolve() / "backend"))
+    import analisis_mensual_tiempos as etl
+
+    etl.CARPETA_DATOS = Path(carpeta_reportes)
+    etl.OUTPUT_FILE = Path(destino_excel)
+    etl.OUTPUT_ARROW = etl.ruta_almacen(destino_excel)
+    etl.OUTPUT_SQLITE = etl.ruta_sqlite(destino_excel)
+    df = etl.cargar_y_procesar_archivos()
+    tablas = etl.export_excel(*etl.calcular_analisis(df), modo_excel=modo_excel)
+    if sqlite:
+        etl.exportar_sqlite(tablas)
+    return Path(destino_excel)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera reportes diarios sintéticos del ERP")
+    parser.add_argument('carpeta')
+    parser.add_argument('--dias', type=int, default=30)
+    parser.add_argument('--filas', type=int, default=5000)
+    parser.add_argument('--centros', type=int, default=60)
+    parser.add_argument('--articulos', type=int, default=800)
+    parser.add_argument('--ofs', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--v2', action='store_true',
+                        help="Genera también ANALISIS_MENSUAL_TIEMPOS_V2.xlsx (y el almacén Arrow) en la carpeta")
+    args = parser.parse_args()
+    rutas = generar_reportes_diarios(args.carpeta, args.dias, args.filas, args.centros,
+                                     args.articulos, args.ofs, seed=args.seed)
+    print(f"[OK] {len(rutas)} reportes en {args.carpeta}")
+    if args.v2:
+        excel = generar_dataset_v2(args.carpeta, Path(args.carpeta) / "ANALISIS_MENSUAL_TIEMPOS_V2.xlsx")
+        print(f"[OK] Dataset V2: {excel}")
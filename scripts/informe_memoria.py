@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+INFORME DE MEMORIA DE LAS TABLAS CARGADAS
+=========================================
+Compara la memoria que ocupan las tablas del servidor con la disposición
+anterior (fechas como texto, códigos como object) frente a la disposición
+compacta actual (datetime64, enteros mínimos y categóricos).
+
+Uso:
+    python scripts/informe_memoria.py                 # origen que usaría el servidor
+    python scripts/informe_memoria.py --origen X.xlsx # otro Excel V2 o directorio Arrow
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+import server  # noqa: E402
+from tablas_compactas import uso_memoria  # noqa: E402
+
+NOMBRES = ('Datos_Centros', 'Rankings', 'Datos_Centro_Articulo')
+
+
+def disposicion_anterior(tipo, ruta):
+    """Tablas normalizadas como antes: fillna(0), Fecha en texto y object"""
+    tablas = []
+    for df in server.leer_origen(tipo, ruta):
+        df = df.fillna(0)
+        if not df.empty and 'Fecha' in df.columns:
+            df['Fecha'] = pd.to_datetime(df['Fecha']).dt.strftime('%Y-%m-%d').astype(object)
+        for col in df.columns:
+            if col != 'Fecha' and not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = df[col].astype(object)
+        if not df.empty and 'Centro' in df.columns:
+            df = df[~df['Centro'].astype(str).str.startswith('9')]
+        tablas.append(df)
+    return dict(zip(NOMBRES, tablas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Informe de memoria de las tablas cargadas")
+    parser.add_argument('--origen', type=Path, help="Excel V2 o directorio del almacén Arrow")
+    args = parser.parse_args()
+
+    if args.origen:
+        tipo, ruta = ('arrow' if args.origen.is_dir() else 'xlsx'), args.origen
+    else:
+        tipo, ruta = server.resolver_origen()
+    if ruta is None:
+        print("[ERROR] No se encuentra ningún origen de datos")
+        sys.exit(1)
+
+    antes = uso_memoria(disposicion_anterior(tipo, ruta))
+    dataset = server.construir_datos(tipo, ruta)
+    despues = uso_memoria(dict(zip(NOMBRES, dataset.tablas)))
+
+    print(f"[INFO] Origen: {ruta} ({tipo})")
+    print(f"{'Tabla':<24}{'Antes (MB)':>12}{'Después (MB)':>14}{'Ahorro':>9}")
+    for nombre in NOMBRES + ('TOTAL',):
+        a = antes[nombre] if nombre != 'TOTAL' else sum(antes.values())
+        d = despues[nombre] if nombre != 'TOTAL' else sum(despues.values())
+        ahorro = f"{(1 - d / a) * 100:.0f}%" if a else "-"
+        print(f"{nombre:<24}{a / 2**20:>12.2f}{d / 2**20:>14.2f}{ahorro:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+PRUEBA DE CARGA DE LA API
+=========================
+Lanza clientes concurrentes contra la app FastAPI en proceso (cliente ASGI
+de httpx, sin red) y mide la latencia por tipo de endpoint:
+
+1. Arranque en frío: todos los clientes llegan mientras se carga el dataset.
+   La carga debe ejecutarse una sola vez y /api/status debe responder al
+   momento aunque los datos aún no estén listos.
+2. En caliente: misma mezcla de peticiones con el dataset ya cargado.
+
+Uso:
+    python scripts/prueba_carga_api.py --clientes 50 --peticiones 20
+"""
+import argparse
+import asyncio
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+DATASET = ROOT_DIR / "ANALISIS_MENSUAL_TIEMPOS_V2.xlsx"
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+
+def mezcla_urls(fechas, centros, meses, rng):
+    """Una petición aleatoria del tipo de las que hace el dashboard"""
+    k = rng.random()
+    if k < 0.15:
+        return 'status', "/api/status"
+    if k < 0.50:
+        a, b = sorted(rng.sample(fechas, 2))
+        return 'summary', f"/api/summary?fecha_inicio={a}&fecha_fin={b}"
+    if k < 0.80:
+        ids = ",".join(rng.sample(centros, rng.randint(1, 5)))
+        return 'centro', f"/api/centro/{ids}"
+    return 'articulos', f"/api/centro/{rng.choice(centros)}/articulos/mes/{rng.choice(meses)}"
+
+
+async def cliente(http, peticiones, urls, latencias, rng):
+    for _ in range(peticiones):
+        tipo, url = mezcla_urls(*urls, rng)
+        inicio = time.perf_counter()
+        r = await http.get(url)
+        latencias.setdefault(tipo, []).append(time.perf_counter() - inicio)
+        if r.status_code != 200:
+            latencias.setdefault('errores', []).append(0.0)
+
+
+async def fase(app, clientes, peticiones, urls, seed):
+    latencias = {}
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://rpk", timeout=120) as http:
+        inicio = time.perf_counter()
+        await asyncio.gather(*[
+            cliente(http, peticiones, urls, latencias, random.Random(seed + i)) for i in range(clientes)
+        ])
+        duracion = time.perf_counter() - inicio
+    return latencias, duracion
+
+
+def informe(titulo, latencias, duracion):
+    total = sum(len(v) for k, v in latencias.items() if k != 'errores')
+    print(f"\n[{titulo}] {total} peticiones en {duracion:.2f}s ({total / duracion:.0f} req/s)"
+          f" | errores: {len(latencias.get('errores', []))}")
+    print(f"{'Endpoint':<12}{'n':>6}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for tipo in ('status', 'summary', 'centro', 'articulos'):
+        valores = np.array(latencias.get(tipo, [])) * 1000
+        if len(valores):
+            print(f"{tipo:<12}{len(valores):>6}{np.percentile(valores, 50):>10.1f}"
+                  f"{np.percentile(valores, 99):>10.1f}{valores.max():>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API con clientes concurrentes")
+    parser.add_argument('--clientes', type=int, default=50)
+    parser.add_argument('--peticiones', type=int, default=20, help="Peticiones por cliente")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    df = pd.read_excel(DATASET, sheet_name='Datos_Centros', usecols=['Fecha', 'Centro'])
+    fechas = sorted(pd.to_datetime(df['Fecha']).dt.strftime('%Y-%m-%d').unique().tolist())
+    centros = sorted(str(c) for c in df['Centro'].unique() if not str(c).startswith('9'))
+    meses = sorted({f[:7] for f in fechas})
+    urls = (fechas, centros, meses)
+
+    import server
+
+    with tempfile.TemporaryDirectory() as tmp:
+        excel = Path(tmp) / DATASET.name
+        shutil.copy2(DATASET, excel)
+        server.EXCEL_FILE = excel
+        server.ALTERNATIVE_FILE = excel
+
+        # Contador de cargas: con single-flight debe ser exactamente 1
+        cargas = []
+        cargar = server._gestor._cargar
+
+        def cargar_contando(tipo, ruta, *args):
+            cargas.append(ruta)
+            return cargar(tipo, ruta, *args)
+        server._gestor._cargar = cargar_contando
+
+        latencias, duracion = asyncio.run(fase(server.app, args.clientes, args.peticiones, urls, args.seed))
+        informe("ARRANQUE EN FRÍO", latencias, duracion)
+        latencias, duracion = asyncio.run(fase(server.app, args.clientes, args.peticiones, urls, args.seed + 10_000))
+        informe("EN CALIENTE", latencias, duracion)
+        server._gestor.detener()
+
+    print(f"\n[INFO] Cargas del dataset: {len(cargas)}")
+    if len(cargas) != 1:
+        print("[ERROR] Se esperaba una única carga compartida por todos los clientes")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
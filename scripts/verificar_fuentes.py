@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+VERIFICACION DE FUENTES DE DATOS
+================================
+Pasa unos reportes sintéticos por el ETL y comprueba que el servidor da
+exactamente el mismo JSON desde cada fuente que puede tener al arrancar:
+  - xlsx:  solo el Excel V2 (la fuente de referencia),
+  - arrow: el almacén Arrow que escribe el ETL junto al Excel,
+  - preparado: el snapshot preparado que deja el arranque desde el almacén
+    (el arranque habitual tras cada ETL),
+  - sqlite: la base SQLite del ETL (--sqlite) con el motor sqlite.
+Los datos sintéticos incluyen O.F. enteras y alfanuméricas, artículos
+numéricos guardados como texto y horas con colas de coma flotante. Cada
+fuente se sirve en un proceso nuevo sobre su propia copia.
+
+Uso:
+    python scripts/verificar_fuentes.py
+    python scripts/verificar_fuentes.py --dias 20 --filas 3000
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT_DIR / "scripts"))
+
+from generador_sintetico import generar_dataset_v2, generar_reportes_diarios  # noqa: E402
+
+NOMBRE_EXCEL = "ANALISIS_MENSUAL_TIEMPOS_V2.xlsx"
+PREFIJOS_BUSQUEDA = ["4", "400", "14", "1400", "b"]
+
+
+def urls_dataset(client):
+    """Endpoints de datos con centros y meses del propio dataset"""
+    centros = [c["id"] for c in client.get("/api/centros").json()["centros"][:4]]
+    fechas = client.get("/api/fechas").json()["fechas"]
+    meses = sorted({f[:7] for f in fechas})
+    urls = ["/api/centros", "/api/fechas", "/api/bootstrap", "/api/summary",
+            f"/api/summary?fecha_inicio={fechas[len(fechas) // 2]}&fecha_fin={fechas[-1]}",
+            "/api/saturacion", "/api/saturacion?ventana=3", f"/api/centro/{','.join(centros)}"]
+    for centro in centros:
+        urls += [f"/api/centro/{centro}"] + [f"/api/centro/{centro}/articulos/mes/{mes}" for mes in meses]
+    urls.append(f"/api/centro/{','.join(centros[:2])}/articulos/mes/{meses[0]}")
+    urls += [f"/api/articulos/buscar?q={q}" for q in PREFIJOS_BUSQUEDA]
+    urls += ["/api/articulos/buscar?q=14&campo=of", "/api/articulos/buscar?q=40&campo=articulo&limit=200"]
+    return urls
+
+
+def servir(excel, motor):
+    """Proceso hijo: arranca la app sobre el Excel indicado y vuelca el origen y las respuestas"""
+    sys.path.insert(0, str(ROOT_DIR / "backend"))
+    import server
+    from fastapi.testclient import TestClient
+
+    server.EXCEL_FILE = server.ALTERNATIVE_FILE = Path(excel)
+    server.MOTOR = motor
+    with TestClient(server.app) as client:
+        while (status := client.get("/api/status").json())["status"] != "online":
+            time.sleep(0.01)
+        respuestas = {url: client.get(url).json() for url in urls_dataset(client)}
+    print(json.dumps({"origen": status["startup_source"], "respuestas": respuestas}))
+
+
+def capturar(excel, motor='pandas'):
+    salida = subprocess.run([sys.executable, __file__, '--hijo', str(excel), '--motor', motor],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def copia_fuente(origen, destino, con_almacen=False, con_sqlite=False):
+    """Copia el Excel V2 (y el almacén Arrow o la base SQLite) conservando las fechas de modificación"""
+    destino.mkdir()
+    shutil.copy2(origen / NOMBRE_EXCEL, destino / NOMBRE_EXCEL)
+    if con_almacen:
+        almacen = f"{Path(NOMBRE_EXCEL).stem}_arrow"
+        shutil.copytree(origen / almacen, destino / almacen)
+    if con_sqlite:
+        base = Path(NOMBRE_EXCEL).with_suffix(".sqlite").name
+        shutil.copy2(origen / base, destino / base)
+    return destino / NOMBRE_EXCEL
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mismo JSON desde el Excel V2 y desde las demás fuentes")
+    parser.add_argument('--hijo', help=argparse.SUPPRESS)
+    parser.add_argument('--motor', default='pandas', help=argparse.SUPPRESS)
+    parser.add_argument('--dias', type=int, default=10)
+    parser.add_argument('--filas', type=int, default=1500)
+    args = parser.parse_args()
+    if args.hijo:
+        servir(args.hijo, args.motor)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        generar_reportes_diarios(tmp / "reportes", dias=args.dias, filas=args.filas)
+        generar_dataset_v2(tmp / "reportes", tmp / NOMBRE_EXCEL, sqlite=True)
+        print("[INFO] Dataset V2 sintético generado (Excel, almacén Arrow y base SQLite)")
+        referencia = capturar(copia_fuente(tmp, tmp / "xlsx"))
+        excel = copia_fuente(tmp, tmp / "arrow", con_almacen=True)
+        # El segundo arranque sobre la misma copia parte del snapshot preparado que dejó el primero
+        resultados = {"arrow": capturar(excel), "preparado": capturar(excel)}
+        resultados["sqlite"] = capturar(copia_fuente(tmp, tmp / "sqlite", con_sqlite=True), motor='sqlite')
+
+    fallos = 0
+    if referencia["origen"] != 'xlsx':
+        print(f"[ERROR] La referencia se ha servido desde '{referencia['origen']}' y no desde el Excel")
+        fallos += 1
+    for fuente, resultado in resultados.items():
+        if resultado["origen"] != fuente:
+            print(f"[ERROR] Se esperaba servir desde '{fuente}' y se ha usado '{resultado['origen']}'")
+            fallos += 1
+        distintas = [url for url in referencia["respuestas"]
+                     if resultado["respuestas"].get(url) != referencia["respuestas"][url]]
+        for url in distintas:
+            print(f"[ERROR] {fuente}: respuesta distinta del Excel: {url}")
+        fallos += len(distintas)
+        if not distintas:
+            print(f"[OK] {fuente}: {len(referencia['respuestas'])} respuestas idénticas a las del Excel")
+    if fallos:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+VERIFICACION GOLDEN DE LA API
+=============================
+Compara las respuestas JSON de los endpoints de datos contra las
+respuestas de referencia guardadas en scripts/golden/ (generadas con la
+implementación original sobre ANALISIS_MENSUAL_TIEMPOS_V2.xlsx).
+La comparación es exacta: mismas claves, mismo orden de listas y mismos
+valores float.
+
+Se verifica cada fuente desde la que puede arrancar el servidor, cada una
+en un proceso nuevo sobre su propia copia del dataset:
+  - xlsx:      solo el Excel V2,
+  - arrow:     el almacén Arrow (escrito a partir de las hojas del Excel),
+  - preparado: el snapshot preparado que deja el arranque desde el almacén,
+  - sqlite:    la base SQLite con el motor sqlite.
+
+Uso:
+    python scripts/verificar_golden.py                   # verificar todas las fuentes
+    python scripts/verificar_golden.py --fuente sqlite   # solo una (repetible)
+    python scripts/verificar_golden.py --generar         # regenerar referencias (xlsx)
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+GOLDEN_FILE = Path(__file__).parent / "golden" / "respuestas_api.json"
+DATASET = ROOT_DIR / "ANALISIS_MENSUAL_TIEMPOS_V2.xlsx"
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+URLS = [
+    "/api/centros",
+    "/api/fechas",
+    "/api/summary",
+    "/api/summary?fecha_inicio=&fecha_fin=",
+    "/api/summary?fecha_inicio=2025-11-01&fecha_fin=2025-11-30",
+    "/api/summary?fecha_inicio=2025-10-20&fecha_fin=2025-12-31",
+    "/api/summary?fecha_inicio=2025-12-01",
+    "/api/summary?fecha_fin=2025-10-31",
+    "/api/summary?fecha_inicio=2025-11-15&fecha_fin=2025-11-15",
+    "/api/summary?fecha_inicio=2025-11-16&fecha_fin=2025-11-16",
+    "/api/summary?fecha_inicio=2025-11-03&fecha_fin=2025-11-02",
+    "/api/summary?fecha_inicio=2030-01-01",
+    "/api/summary?fecha_inicio=2025-12&fecha_fin=2026-01-1",
+    "/api/centro/262",
+    "/api/centro/750?fecha_inicio=2025-11-01&fecha_fin=2025-11-30",
+    "/api/centro/262,750,781,782",
+    "/api/centro/781, 262 ,99999?fecha_inicio=2025-12-01",
+    "/api/centro/99999",
+    "/api/centro/262?fecha_inicio=2030-01-01",
+    "/api/centro/262/articulos/mes/2025-11",
+    "/api/centro/781/articulos/mes/2025-12",
+    "/api/centro/262,750/articulos/mes/2025-10",
+    "/api/centro/262/articulos/mes/2030-01",
+    "/api/centro/99999/articulos/mes/2025-11",
+]
+
+
+FUENTES = ('xlsx', 'arrow', 'preparado', 'sqlite')
+
+
+def servir(excel, motor):
+    """Proceso hijo: respuestas de la API sobre el Excel indicado y origen desde el que se sirvieron"""
+    import server
+    from fastapi.testclient import TestClient
+
+    server.EXCEL_FILE = server.ALTERNATIVE_FILE = Path(excel)
+    server.MOTOR = motor
+    with TestClient(server.app) as client:
+        respuestas = {}
+        for url in URLS:
+            r = client.get(url)
+            respuestas[url] = {"status": r.status_code, "body": r.json()}
+        origen = client.get("/api/status").json()["startup_source"]
+    print(json.dumps({"origen": origen, "respuestas": respuestas}))
+
+
+def capturar(excel, motor='pandas'):
+    salida = subprocess.run([sys.executable, __file__, '--hijo', str(excel), '--motor', motor],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def capturar_fuente(fuente, tmp):
+    """Prepara una copia aislada del dataset con la fuente indicada y captura sus respuestas"""
+    import pandas as pd
+    from almacen_columnar import escribir_almacen, ruta_almacen
+    from almacen_sqlite import escribir_base, ruta_sqlite
+
+    carpeta = Path(tmp) / fuente
+    carpeta.mkdir()
+    excel = carpeta / DATASET.name
+    shutil.copy2(DATASET, excel)
+    if fuente == 'sqlite':
+        import server
+        tablas = server.preparar_tablas('xlsx', excel)
+        escribir_base(dict(zip(server.TABLAS_SNAPSHOT, tablas)), ruta_sqlite(excel))
+        return capturar(excel, motor='sqlite')
+    if fuente in ('arrow', 'preparado'):
+        hojas = pd.read_excel(excel, sheet_name=['Datos_Centros', 'Datos_Centro_Articulo', 'Rankings'])
+        escribir_almacen(hojas, ruta_almacen(excel))
+        if fuente == 'preparado':
+            # El primer arranque lee el almacén y deja el snapshot preparado; se verifica el segundo
+            capturar(excel)
+    return capturar(excel)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verificación golden de la API")
+    parser.add_argument('--generar', action='store_true', help="Regenera las respuestas de referencia")
+    parser.add_argument('--fuente', action='append', choices=FUENTES,
+                        help="Fuente a verificar (por defecto todas)")
+    parser.add_argument('--hijo', help=argparse.SUPPRESS)
+    parser.add_argument('--motor', choices=('pandas', 'sqlite'), default='pandas', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.hijo:
+        servir(args.hijo, args.motor)
+        return
+
+    if args.generar:
+        with tempfile.TemporaryDirectory() as tmp:
+            respuestas = capturar_fuente('xlsx', tmp)["respuestas"]
+        GOLDEN_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(GOLDEN_FILE, 'w', encoding='utf-8') as f:
+            json.dump(respuestas, f, ensure_ascii=False, indent=1)
+        print(f"[OK] {len(respuestas)} respuestas guardadas en {GOLDEN_FILE}")
+        return
+
+    with open(GOLDEN_FILE, 'r', encoding='utf-8') as f:
+        referencia = json.load(f)
+    fallos = 0
+    for fuente in args.fuente or FUENTES:
+        with tempfile.TemporaryDirectory() as tmp:
+            resultado = capturar_fuente(fuente, tmp)
+        if resultado["origen"] != fuente:
+            print(f"[ERROR] {fuente}: el servidor ha arrancado desde '{resultado['origen']}'")
+            fallos += 1
+        distintas = [url for url in URLS if resultado["respuestas"][url] != referencia.get(url)]
+        for url in distintas:
+            print(f"[ERROR] {fuente}: respuesta distinta: {url}")
+        fallos += len(distintas)
+        if not distintas:
+            print(f"[OK] {fuente}: {len(URLS)} respuestas idénticas a la referencia")
+    if fallos:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+VERIFICACION DE LA SATURACION
+=============================
+Comprobaciones de backend/saturacion.py sobre cubos sintéticos:
+  - ventanas constantes (carga repetida): desviación 0 y z NaN, sin los
+    z de ~1e15 que produciría el ruido de redondeo de la segunda pasada,
+  - media y desviación móviles, media mensual y z frente a pandas,
+  - el cálculo incremental (días nuevos) coincide con el completo,
+  - /api/saturacion rechaza umbral=nan/inf con 422.
+
+Uso:
+    python scripts/verificar_saturacion.py
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+from cubo_carga import CuboCarga  # noqa: E402
+from saturacion import SaturacionCentros  # noqa: E402
+
+
+def datos_centros(dias, centros, seed=0, constantes=()):
+    """Datos_Centros sintético con huecos; los centros de `constantes` repiten siempre la misma carga"""
+    rng = np.random.default_rng(seed)
+    fechas = pd.date_range('2025-01-01', periods=dias, freq='D')
+    filas = []
+    for c in range(centros):
+        presentes = rng.random(dias) > 0.2
+        for fecha, presente in zip(fechas, presentes):
+            if presente:
+                carga = 105.1 if c in constantes else float(np.round(rng.gamma(2.0, 20.0), 2))
+                filas.append((fecha, 100 + c, carga))
+    return pd.DataFrame(filas, columns=['Fecha', 'Centro', 'Carga_Dia'])
+
+
+def referencia_pandas(df, cubo, ventana):
+    """Estadísticos con pandas sobre la matriz centro x fecha del cubo (NaN donde el centro no reporta)"""
+    matriz = df.assign(Centro=df['Centro'].astype(str), Fecha=df['Fecha'].dt.strftime('%Y-%m-%d')).pivot(
+        index='Fecha', columns='Centro', values='Carga_Dia').reindex(index=cubo.fechas, columns=cubo.claves)
+    movil = matriz.rolling(ventana, min_periods=1)
+    mensual = matriz.groupby(matriz.index.str[:7]).transform('mean')
+    return {'media_movil': movil.mean().T.to_numpy(), 'desv_movil': movil.std().T.to_numpy(),
+            'media_mensual': mensual.T.to_numpy(), 'presente': matriz.notna().T.to_numpy()}
+
+
+def comprobar(condicion, mensaje, fallos):
+    if not condicion:
+        print(f"[ERROR] {mensaje}")
+        fallos.append(mensaje)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verificación de los estadísticos de saturación")
+    parser.add_argument('--dias', type=int, default=120)
+    parser.add_argument('--centros', type=int, default=40)
+    args = parser.parse_args()
+    fallos = []
+
+    constantes = (0, 1)
+    df = datos_centros(args.dias, args.centros, constantes=constantes)
+    cubo = CuboCarga(df)
+    for ventana in (3, 7):
+        sat = SaturacionCentros(cubo, ventana)
+        filas = [list(cubo.claves).index(str(100 + c)) for c in constantes]
+        presente = cubo.presente[filas]
+        comprobar(np.all(sat.desv_movil[filas][presente & ~np.isnan(sat.desv_movil[filas])] == 0.0),
+                  f"ventana {ventana}: la desviación de un centro constante no es 0", fallos)
+        comprobar(np.all(np.isnan(sat.z[filas])), f"ventana {ventana}: z de un centro constante no es NaN", fallos)
+        comprobar(np.nanmax(np.abs(sat.z)) < 1e3, f"ventana {ventana}: z desmesurado ({np.nanmax(np.abs(sat.z)):.3g})",
+                  fallos)
+
+        # Frente a pandas (la desviación de pandas usa un algoritmo en línea: tolerancia relativa)
+        ref = referencia_pandas(df, cubo, ventana)
+        for nombre, rtol in (('media_movil', 1e-12), ('desv_movil', 1e-5), ('media_mensual', 1e-12)):
+            # Solo las celdas con dato (la media mensual se repite en los días sin reporte)
+            comprobar(np.allclose(getattr(sat, nombre)[ref['presente']], ref[nombre][ref['presente']], rtol=rtol,
+                                  atol=1e-9, equal_nan=True), f"ventana {ventana}: {nombre} difiere de pandas", fallos)
+
+        # Incremental: la versión con días nuevos coincide con la calculada desde cero
+        previo = SaturacionCentros(CuboCarga(df[df['Fecha'] < df['Fecha'].max() - pd.Timedelta(days=10)]), ventana)
+        incremental = SaturacionCentros(cubo, ventana, anterior=previo)
+        comprobar(incremental.reutilizadas > 0, f"ventana {ventana}: no se reutilizó ninguna columna", fallos)
+        for nombre in ('media_movil', 'desv_movil', 'media_mensual', 'z'):
+            comprobar(np.array_equal(getattr(incremental, nombre), getattr(sat, nombre), equal_nan=True),
+                      f"ventana {ventana}: {nombre} incremental distinto del completo", fallos)
+
+    import server
+    from fastapi.testclient import TestClient
+    client = TestClient(server.app)
+    for umbral in ('nan', 'inf', '-inf'):
+        status = client.get(f"/api/saturacion?umbral={umbral}").status_code
+        comprobar(status == 422, f"umbral={umbral} devuelve {status} (se esperaba 422)", fallos)
+
+    if fallos:
+        sys.exit(1)
+    print("[OK] Saturación: ventanas constantes, pandas, incremental y validación del umbral")
+
+
+if __name__ == "__main__":
+    main()